@@ -0,0 +1,419 @@
+"""
+Benchmark build_site dengan korpus Blogger sintetis.
+
+Membuat postingan tiruan berbentuk respons Blogger API (jumlah postingan, ukuran konten,
+jumlah gambar, dan distribusi label dapat diatur), menjalankan build tanpa mengambil data
+dari API, lalu melaporkan waktu dinding, puncak RSS, halaman per detik, dan waktu per fase.
+Hasil disimpan sebagai JSON agar beberapa run dapat dibandingkan.
+
+Dengan --amp-parity, yang dijalankan adalah pemeriksaan paritas backend konversi AMP (lxml
+terhadap BeautifulSoup) pada korpus postingan nyata, misalnya post store hasil sinkronisasi.
+
+Contoh:
+    python src/benchmark.py --posts 5000 50000 --jobs 0
+    python src/benchmark.py --posts 5000 --compare benchmark_results/sebelumnya.json
+    python src/benchmark.py --amp-parity build_cache/posts.jsonl
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import queue
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCHMARK_VERSION = 1
+DEFAULT_RESULTS_DIR = "benchmark_results"
+
+_WORDS = (
+    "cerita malam itu aku dia kami rumah kota hujan pagi jalan teman kantor kopi "
+    "pulang lama baru sekali kemudian tiba perlahan senyum pintu jendela lampu suara "
+    "hati waktu hari minggu liburan pantai gunung desa pasar kereta bus motor"
+).split()
+
+
+# --- Korpus Sintetis ---
+
+def make_label_names(label_count):
+    """Nama label sintetis; sebagian memakai spasi agar slug label ikut teruji."""
+    return [f"Label {i}" if i % 3 else f"Kategori-{i}" for i in range(label_count)]
+
+def make_label_weights(label_count, skew):
+    """Bobot Zipf untuk label: skew 0 berarti merata, makin besar makin timpang."""
+    return [1.0 / (rank + 1) ** skew for rank in range(label_count)]
+
+def make_paragraph(rng, word_count):
+    words = rng.choices(_WORDS, k=word_count)
+    # Sedikit markup inline seperti konten Blogger pada umumnya
+    if word_count > 8:
+        words[2] = f"<b>{words[2]}</b>"
+        words[5] = f'<span style="color: #333;">{words[5]}</span>'
+    return f"<p>{' '.join(words).capitalize()}.</p>"
+
+def make_content(rng, post_id, content_words, image_count):
+    """HTML konten satu postingan: paragraf dengan gambar gaya Blogger di sela-selanya."""
+    paragraph_count = max(1, content_words // 60)
+    words_per_paragraph = max(1, content_words // paragraph_count)
+    parts = [make_paragraph(rng, words_per_paragraph) for _ in range(paragraph_count)]
+    for n in range(image_count):
+        image_url = f"https://blogger.googleusercontent.com/img/b/synthetic/{post_id}-{n}.jpg"
+        # Sebagian gambar tanpa dimensi, seperti yang sering ditemui di postingan lama
+        size_attrs = ' width="640" height="480"' if n % 2 == 0 else ""
+        image_html = (
+            f'<div class="separator" style="clear: both; text-align: center;">'
+            f'<a href="{image_url}" style="margin-left: 1em; margin-right: 1em;">'
+            f'<img border="0" src="{image_url}"{size_attrs} /></a></div>'
+        )
+        parts.insert(rng.randint(0, len(parts)), image_html)
+    return "<br />".join(parts)
+
+def iter_synthetic_posts(post_count, content_words=400, images_per_post=2, label_count=50,
+                         labels_per_post=3, label_skew=1.0, seed=0):
+    """Generator `post_count` postingan berbentuk item respons Blogger API (deterministik per seed)."""
+    rng = random.Random(seed)
+    label_names = make_label_names(label_count)
+    label_weights = make_label_weights(label_count, label_skew)
+    start_date = datetime(2015, 1, 1, tzinfo=timezone(timedelta(hours=7)))
+
+    for i in range(post_count):
+        post_id = str(1000000000000000000 + i * 7919)
+        published = start_date + timedelta(hours=i * 3, minutes=rng.randint(0, 59))
+        updated = published + timedelta(days=rng.randint(0, 30))
+        title = " ".join(rng.choices(_WORDS, k=rng.randint(3, 8))).title() + f" {i}"
+        labels = []
+        if label_count:
+            picked = rng.choices(label_names, weights=label_weights, k=rng.randint(1, labels_per_post))
+            labels = list(dict.fromkeys(picked))
+        post = {
+            'kind': 'blogger#post',
+            'id': post_id,
+            'published': published.isoformat(),
+            'updated': updated.isoformat(),
+            'url': f"https://example.blogspot.com/{published:%Y/%m}/post-{i}.html",
+            'title': title,
+            'content': make_content(rng, post_id, content_words, images_per_post),
+            'author': {'displayName': f"Penulis {i % 5}"},
+            'labels': labels,
+        }
+        if images_per_post:
+            post['images'] = [{'url': f"https://blogger.googleusercontent.com/img/b/synthetic/{post_id}-0.jpg"}]
+        yield post
+
+def generate_posts(post_count, **options):
+    """Seperti iter_synthetic_posts, tetapi mengembalikan list."""
+    return list(iter_synthetic_posts(post_count, **options))
+
+
+# --- Menjalankan Build ---
+
+def get_peak_rss_mb():
+    """Puncak RSS proses ini dan proses anaknya (worker build), dalam MiB."""
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024 # ru_maxrss: byte di macOS, KiB di Linux
+    return round(self_rss / divisor, 1), round(children_rss / divisor, 1)
+
+def get_directory_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            total += os.path.getsize(os.path.join(dirpath, filename))
+    return total
+
+def run_build(config, post_count, result_queue):
+    """
+    Dijalankan di proses terpisah per ukuran korpus agar puncak RSS tiap run tidak tercampur.
+    Build berjalan di direktori sementara; gondes diimpor setelah chdir karena modul itu
+    membuat direktori output relatif terhadap direktori kerja saat diimpor.
+    """
+    work_dir = tempfile.mkdtemp(prefix="gondes-bench-")
+    try:
+        os.chdir(work_dir)
+        sys.path.insert(0, SRC_DIR)
+        import gondes
+        if config['amp_backend']:
+            gondes.AMP_CONVERTER_BACKEND = config['amp_backend']
+        gondes.AMP_CACHE_ENABLED = not config['no_amp_cache']
+
+        generate_start = time.perf_counter()
+        synthetic_posts = iter_synthetic_posts(
+            post_count, content_words=config['content_words'], images_per_post=config['images_per_post'],
+            label_count=config['labels'], labels_per_post=config['labels_per_post'],
+            label_skew=config['label_skew'], seed=config['seed'],
+        )
+        if config['low_memory']:
+            # Korpus ditulis langsung ke post store dan build membacanya secara streaming
+            gondes.save_post_store(synthetic_posts)
+            posts = gondes.iter_post_store
+        else:
+            posts = list(synthetic_posts)
+        generate_seconds = time.perf_counter() - generate_start
+
+        runs = []
+        build_modes = ['full'] + ['warm'] * config['warm_reruns'] + ['incremental'] * config['incremental_reruns']
+        for build_mode in build_modes:
+            with open(os.devnull, 'w') as devnull:
+                stdout = sys.stdout
+                if not config['verbose']:
+                    sys.stdout = devnull
+                try:
+                    gondes.reset_metrics()
+                    start = time.perf_counter()
+                    # 'warm': build penuh lagi (semua halaman dirender) dengan cache AMP dari build sebelumnya
+                    incremental = config['incremental_reruns'] > 0 and build_mode != 'warm'
+                    summary = gondes.build_site(posts, incremental=incremental,
+                                                jobs=config['jobs'], low_memory=config['low_memory'],
+                                                related_scoring=config['related_scoring'] or gondes.RELATED_POSTS_SCORING)
+                    wall_seconds = time.perf_counter() - start
+                finally:
+                    sys.stdout = stdout
+            peak_rss_mb, peak_rss_workers_mb = get_peak_rss_mb()
+            runs.append({
+                'posts': post_count,
+                'build': build_mode,
+                'wall_seconds': round(wall_seconds, 3),
+                'peak_rss_mb': peak_rss_mb,
+                'peak_rss_workers_mb': peak_rss_workers_mb,
+                'pages_total': summary['pages_total'],
+                'pages_rendered': summary['pages_rendered'],
+                'pages_per_second': round(summary['pages_rendered'] / wall_seconds, 1) if wall_seconds else None,
+                'phase_seconds': {name: round(seconds, 3) for name, seconds in sorted(summary['phase_times'].items())},
+                'counters': dict(sorted(summary['counters'].items())),
+                'output_bytes': get_directory_size(gondes.OUTPUT_DIR),
+                'generate_seconds': round(generate_seconds, 3),
+            })
+        result_queue.put(runs)
+    except BaseException as e:
+        result_queue.put(e)
+        raise
+    finally:
+        os.chdir(SRC_DIR)
+        if config['keep']:
+            print(f"Output build disimpan di {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+def run_benchmark(config, post_count):
+    """Menjalankan satu ukuran korpus di proses anak dan mengembalikan hasil setiap build-nya."""
+    if 'fork' in multiprocessing.get_all_start_methods():
+        mp_context = multiprocessing.get_context('fork')
+    else:
+        mp_context = multiprocessing.get_context()
+    result_queue = mp_context.Queue()
+    process = mp_context.Process(target=run_build, args=(config, post_count, result_queue))
+    process.start()
+    while True:
+        try:
+            result = result_queue.get(timeout=1)
+            break
+        except queue.Empty:
+            # Proses anak bisa mati tanpa mengirim hasil (mis. dihentikan OOM killer)
+            if not process.is_alive():
+                raise RuntimeError(f"Benchmark {post_count} postingan berhenti dengan kode {process.exitcode}.")
+    process.join()
+    if isinstance(result, BaseException):
+        raise RuntimeError(f"Benchmark {post_count} postingan gagal: {result!r}")
+    return result
+
+
+# --- Paritas Konverter AMP ---
+
+def load_corpus(path):
+    """Memuat postingan dari file JSON (list) atau JSON-lines (mis. build_cache/posts.jsonl)."""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            return [json.loads(line) for line in f if line.strip()]
+        return json.load(f)
+
+def canonicalize_html(gondes, html):
+    """
+    Serialisasi ulang HTML dengan lxml (atribut diurutkan) sehingga perbedaan penulisan yang
+    tidak mengubah DOM -- <br/> vs <br>, urutan atribut, perbaikan nesting -- tidak dihitung.
+    """
+    root = gondes.parse_html_fragment_lxml(html)
+    for element in root.iter():
+        if isinstance(element.tag, str) and len(element.attrib) > 1:
+            attrs = sorted(element.attrib.items())
+            element.attrib.clear()
+            element.attrib.update(attrs)
+    return gondes.lxml.html.tostring(root, encoding='unicode', method='html')
+
+def run_amp_parity(corpus_path, max_examples=5):
+    """
+    Menjalankan kedua backend konversi AMP pada setiap postingan korpus dan membandingkan
+    teks, gambar pertama, dan body AMP (setelah canonicalize_html). Mengembalikan ringkasan
+    waktu per backend, jumlah perbedaan, dan beberapa contoh perbedaan.
+    """
+    corpus_path = os.path.abspath(corpus_path)
+    work_dir = tempfile.mkdtemp(prefix="gondes-bench-")
+    try:
+        os.chdir(work_dir)
+        sys.path.insert(0, SRC_DIR)
+        import gondes
+        if gondes.lxml is None:
+            raise SystemExit("Pemeriksaan paritas membutuhkan paket lxml.")
+
+        contents = [post.get('content', '') for post in load_corpus(corpus_path)]
+        contents = [content for content in contents if content]
+        outputs = {}
+        seconds = {}
+        for backend, preprocess_content in (('bs4', gondes.preprocess_content_bs4),
+                                            ('lxml', gondes.preprocess_content_lxml)):
+            start = time.perf_counter()
+            outputs[backend] = [preprocess_content(content) for content in contents]
+            seconds[backend] = time.perf_counter() - start
+
+        mismatches = {'text': 0, 'image': 0, 'amp': 0, 'lxml_failed': 0}
+        examples = []
+        for index, (expected, actual) in enumerate(zip(outputs['bs4'], outputs['lxml'])):
+            if actual is None:
+                mismatches['lxml_failed'] += 1 # preprocess_post akan memakai BeautifulSoup
+                continue
+            differences = {}
+            if expected[0] != actual[0]:
+                differences['text'] = (expected[0][:200], actual[0][:200])
+            if expected[1] != actual[1]:
+                differences['image'] = (expected[1], actual[1])
+            expected_amp = canonicalize_html(gondes, expected[2]) if expected[2] else ""
+            actual_amp = canonicalize_html(gondes, actual[2]) if actual[2] else ""
+            if expected_amp != actual_amp:
+                position = next((i for i, (a, b) in enumerate(zip(expected_amp, actual_amp)) if a != b),
+                                min(len(expected_amp), len(actual_amp)))
+                differences['amp'] = (expected_amp[max(0, position - 80):position + 80],
+                                      actual_amp[max(0, position - 80):position + 80])
+            for key in differences:
+                mismatches[key] += 1
+            if differences and len(examples) < max_examples:
+                examples.append({'index': index, 'differences': differences})
+        return {
+            'posts': len(contents),
+            'bs4_seconds': round(seconds['bs4'], 3),
+            'lxml_seconds': round(seconds['lxml'], 3),
+            'speedup': round(seconds['bs4'] / seconds['lxml'], 2) if seconds['lxml'] else None,
+            'mismatches': mismatches,
+            'examples': examples,
+        }
+    finally:
+        os.chdir(SRC_DIR)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def format_amp_parity(parity):
+    lines = [f"Paritas AMP pada {parity['posts']} postingan: bs4 {parity['bs4_seconds']:.2f}s, "
+             f"lxml {parity['lxml_seconds']:.2f}s (x{parity['speedup']}), perbedaan {parity['mismatches']}"]
+    for example in parity['examples']:
+        for key, (expected, actual) in example['differences'].items():
+            lines.append(f"  #{example['index']} {key}:\n    bs4 : {expected!r}\n    lxml: {actual!r}")
+    return "\n".join(lines)
+
+# --- Laporan ---
+
+def format_run(run):
+    phases = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in run['phase_seconds'].items())
+    return (f"{run['posts']:>7} postingan [{run['build']}]: {run['wall_seconds']:.2f}s, "
+            f"{run['pages_rendered']}/{run['pages_total']} halaman ({run['pages_per_second']} hlm/s), "
+            f"RSS puncak {run['peak_rss_mb']} MiB (worker {run['peak_rss_workers_mb']} MiB)\n"
+            f"          fase: {phases}")
+
+def compare_results(baseline, results):
+    """Mencetak rasio waktu dinding, halaman/detik, dan RSS terhadap hasil benchmark sebelumnya."""
+    baseline_runs = {(run['posts'], run['build']): run for run in baseline['runs']}
+    print(f"Perbandingan dengan {baseline['timestamp']}:")
+    for run in results['runs']:
+        old = baseline_runs.get((run['posts'], run['build']))
+        if old is None:
+            continue
+        ratios = []
+        for key, label in (('wall_seconds', 'waktu'), ('pages_per_second', 'hlm/s'), ('peak_rss_mb', 'RSS')):
+            if old.get(key) and run.get(key) is not None:
+                ratios.append(f"{label} x{run[key] / old[key]:.2f}")
+        print(f"  {run['posts']:>7} postingan [{run['build']}]: {', '.join(ratios)}")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark build_site dengan korpus Blogger sintetis (tanpa Blogger API).")
+    parser.add_argument("--posts", type=int, nargs="+", default=[1000],
+                        help="Jumlah postingan per korpus; beberapa nilai dijalankan berurutan (mis. 5000 50000).")
+    parser.add_argument("--content-words", type=int, default=400, help="Jumlah kata per postingan.")
+    parser.add_argument("--images-per-post", type=int, default=2, help="Jumlah gambar per postingan.")
+    parser.add_argument("--labels", type=int, default=50, help="Jumlah label unik di korpus.")
+    parser.add_argument("--labels-per-post", type=int, default=3, help="Jumlah label maksimum per postingan.")
+    parser.add_argument("--label-skew", type=float, default=1.0,
+                        help="Eksponen Zipf distribusi label (0 = merata).")
+    parser.add_argument("--jobs", type=int, default=1, help="Diteruskan ke build_site (0 = semua core CPU).")
+    parser.add_argument("--related-scoring", default=None, help="Diteruskan ke build_site (default: bawaan gondes).")
+    parser.add_argument("--amp-backend", choices=("auto", "lxml", "bs4"),
+                        help="Backend konversi AMP untuk build (default: bawaan gondes).")
+    parser.add_argument("--amp-parity", metavar="CORPUS",
+                        help="Bandingkan backend AMP lxml dan BeautifulSoup pada korpus (JSON atau JSON-lines) alih-alih menjalankan build.")
+    parser.add_argument("--low-memory", action="store_true",
+                        help="Build dari post store secara streaming (build_site low_memory=True).")
+    parser.add_argument("--no-amp-cache", action="store_true", help="Build tanpa cache konversi AMP.")
+    parser.add_argument("--warm-reruns", type=int, default=0,
+                        help="Jumlah build penuh tambahan setelah build pertama, dengan cache AMP yang sudah terisi.")
+    parser.add_argument("--incremental-reruns", type=int, default=0,
+                        help="Jumlah build inkremental tambahan (tanpa perubahan) setelah build penuh.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed generator korpus.")
+    parser.add_argument("--output", help=f"File JSON hasil (default: {DEFAULT_RESULTS_DIR}/benchmark-<waktu>.json).")
+    parser.add_argument("--compare", help="File JSON hasil benchmark sebelumnya sebagai pembanding.")
+    parser.add_argument("--keep", action="store_true", help="Jangan hapus direktori output build.")
+    parser.add_argument("--verbose", action="store_true", help="Tampilkan output build_site.")
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    config = {
+        'content_words': args.content_words,
+        'images_per_post': args.images_per_post,
+        'labels': args.labels,
+        'labels_per_post': args.labels_per_post,
+        'label_skew': args.label_skew,
+        'jobs': args.jobs,
+        'related_scoring': args.related_scoring,
+        'incremental_reruns': args.incremental_reruns,
+        'low_memory': args.low_memory,
+        'amp_backend': args.amp_backend,
+        'no_amp_cache': args.no_amp_cache,
+        'warm_reruns': args.warm_reruns,
+        'seed': args.seed,
+        'keep': args.keep,
+        'verbose': args.verbose,
+    }
+
+    timestamp = datetime.now(timezone.utc)
+    results = {
+        'benchmark_version': BENCHMARK_VERSION,
+        'timestamp': timestamp.isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'config': {key: value for key, value in config.items() if key not in ('keep', 'verbose')},
+        'runs': [],
+    }
+    if args.amp_parity:
+        results['amp_parity'] = run_amp_parity(args.amp_parity)
+        print(format_amp_parity(results['amp_parity']))
+    else:
+        for post_count in args.posts:
+            for run in run_benchmark(config, post_count):
+                print(format_run(run))
+                results['runs'].append(run)
+
+    output_path = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"benchmark-{timestamp:%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Hasil disimpan di {output_path}")
+
+    if args.compare and not args.amp_parity:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare_results(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,46 @@
 import requests
 import json
 import os 
-from bs4 import BeautifulSoup
+import pstats
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import unicodedata
+import argparse
+import collections
+import hashlib
+import html
+import http.server
+import io
+import re
+import contextlib
+import urllib.parse
+import cProfile
+import functools
+import gzip
+import heapq
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from email.utils import format_datetime
+from xml.sax.saxutils import escape as xml_escape, quoteattr
+from bs4 import BeautifulSoup, Tag
 from slugify import slugify
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+
+try:
+    import lxml.etree
+    import lxml.html
+except ImportError: # lxml opsional; tanpa lxml konversi AMP memakai BeautifulSoup
+    lxml = None
+
+try:
+    import brotli
+except ImportError: # brotli opsional; tanpa brotli hanya varian .gz yang dibuat
+    brotli = None
 
 # --- KONFIGURASI PENTING ---
 API_KEY = os.getenv("BLOGGER_API_KEY")
@@ -21,82 +58,414 @@ BLOG_NAME = "Cerita Dewasa 2025" # <<< GANTI DENGAN NAMA BLOG ANDA
 STATIC_DIR = os.path.join(os.path.dirname(__file__), "static")
 CUSTOM_CSS_PATH = os.path.join(STATIC_DIR, "style.css")
 LOGO_PATH = os.path.join(STATIC_DIR, "logo.png")
+# Template HTML tema (lihat bagian "Template" di bawah)
+TEMPLATE_DIR = os.path.join(os.path.dirname(__file__), "templates")
+
+# Jumlah postingan per halaman index dan halaman label
+POSTS_PER_PAGE = 10
+# Skema paginasi index dan label (--pagination):
+# - 'newest': index.html, index_p2.html, ... dipotong dari postingan terbaru; satu postingan baru
+#   menggeser isi semua halaman.
+# - 'stable': index.html berisi postingan terbaru, arsip index_a1.html, index_a2.html, ... dipotong
+#   dari postingan terlama dan hanya dibuat untuk halaman yang sudah penuh, sehingga isinya tidak
+#   berubah lagi. URL lama (index_p2.html, ...) diganti halaman redirect jika PAGINATION_REDIRECTS.
+PAGINATION_SCHEME = "newest"
+PAGINATION_REDIRECTS = True
+
+# Sidebar hanya memuat SIDEBAR_LABEL_LIMIT label dengan postingan terbanyak sehingga ukuran setiap halaman
+# tidak ikut membesar bersama jumlah label. Jika labelnya lebih banyak, sidebar menautkan ke direktori
+# semua label (daftar_label.html, daftar_label_p2.html, ...) yang dikelompokkan per huruf awal.
+SIDEBAR_LABEL_LIMIT = 30
+LABEL_DIRECTORY_NAME = "daftar_label" # Garis bawah tidak pernah dihasilkan slugify, jadi tidak bentrok dengan label
+LABELS_PER_DIRECTORY_PAGE = 300
+
+# Postingan terkait: jumlah per artikel dan strategi skor ('label-order' atau 'shared-labels')
+RELATED_POSTS_LIMIT = 3
+RELATED_POSTS_SCORING = "label-order"
+RELATED_CANDIDATES_PER_LABEL = 10 # Tetangga (di setiap sisi) per label yang dinilai oleh 'shared-labels'
+RELATED_RECENCY_HALF_LIFE = 20 # Jarak (dalam jumlah postingan) saat bobot kedekatan waktu menjadi 1/2
+
+# Sitemap (indeks + shard) dan feed postingan terbaru (RSS, Atom, JSON Feed)
+SITEMAP_MAX_URLS = 50000 # Batas URL per file sitemap dari protokol sitemaps.org
+FEED_POST_LIMIT = 20
+
+# Backend konversi AMP: 'lxml' (jauh lebih cepat, butuh paket lxml), 'bs4' (BeautifulSoup), atau
+# 'auto' (lxml jika terpasang). Postingan yang gagal di-parse oleh lxml otomatis memakai BeautifulSoup.
+AMP_CONVERTER_BACKEND = "auto"
+AMP_CONVERTER_VERSION = 3 # Naikkan jika aturan atau serialisasi konversi AMP berubah
+
+# Optimasi CSS: CSS diminifikasi sekali, lalu di-tree-shake per halaman sesuai selector yang dipakai
+CSS_TREE_SHAKING = True
+AMP_CSS_BUDGET_BYTES = 75000 # Batas ukuran <style amp-custom> dari spesifikasi AMP
+
+# Direktori cache build (manifest, dll.). Disimpan di antara run oleh GitHub Actions cache.
+BUILD_CACHE_DIR = "build_cache"
+BUILD_MANIFEST_FILE = os.path.join(BUILD_CACHE_DIR, "build_manifest.json")
+BUILD_MANIFEST_VERSION = 3 # Naikkan jika struktur manifest build berubah
+OUTPUT_MANIFEST_FILE = os.path.join(BUILD_CACHE_DIR, "output_manifest.json") # Hash isi setiap halaman non-artikel di OUTPUT_DIR
+
+# Ledger publikasi (SQLite): satu baris per postingan yang sudah dibangun (ID, updated, hash konten, path
+# halaman artikel, signature dan hash isi halaman tersebut), dicari per ID lewat primary key. Ledger yang
+# menentukan artikel mana yang dirender ulang dan halaman artikel usang mana yang dihapus; manifest
+# build/output hanya mencatat halaman non-artikel. Menggantikan daftar ID di published_posts.json, yang
+# dimigrasikan sekali saat ledger dibuat.
+LEDGER_FILE = os.path.join(BUILD_CACHE_DIR, "ledger.sqlite3")
+LEGACY_PUBLISHED_POSTS_FILE = "published_posts.json"
+LEDGER_PAGE_COLUMNS = ('output_path', 'signature', 'output_hash')
+
+# Post store lokal (JSON-lines) dan state sinkronisasi delta dengan Blogger API
+POST_STORE_FILE = os.path.join(BUILD_CACHE_DIR, "posts.jsonl")
+SYNC_STATE_FILE = os.path.join(BUILD_CACHE_DIR, "sync_state.json")
+
+# Cache hasil pra-pemrosesan konten (body AMP, snippet, gambar pertama), dialamatkan dengan hash
+# konten HTML dan identitas konverter sehingga postingan yang tidak berubah tidak di-parse ulang
+AMP_CACHE_ENABLED = True # Diatur oleh --no-amp-cache
+AMP_CACHE_DIR = os.path.join(BUILD_CACHE_DIR, "amp_cache")
+AMP_CACHE_MAX_BYTES = 256 * 1024 * 1024 # Di atas batas ini entri yang paling lama tidak dipakai dihapus
+AMP_CACHE_FORMAT = 2 # Naikkan jika isi entri cache (lihat preprocess_content) berubah
+
+# Pemeriksaan ukuran gambar (--probe-images): hanya byte header setiap gambar yang dibaca untuk
+# mendapatkan lebar/tinggi asli, hasilnya disimpan per URL sehingga tiap gambar cukup diperiksa sekali
+IMAGE_PROBE_ENABLED = False
+IMAGE_SIZE_CACHE_FILE = os.path.join(BUILD_CACHE_DIR, "image_sizes.json")
+IMAGE_PROBE_CONCURRENCY = 8
+IMAGE_PROBE_TIMEOUT = 10 # detik
+IMAGE_PROBE_CHUNK_BYTES = 4096
+IMAGE_PROBE_MAX_BYTES = 256 * 1024 # Header JPEG dengan EXIF besar bisa cukup panjang; di atas ini menyerah
+IMAGE_PROBE_RETRY_DAYS = 7 # Gambar yang gagal diperiksa dicoba lagi setelah sekian hari
+DEFAULT_AMP_IMG_SIZE = (600, 400) # Dipakai jika ukuran gambar tidak diketahui
+POST_THUMBNAIL_SIZE = (100, 75) # Thumbnail daftar postingan (index dan label)
+RELATED_THUMBNAIL_SIZE = (80, 60) # Thumbnail postingan terkait
+
+# Mode hemat memori (--low-memory): jumlah postingan yang diproses per batch saat konten dibaca ulang dari post store
+STREAM_BATCH_SIZE = 200
+
+# Dapat diarahkan ke server tiruan (mock) lokal untuk pengujian
+BLOGGER_API_BASE = os.getenv("BLOGGER_API_BASE", "https://www.googleapis.com/blogger/v3")
+BLOGGER_POST_FIELDS = "id,title,url,published,updated,content,labels,images,author(displayName)"
+
+# Pengambilan data: request paralel per jendela tanggal, retry dengan exponential backoff,
+# dan checkpoint per halaman agar run yang gagal bisa dilanjutkan
+FETCH_CONCURRENCY = 4
+FETCH_WINDOW_DAYS = 180
+FETCH_TIMEOUT = 30 # detik
+FETCH_MAX_RETRIES = 5
+FETCH_BACKOFF_BASE = 1.0 # detik; jeda ke-n = FETCH_BACKOFF_BASE * 2^n (+ jitter)
+FETCH_RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+FETCH_MAX_RETRY_AFTER = 60 # detik; Retry-After dari server dibatasi agar build tidak tertahan terlalu lama
+FETCH_CHECKPOINT_DIR = os.path.join(BUILD_CACHE_DIR, "fetch_checkpoint")
+
+# Pasca-pemrosesan output: minifikasi HTML (--minify-html) dan varian terkompresi .gz/.br
+# (--precompress) untuk server statis/CDN yang menyajikan file pre-compressed
+HTML_MINIFY = False
+PRECOMPRESS_ENABLED = False
+PRECOMPRESS_MANIFEST_FILE = os.path.join(BUILD_CACHE_DIR, "precompress_manifest.json")
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11 # Lambat tetapi hanya halaman yang isinya berubah yang dikompresi ulang
+
+# Indeks pencarian sisi klien (--search-index): indeks terbalik atas judul, label, dan teks postingan,
+# di-shard per awalan term sehingga klien hanya mengunduh shard yang dibutuhkan query-nya
+SEARCH_INDEX_ENABLED = False
+SEARCH_INDEX_DIR = "search" # Di dalam OUTPUT_DIR
+SEARCH_INDEX_VERSION = 1
+SEARCH_TERM_PREFIX_LENGTH = 2 # Panjang awalan term yang menentukan shard
+SEARCH_MIN_TERM_LENGTH = 2
+SEARCH_MAX_TERM_LENGTH = 32
+SEARCH_DOCS_PER_SHARD = 1000 # Jumlah postingan (judul + permalink) per file docs
+SEARCH_TERM_STORE_FILE = os.path.join(BUILD_CACHE_DIR, "search_terms.jsonl") # Term teks per postingan
+
+# Mode pratinjau lokal (--serve): OUTPUT_DIR disajikan lewat HTTP, perubahan CSS, template, dan
+# post store dipantau dengan polling mtime, dan halaman yang terdampak dirender saat diminta
+SERVE_HOST = "127.0.0.1"
+SERVE_PORT = 8000
+SERVE_POLL_INTERVAL = 0.5 # detik
 
 # Pastikan direktori output ada
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# --- Instrumentasi Build ---
+#
+# Timer per fase (fetch, parse, konversi AMP, postingan terkait, render, penulisan file) dan
+# counter (request API, halaman, byte yang ditulis, dll.) dikumpulkan per proses. Worker mengirim
+# metriknya bersama hasil task (lihat pool_map), sehingga untuk build paralel waktu fase adalah
+# total waktu di semua worker, bukan waktu dinding.
+
+QUIET = False # Diatur oleh --quiet: hanya peringatan dan error yang dicetak
+METRICS_PREFIX = "gondes" # Prefix nama metrik di file Prometheus
+
+_PHASE_TIMES = {}
+_COUNTERS = {}
+_METRICS_LOCK = threading.Lock() # Counter juga diperbarui dari thread pengambilan data
+
+@contextlib.contextmanager
+def phase_timer(name):
+    """Menambahkan durasi blok ini ke total waktu fase `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        with _METRICS_LOCK:
+            _PHASE_TIMES[name] = _PHASE_TIMES.get(name, 0.0) + elapsed
+
+def increment_counter(name, amount=1):
+    with _METRICS_LOCK:
+        _COUNTERS[name] = _COUNTERS.get(name, 0) + amount
+
+def get_metrics():
+    """Salinan metrik yang terkumpul sejauh ini: {'phases': {...}, 'counters': {...}}."""
+    with _METRICS_LOCK:
+        return {'phases': dict(_PHASE_TIMES), 'counters': dict(_COUNTERS)}
+
+def reset_metrics():
+    """Mengembalikan metrik yang terkumpul sejauh ini lalu mengosongkannya."""
+    with _METRICS_LOCK:
+        metrics = {'phases': dict(_PHASE_TIMES), 'counters': dict(_COUNTERS)}
+        _PHASE_TIMES.clear()
+        _COUNTERS.clear()
+    return metrics
+
+def merge_metrics(metrics):
+    """Menambahkan metrik dari proses lain (worker) ke total proses ini."""
+    with _METRICS_LOCK:
+        for name, seconds in metrics['phases'].items():
+            _PHASE_TIMES[name] = _PHASE_TIMES.get(name, 0.0) + seconds
+        for name, amount in metrics['counters'].items():
+            _COUNTERS[name] = _COUNTERS.get(name, 0) + amount
+
+def log(message):
+    """Mencetak pesan informasi, kecuali dalam mode --quiet. Peringatan dan error memakai print()."""
+    if not QUIET:
+        print(message)
+
+def iter_progress(items, total, description):
+    """
+    Meneruskan `items` sambil menampilkan progres. Di terminal berupa progress bar satu baris
+    (stderr); di luar terminal (mis. log GitHub Actions) satu baris setiap kelipatan 10%.
+    """
+    if QUIET or not total:
+        yield from items
+        return
+    interactive = sys.stderr.isatty()
+    last_shown = 0
+    for done, item in enumerate(items, 1):
+        yield item
+        if interactive:
+            permille = done * 1000 // total
+            if permille != last_shown:
+                last_shown = permille
+                filled = done * 30 // total
+                sys.stderr.write(f"\r  {description} [{'#' * filled}{'.' * (30 - filled)}] {done}/{total}")
+                sys.stderr.flush()
+        else:
+            decile = done * 10 // total
+            if decile != last_shown:
+                last_shown = decile
+                print(f"  > {description}: {done}/{total} ({decile * 10}%)")
+    if interactive:
+        sys.stderr.write("\n")
+
+def format_phase_times(phase_times):
+    return ", ".join(f"{name} {seconds:.2f}s" for name, seconds in sorted(phase_times.items()))
+
+def write_metrics_file(path, metrics_format, wall_seconds):
+    """
+    Menyimpan ringkasan metrik run ini sebagai JSON atau teks Prometheus (untuk textfile
+    collector node_exporter). File ditulis secara atomik.
+    """
+    metrics = get_metrics()
+    if metrics_format == 'prometheus':
+        lines = [
+            f"# HELP {METRICS_PREFIX}_wall_seconds Waktu dinding run terakhir.",
+            f"# TYPE {METRICS_PREFIX}_wall_seconds gauge",
+            f"{METRICS_PREFIX}_wall_seconds {wall_seconds:.6f}",
+            f"# HELP {METRICS_PREFIX}_phase_seconds Waktu per fase (dijumlahkan di semua worker).",
+            f"# TYPE {METRICS_PREFIX}_phase_seconds gauge",
+        ]
+        for name, seconds in sorted(metrics['phases'].items()):
+            lines.append(f'{METRICS_PREFIX}_phase_seconds{{phase="{name}"}} {seconds:.6f}')
+        for name, amount in sorted(metrics['counters'].items()):
+            lines.append(f"# TYPE {METRICS_PREFIX}_{name} gauge")
+            lines.append(f"{METRICS_PREFIX}_{name} {amount}")
+        lines.append(f"# TYPE {METRICS_PREFIX}_last_run_timestamp_seconds gauge")
+        lines.append(f"{METRICS_PREFIX}_last_run_timestamp_seconds {time.time():.0f}")
+        content = "\n".join(lines) + "\n"
+    else:
+        content = json.dumps({
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'wall_seconds': round(wall_seconds, 3),
+            'phases': {name: round(seconds, 3) for name, seconds in sorted(metrics['phases'].items())},
+            'counters': dict(sorted(metrics['counters'].items())),
+        }, indent=4)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+@contextlib.contextmanager
+def profiling(output_path, top=20):
+    """
+    Menjalankan blok di bawah cProfile jika `output_path` diisi. Statistik disimpan dalam format
+    pstats (bisa dibuka dengan snakeviz dsb.) dan fungsi teratas dicetak. Hanya proses utama
+    yang diprofil; gunakan --jobs 1 agar parse dan render ikut terukur.
+    """
+    if not output_path:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(output_path)
+        log(f"Profil disimpan di '{output_path}'. {top} fungsi teratas (waktu kumulatif):")
+        if not QUIET:
+            pstats.Stats(profiler).sort_stats('cumulative').print_stats(top)
+
 # --- FUNGSI BANTUAN ---
 
-def get_snippet(html_content, word_limit=100):
-    """Mengekstrak snippet teks bersih dari konten HTML."""
-    if not html_content:
-        return ""
-    soup = BeautifulSoup(html_content, 'html.parser')
-    text = soup.get_text(separator=' ', strip=True) # strip=True untuk membersihkan spasi ekstra
+def build_snippet_from_text(text, word_limit=100):
+    """Memotong teks bersih menjadi snippet sepanjang `word_limit` kata."""
     words = text.split()
     return ' '.join(words[:word_limit]) + ('...' if len(words) > word_limit else '')
 
-def convert_to_amp(html_content):
+# Elemen yang dihapus dari konten karena tidak valid di AMP (beserta isinya)
+AMP_INVALID_TAGS = frozenset(['iframe', 'form', 'input', 'video', 'audio', 'object', 'embed'])
+# Elemen yang isinya tidak dihitung sebagai teks postingan (sama seperti get_text BeautifulSoup)
+NON_TEXT_TAGS = frozenset(['script', 'style', 'template'])
+# Elemen void yang oleh parser lxml (libxml2) diperlakukan sebagai kontainer: konten setelahnya masuk ke dalamnya
+LXML_CONTAINER_VOID_TAGS = frozenset(['embed'])
+
+def get_amp_backend():
+    """Backend konversi AMP yang dipakai: 'lxml' atau 'bs4'."""
+    if AMP_CONVERTER_BACKEND == 'auto':
+        return 'lxml' if lxml is not None else 'bs4'
+    return AMP_CONVERTER_BACKEND
+
+def get_amp_converter_id():
+    """Identitas konverter (backend + versi) untuk hash input build; output berbeda antar backend."""
+    return f"{get_amp_backend()}-{AMP_CONVERTER_VERSION}"
+
+def is_removed_for_amp(tag_name, script_type):
+    """Elemen yang dihapus beserta isinya: tag tidak valid dan script selain JSON-LD."""
+    return tag_name in AMP_INVALID_TAGS or (tag_name == 'script' and script_type != 'application/ld+json')
+
+def build_amp_img_attrs(img_attrs):
     """
-    Mengonversi HTML biasa ke HTML yang kompatibel dengan AMP.
-    Ini adalah fungsi dasar. Untuk konversi yang lebih canggih,
-    AMP DevTools atau pustaka khusus AMP akan lebih baik.
+    Atribut amp-img dari atribut img: hanya src, alt, serta width/height numerik, dan layout
+    responsive. Dimensi yang tidak ada dilengkapi dari ukuran asli gambar (lihat probe_image_sizes)
+    dengan rasio aspek yang sama, atau default DEFAULT_AMP_IMG_SIZE (penting untuk layout AMP).
+    Urutan atribut alfabetis.
     """
-    if not html_content:
-        return ""
-    
-    soup = BeautifulSoup(html_content, 'html.parser')
-
-    # Ubah img menjadi amp-img
-    for img in soup.find_all('img'):
-        amp_img = soup.new_tag('amp-img')
-        for attr, value in img.attrs.items():
-            if attr in ['src', 'alt']:
-                amp_img[attr] = value
-            # Pastikan width/height adalah angka dan salin jika ada
-            elif attr == 'width' and str(value).isdigit():
-                amp_img[attr] = value
-            elif attr == 'height' and str(value).isdigit():
-                amp_img[attr] = value
-        
-        # Berikan width/height default jika tidak ada, penting untuk layout AMP
-        if 'width' not in amp_img.attrs: amp_img['width'] = '600'
-        if 'height' not in amp_img.attrs: amp_img['height'] = '400'
-        
-        amp_img['layout'] = 'responsive' # Layout paling umum dan adaptif
-        
-        img.replace_with(amp_img)
-
-    # Hapus atribut style inline
-    for tag in soup.find_all(attrs={'style': True}):
-        del tag['style']
-
-    # Hapus script tag (kecuali type="application/ld+json")
-    for script_tag in soup.find_all('script'):
-        if 'type' in script_tag.attrs and script_tag['type'] == 'application/ld+json':
-            continue # Biarkan script JSON-LD
-        script_tag.decompose()
-        
-    # Hapus atribut 'id' dari elemen non-AMP untuk mencegah konflik/validasi AMP
-    for tag in soup.find_all(True):
-        if 'id' in tag.attrs and not tag.name.startswith('amp-'):
-            del tag['id']
-            
-    # Hapus elemen yang tidak valid di AMP (misal: iframes, form, input, kecuali dari whitelist)
-    # Ini contoh sederhana, untuk whitelist yang lebih lengkap butuh daftar tag AMP valid
-    invalid_tags = ['iframe', 'form', 'input', 'video', 'audio', 'object', 'embed']
-    for tag_name in invalid_tags:
-        for tag in soup.find_all(tag_name):
-            tag.decompose()
-
-    # Membersihkan entitas HTML ganda yang mungkin muncul dari Beautiful Soup
-    cleaned_html = str(soup)
-    # Beberapa karakter perlu di-encode ulang untuk HTML yang valid setelah BeautifulSoup
-    cleaned_html = cleaned_html.replace('&amp;', '&').replace('&lt;', '<').replace('&gt;', '>').replace('&quot;', '"')
-    return cleaned_html
-
-def generate_breadcrumbs_data(post_title, post_labels, base_url):
-    """Menghasilkan struktur breadcrumbs untuk JSON-LD."""
+    amp_attrs = {}
+    for attr, value in img_attrs.items():
+        if attr in ('src', 'alt') or (attr in ('width', 'height') and str(value).isdigit()):
+            amp_attrs[attr] = value
+    if 'width' not in amp_attrs or 'height' not in amp_attrs:
+        image_size = _IMAGE_SIZES.get(amp_attrs.get('src'))
+        if image_size:
+            image_width, image_height = image_size
+            if 'width' in amp_attrs:
+                amp_attrs['height'] = str(max(1, round(int(amp_attrs['width']) * image_height / image_width)))
+            elif 'height' in amp_attrs:
+                amp_attrs['width'] = str(max(1, round(int(amp_attrs['height']) * image_width / image_height)))
+            else:
+                amp_attrs['width'], amp_attrs['height'] = str(image_width), str(image_height)
+        else:
+            amp_attrs.setdefault('width', str(DEFAULT_AMP_IMG_SIZE[0]))
+            amp_attrs.setdefault('height', str(DEFAULT_AMP_IMG_SIZE[1]))
+    amp_attrs['layout'] = 'responsive' # Layout paling umum dan adaptif
+    return dict(sorted(amp_attrs.items()))
+
+def convert_soup_to_amp(soup):
+    """
+    Menerapkan semua aturan konversi AMP pada soup dalam satu kali penelusuran (soup diubah
+    di tempat) lalu mengembalikan HTML-nya. Isi elemen yang dihapus tidak ditelusuri.
+    """
+    stack = [soup]
+    while stack:
+        node = stack.pop()
+        for child in list(node.children):
+            if not isinstance(child, Tag):
+                continue
+            if is_removed_for_amp(child.name, child.get('type')):
+                child.decompose()
+            elif child.name == 'img':
+                child.replace_with(soup.new_tag('amp-img', attrs=build_amp_img_attrs(child.attrs)))
+            else:
+                # Atribut style inline dilarang di AMP; id dihapus dari elemen non-AMP untuk mencegah konflik
+                child.attrs.pop('style', None)
+                if not child.name.startswith('amp-'):
+                    child.attrs.pop('id', None)
+                stack.append(child)
+    return str(soup)
+
+def parse_html_fragment_lxml(html_content):
+    """Mem-parse potongan HTML dengan lxml; hasilnya dibungkus satu elemen <div>."""
+    return lxml.html.fragment_fromstring(html_content, create_parent='div')
+
+def get_text_lxml(root):
+    """Teks bersih dari pohon lxml, setara soup.get_text(separator=' ', strip=True)."""
+    parts = []
+    skip_depth = 0
+    for event, element in lxml.etree.iterwalk(root, events=('start', 'end', 'comment')):
+        if event == 'comment':
+            text = element.tail # Isi komentar bukan teks
+        elif event == 'start':
+            if element.tag in NON_TEXT_TAGS:
+                skip_depth += 1
+            text = element.text if not skip_depth else None
+        else:
+            if element.tag in NON_TEXT_TAGS:
+                skip_depth -= 1
+            text = element.tail if element is not root and not skip_depth else None
+        if text:
+            text = text.strip()
+            if text:
+                parts.append(text)
+    return ' '.join(parts)
+
+def get_first_image_src_lxml(root):
+    first_img = root.find('.//img')
+    return first_img.get('src', "") if first_img is not None else ""
+
+def convert_lxml_to_amp(root):
+    """
+    Versi lxml dari convert_soup_to_amp: aturan yang sama dalam satu kali penelusuran,
+    diserialisasi oleh lxml (entitas tetap ter-escape dengan benar). Pohon diubah di tempat.
+    """
+    stack = [root]
+    unwrapped = []
+    while stack:
+        node = stack.pop()
+        for child in list(node):
+            if not isinstance(child.tag, str):
+                continue # Komentar dan processing instruction
+            if is_removed_for_amp(child.tag, child.get('type')):
+                if child.tag in LXML_CONTAINER_VOID_TAGS:
+                    unwrapped.append(child) # Isinya sebenarnya konten setelah elemen: tetap dikonversi
+                    stack.append(child)
+                else:
+                    child.drop_tree() # Teks setelah elemen (tail) tetap dipertahankan
+            elif child.tag == 'img':
+                amp_attrs = build_amp_img_attrs(child.attrib)
+                child.attrib.clear()
+                child.attrib.update(amp_attrs)
+                child.tag = 'amp-img'
+            else:
+                child.attrib.pop('style', None)
+                if not child.tag.startswith('amp-'):
+                    child.attrib.pop('id', None)
+                stack.append(child)
+    for element in reversed(unwrapped): # Elemen terdalam dulu
+        element.drop_tag()
+    markup = lxml.html.tostring(root, encoding='unicode', method='html')
+    return markup[len('<div>'):-len('</div>')] # Lepas pembungkus dari parse_html_fragment_lxml
+
+def generate_breadcrumbs_data(post_title, post_labels, base_url, label_slugs=None):
+    """Menghasilkan struktur breadcrumbs untuk JSON-LD. `label_slugs` (opsional) berisi slug label yang sudah dihitung."""
     breadcrumbs = [
         {"@type": "ListItem", "position": 1, "name": "Home", "item": base_url}
     ]
@@ -107,7 +476,7 @@ def generate_breadcrumbs_data(post_title, post_labels, base_url):
             "@type": "ListItem",
             "position": 2,
             "name": main_label,
-            "item": f"{base_url}/{slugify(main_label)}.html"
+            "item": f"{base_url}/{label_slugs[main_label] if label_slugs else slugify(main_label)}.html"
         })
         breadcrumbs.append({
             "@type": "ListItem",
@@ -131,127 +500,2244 @@ def get_post_image_url(post_data):
     
     # Fallback: coba ekstrak dari konten jika tidak ada di 'images' API field
     soup = BeautifulSoup(post_data.get('content', ''), 'html.parser')
+    return get_first_image_src(soup)
+
+def get_first_image_src(soup):
+    """Mengambil src dari tag img pertama di dalam soup."""
     first_img = soup.find('img')
     if first_img and 'src' in first_img.attrs:
         return first_img['src']
     return "" # Mengembalikan string kosong jika tidak ditemukan gambar
 
-def get_blogger_data(api_key, blog_id):
-    """Mengambil semua postingan dari Blogger API."""
-    all_posts = []
+def preprocess_content_bs4(html_content):
+    """Mengembalikan (teks, src gambar pertama, body AMP) dari konten HTML memakai BeautifulSoup."""
+    with phase_timer('parse'):
+        soup = BeautifulSoup(html_content, 'html.parser')
+        # Teks dan gambar diambil sebelum konversi AMP karena konversi mengubah soup
+        text = soup.get_text(separator=' ', strip=True) if html_content else ""
+        first_image_src = get_first_image_src(soup)
+    with phase_timer('amp'):
+        amp_content = convert_soup_to_amp(soup) if html_content else ""
+    return text, first_image_src, amp_content
+
+def preprocess_content_lxml(html_content):
+    """Seperti preprocess_content_bs4 memakai lxml. Mengembalikan None jika lxml gagal mem-parse konten."""
+    try:
+        with phase_timer('parse'):
+            root = parse_html_fragment_lxml(html_content)
+            text = get_text_lxml(root)
+            first_image_src = get_first_image_src_lxml(root)
+        with phase_timer('amp'):
+            amp_content = convert_lxml_to_amp(root)
+    except (lxml.etree.LxmlError, ValueError):
+        increment_counter('amp_lxml_fallbacks')
+        return None
+    return text, first_image_src, amp_content
+
+def preprocess_content(html_content):
+    """Snippet, src gambar pertama, dan body AMP dari konten HTML dengan backend yang aktif."""
+    content = None
+    if html_content and get_amp_backend() == 'lxml':
+        content = preprocess_content_lxml(html_content)
+    if content is None:
+        content = preprocess_content_bs4(html_content)
+    text, first_image_src, amp_content = content
+    return {
+        'snippet': build_snippet_from_text(text),
+        'first_image': first_image_src,
+        'amp': amp_content,
+        'search_terms': get_search_terms(text),
+    }
+
+def preprocess_post(post_data):
+    """
+    Mem-parse konten postingan satu kali dan menghasilkan record berisi snippet,
+    URL gambar utama, dan body AMP. Semua renderer halaman membaca dari record ini
+    sehingga HTML setiap postingan hanya di-parse sekali per build; dengan cache AMP,
+    konten yang sudah pernah diproses tidak di-parse sama sekali.
+    """
+    html_content = post_data.get('content', '')
+    cache_key = None
+    if AMP_CACHE_ENABLED and html_content:
+        # Ukuran gambar ikut menentukan body AMP sehingga menjadi bagian dari kunci cache
+        image_sizes = [(url, _IMAGE_SIZES[url]) for url in get_content_image_urls(html_content) if url in _IMAGE_SIZES]
+        cache_key = get_amp_cache_key(html_content, image_sizes)
+    content = load_cached_content(cache_key) if cache_key else None
+    if content is not None:
+        increment_counter('amp_cache_hits')
+    else:
+        content = preprocess_content(html_content)
+        if cache_key:
+            increment_counter('amp_cache_misses')
+            save_cached_content(cache_key, content)
+    if 'images' in post_data and post_data['images']:
+        image_url = post_data['images'][0]['url']
+    else:
+        image_url = content['first_image']
+    increment_counter('posts_processed')
+
+    return {
+        'snippet': content['snippet'],
+        'image': image_url,
+        'image_size': _IMAGE_SIZES.get(image_url),
+        'amp': content['amp'],
+        'search_terms': content['search_terms'],
+    }
+
+# --- Cache Konversi AMP ---
+
+def get_amp_cache_key(html_content, image_sizes=()):
+    """
+    Kunci cache: hash konten HTML dan identitas konverter (backend + versi), ditambah ukuran
+    gambar yang diketahui (list (URL, (lebar, tinggi))) jika ada.
+    """
+    if not image_sizes:
+        return compute_hash(get_amp_converter_id(), str(AMP_CACHE_FORMAT), html_content)
+    return compute_hash(get_amp_converter_id(), str(AMP_CACHE_FORMAT), html_content, json.dumps(image_sizes))
+
+def get_amp_cache_path(cache_key):
+    # Dua karakter pertama hash sebagai subdirektori agar satu direktori tidak berisi puluhan ribu file
+    return os.path.join(AMP_CACHE_DIR, cache_key[:2], cache_key + ".json")
+
+def load_cached_content(cache_key):
+    """
+    Membaca hasil preprocess_content dari cache. Mengembalikan None jika entri tidak ada atau
+    rusak. mtime entri diperbarui sebagai penanda pemakaian terakhir untuk eviction LRU.
+    """
+    path = get_amp_cache_path(cache_key)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            content = json.load(f)
+        os.utime(path)
+    except (OSError, ValueError):
+        return None
+    return content
+
+def save_cached_content(cache_key, content):
+    """Menyimpan hasil preprocess_content secara atomik (aman ditulis bersamaan oleh beberapa worker)."""
+    path = get_amp_cache_path(cache_key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(content, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def prune_amp_cache(max_bytes=AMP_CACHE_MAX_BYTES):
+    """
+    Eviction LRU: menghapus entri dengan mtime (pemakaian terakhir) tertua sampai ukuran total
+    cache tidak melebihi `max_bytes`. Mengembalikan jumlah entri yang dihapus.
+    """
+    entries = []
+    total_bytes = 0
+    for dirpath, _, filenames in os.walk(AMP_CACHE_DIR):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total_bytes += stat.st_size
+    if total_bytes <= max_bytes:
+        return 0
+    entries.sort()
+    removed = 0
+    for _, size, path in entries:
+        if total_bytes <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total_bytes -= size
+        removed += 1
+    return removed
+
+# --- Metadata Gambar ---
+
+_IMAGE_SIZES = {} # URL -> (lebar, tinggi) untuk build ini; diatur oleh init_preprocess_worker
+
+_IMG_SRC_RE = re.compile(r'<img\b[^>]*?\ssrc\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))', re.IGNORECASE)
+
+def init_preprocess_worker(image_sizes):
+    """Initializer worker pra-pemrosesan: menyimpan ukuran gambar untuk build_amp_img_attrs."""
+    global _IMAGE_SIZES
+    _IMAGE_SIZES = image_sizes
+
+def get_content_image_urls(html_content):
+    """URL src semua tag img di konten HTML (entitas sudah di-decode, seperti hasil parser)."""
+    return [html.unescape(next(filter(None, match.groups()), "")) for match in _IMG_SRC_RE.finditer(html_content)]
+
+def get_post_image_urls(post_data):
+    """URL gambar yang dipakai sebuah postingan: gambar dari field 'images' API dan gambar di konten."""
+    urls = get_content_image_urls(post_data.get('content', ''))
+    if post_data.get('images'):
+        urls.append(post_data['images'][0]['url'])
+    return urls
+
+def get_image_sizes_hash(urls, image_sizes):
+    """Hash ukuran (hasil probe) gambar-gambar sebuah postingan; gambar yang ukurannya tidak diketahui ikut dicatat."""
+    return compute_hash(*(f"{url}\0{image_sizes.get(url)}" for url in urls))
+
+def parse_image_size(data):
+    """
+    Membaca (lebar, tinggi) dari byte awal file PNG, GIF, JPEG, WebP, atau BMP. Mengembalikan
+    None jika `data` belum cukup panjang; ValueError jika formatnya tidak dikenali.
+    """
+    if len(data) < 12:
+        return None
+    if data.startswith(b'\x89PNG\r\n\x1a\n'):
+        if len(data) < 24:
+            return None
+        return int.from_bytes(data[16:20], 'big'), int.from_bytes(data[20:24], 'big')
+    if data[:6] in (b'GIF87a', b'GIF89a'):
+        return int.from_bytes(data[6:8], 'little'), int.from_bytes(data[8:10], 'little')
+    if data.startswith(b'BM'):
+        if len(data) < 26:
+            return None
+        return int.from_bytes(data[18:22], 'little', signed=True), abs(int.from_bytes(data[22:26], 'little', signed=True))
+    if data.startswith(b'RIFF') and data[8:12] == b'WEBP':
+        if len(data) < 30:
+            return None
+        chunk = data[12:16]
+        if chunk == b'VP8 ':
+            return int.from_bytes(data[26:28], 'little') & 0x3FFF, int.from_bytes(data[28:30], 'little') & 0x3FFF
+        if chunk == b'VP8L':
+            bits = int.from_bytes(data[21:25], 'little')
+            return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        if chunk == b'VP8X':
+            return int.from_bytes(data[24:27], 'little') + 1, int.from_bytes(data[27:30], 'little') + 1
+        raise ValueError("Chunk WebP tidak dikenali")
+    if data.startswith(b'\xff\xd8'):
+        # Telusuri segmen JPEG sampai marker SOF (Start Of Frame) yang berisi dimensi
+        pos = 2
+        while pos + 9 <= len(data):
+            if data[pos] != 0xFF:
+                raise ValueError("Struktur JPEG tidak valid")
+            marker = data[pos + 1]
+            if marker == 0xFF: # Byte pengisi
+                pos += 1
+                continue
+            if marker in (0x01, 0xD8) or 0xD0 <= marker <= 0xD7: # Marker tanpa panjang segmen
+                pos += 2
+                continue
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                return int.from_bytes(data[pos + 7:pos + 9], 'big'), int.from_bytes(data[pos + 5:pos + 7], 'big')
+            pos += 2 + int.from_bytes(data[pos + 2:pos + 4], 'big')
+        return None
+    raise ValueError("Format gambar tidak dikenali")
+
+def iter_image_bytes(session, url):
+    """
+    Fetcher bawaan untuk probe_image_size: menghasilkan byte gambar per potongan. URL http(s)
+    diminta dengan header Range dan dibaca secara streaming; URL file:// dan path relatif situs
+    (mis. /images/a.png, dicari di OUTPUT_DIR) dibaca dari disk.
+    """
+    if url.startswith('//'):
+        url = 'https:' + url
+    if url.startswith(('http://', 'https://')):
+        response = session.get(url, headers={'Range': f"bytes=0-{IMAGE_PROBE_MAX_BYTES - 1}"},
+                               stream=True, timeout=IMAGE_PROBE_TIMEOUT)
+        try:
+            response.raise_for_status()
+            yield from response.iter_content(IMAGE_PROBE_CHUNK_BYTES)
+        finally:
+            response.close()
+        return
+    path = url[len('file://'):] if url.startswith('file://') else os.path.join(OUTPUT_DIR, url.lstrip('/'))
+    with open(path, 'rb') as f:
+        yield from iter(functools.partial(f.read, IMAGE_PROBE_CHUNK_BYTES), b'')
+
+def probe_image_size(url, fetcher):
+    """
+    Ukuran (lebar, tinggi) gambar di `url`, dibaca dari potongan byte yang dihasilkan
+    `fetcher(url)` sampai header-nya cukup. Mengembalikan None jika gagal.
+    """
+    data = bytearray()
+    try:
+        chunks = fetcher(url)
+        try:
+            for chunk in chunks:
+                data += chunk
+                size = parse_image_size(data)
+                if size:
+                    return size if size[0] > 0 and size[1] > 0 else None
+                if len(data) >= IMAGE_PROBE_MAX_BYTES:
+                    break
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close() # Hentikan unduhan begitu header terbaca
+    except (OSError, ValueError, requests.exceptions.RequestException):
+        return None
+    return None
+
+def load_image_size_cache():
+    """Memuat cache ukuran gambar: {'sizes': URL -> [lebar, tinggi], 'failed': URL -> waktu gagal}."""
+    try:
+        with open(IMAGE_SIZE_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except FileNotFoundError:
+        return {'sizes': {}, 'failed': {}}
+    except json.JSONDecodeError:
+        print(f"Peringatan: Cache ukuran gambar '{IMAGE_SIZE_CACHE_FILE}' rusak. Semua gambar diperiksa ulang.")
+        return {'sizes': {}, 'failed': {}}
+    return cache
+
+def save_image_size_cache(cache):
+    """Menyimpan cache ukuran gambar secara atomik."""
+    os.makedirs(BUILD_CACHE_DIR, exist_ok=True)
+    tmp_path = IMAGE_SIZE_CACHE_FILE + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp_path, IMAGE_SIZE_CACHE_FILE)
+
+def probe_image_sizes(urls, fetcher=None, concurrency=IMAGE_PROBE_CONCURRENCY):
+    """
+    Mengembalikan dict URL -> (lebar, tinggi) untuk `urls` yang ukurannya bisa diketahui.
+    URL yang belum ada di cache persisten diperiksa secara paralel (maksimal `concurrency`
+    sekaligus). `fetcher(url)` menghasilkan potongan byte gambar; default iter_image_bytes.
+    Gambar yang gagal diperiksa baru dicoba lagi setelah IMAGE_PROBE_RETRY_DAYS hari.
+    """
+    urls = [url for url in dict.fromkeys(urls) if url] # Unik, urutan dipertahankan
+    cache = load_image_size_cache()
+    sizes, failed = cache['sizes'], cache['failed']
+    now = time.time()
+    pending = [
+        url for url in urls
+        if url not in sizes and now - failed.get(url, 0) > IMAGE_PROBE_RETRY_DAYS * 86400
+    ]
+    if pending:
+        log(f"Memeriksa ukuran {len(pending)} gambar...")
+        if fetcher is None:
+            fetcher = functools.partial(iter_image_bytes, create_http_session(concurrency))
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = iter_progress(pool.map(lambda url: probe_image_size(url, fetcher), pending), len(pending), "Gambar")
+            for url, size in zip(pending, results):
+                if size:
+                    sizes[url] = list(size)
+                    failed.pop(url, None)
+                    increment_counter('images_probed')
+                else:
+                    failed[url] = now
+                    increment_counter('image_probe_failures')
+        save_image_size_cache(cache)
+    return {url: tuple(sizes[url]) for url in urls if url in sizes}
+
+def get_thumbnail_size(image_size, box_size):
+    """(lebar, tinggi) thumbnail selebar `box_size` dengan rasio aspek gambar asli jika diketahui."""
+    if not image_size:
+        return box_size
+    width = box_size[0]
+    return width, max(1, round(width * image_size[1] / image_size[0]))
+
+# --- Pengambilan Data dari Blogger API ---
+
+def create_http_session(pool_size=FETCH_CONCURRENCY):
+    """Membuat requests.Session dengan connection pool (keep-alive) untuk semua request API."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def get_retry_delay(response, attempt):
+    """
+    Jeda sebelum percobaan ulang: Retry-After dari server (maksimal FETCH_MAX_RETRY_AFTER),
+    atau exponential backoff dengan jitter.
+    """
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), FETCH_MAX_RETRY_AFTER)
+    return FETCH_BACKOFF_BASE * (2 ** attempt) + random.uniform(0, FETCH_BACKOFF_BASE)
+
+def fetch_json(session, url, params):
+    """
+    GET ke Blogger API dan mengembalikan JSON-nya. Error jaringan, timeout, serta status
+    429/5xx dicoba ulang hingga FETCH_MAX_RETRIES kali dengan exponential backoff.
+    Exception `requests` diteruskan ke pemanggil jika semua percobaan gagal.
+    """
+    for attempt in range(FETCH_MAX_RETRIES + 1):
+        response = None
+        try:
+            increment_counter('api_requests')
+            response = session.get(url, params=params, timeout=FETCH_TIMEOUT)
+            if response.status_code not in FETCH_RETRY_STATUS_CODES:
+                response.raise_for_status() # Akan memicu HTTPError untuk status kode 4xx/5xx
+                return response.json()
+            if attempt == FETCH_MAX_RETRIES:
+                response.raise_for_status()
+            reason = f"HTTP {response.status_code}"
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            if attempt == FETCH_MAX_RETRIES:
+                raise
+            reason = type(e).__name__
+        delay = get_retry_delay(response, attempt)
+        increment_counter('api_retries')
+        print(f"  > {reason}, percobaan ulang {attempt + 1}/{FETCH_MAX_RETRIES} dalam {delay:.1f} detik...")
+        time.sleep(delay)
+
+def get_checkpoint_path(checkpoint_key):
+    """Path file checkpoint (JSON-lines, satu baris per halaman API) untuk sebuah listing."""
+    return os.path.join(FETCH_CHECKPOINT_DIR, f"{checkpoint_key}.jsonl")
+
+def get_oldest_checkpoint_time():
+    """
+    Waktu (RFC 3339) pengambilan halaman tertua di semua checkpoint, atau None jika tidak ada
+    checkpoint. Halaman dari checkpoint versi lama (tanpa waktu) dianggap diambil pada epoch.
+    """
+    oldest, oldest_dt = None, None
+    if not os.path.isdir(FETCH_CHECKPOINT_DIR):
+        return None
+    for filename in os.listdir(FETCH_CHECKPOINT_DIR):
+        with open(os.path.join(FETCH_CHECKPOINT_DIR, filename), 'r', encoding='utf-8') as f:
+            first_line = f.readline() # Halaman ditambahkan berurutan: baris pertama yang tertua
+        try:
+            fetched_at = json.loads(first_line).get('fetched_at', "1970-01-01T00:00:00Z")
+        except json.JSONDecodeError:
+            continue # Baris terpotong tidak pernah diputar ulang
+        fetched_dt = parse_rfc3339(fetched_at)
+        if oldest_dt is None or fetched_dt < oldest_dt:
+            oldest, oldest_dt = fetched_at, fetched_dt
+    return oldest
+
+def iter_blogger_pages(session, api_key, blog_id, extra_params=None, fields=BLOGGER_POST_FIELDS, checkpoint_key=None):
+    """
+    Generator yang mengambil postingan dari Blogger API halaman demi halaman.
+    Jika `checkpoint_key` diberikan, setiap halaman yang selesai dicatat ke checkpoint beserta
+    waktu pengambilannya; run berikutnya memutar ulang halaman tersebut dan melanjutkan dari
+    pageToken terakhir (lihat get_oldest_checkpoint_time untuk dampaknya pada sinkronisasi delta).
+    Exception dari `requests` diteruskan ke pemanggil.
+    """
+    url = f"{BLOGGER_API_BASE}/blogs/{blog_id}/posts"
     next_page_token = None
-    
-    print("Mengambil data dari Blogger API...")
+    checkpoint_path = get_checkpoint_path(checkpoint_key) if checkpoint_key else None
+
+    if checkpoint_path and os.path.exists(checkpoint_path):
+        with open(checkpoint_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    page = json.loads(line)
+                except json.JSONDecodeError:
+                    break # Baris terakhir terpotong; lanjutkan dari halaman sebelumnya
+                yield page['items']
+                next_page_token = page['next_page_token']
+                if not next_page_token:
+                    return # Listing ini sudah selesai pada run sebelumnya
 
     while True:
-        url = f"https://www.googleapis.com/blogger/v3/blogs/{blog_id}/posts"
         params = {
             "key": api_key,
             "fetchImages": True,
             "maxResults": 500, # Max per request
-            "fields": "items(id,title,url,published,updated,content,labels,images,author(displayName)),nextPageToken"
+            "fields": f"items({fields}),nextPageToken"
         }
+        if extra_params:
+            params.update(extra_params)
         if next_page_token:
             params["pageToken"] = next_page_token
 
+        fetched_at = datetime.now(timezone.utc).isoformat() # Sebelum request: edit setelahnya tidak termuat
+        data = fetch_json(session, url, params)
+        items = data.get("items", [])
+        next_page_token = data.get("nextPageToken")
+        if checkpoint_path:
+            os.makedirs(FETCH_CHECKPOINT_DIR, exist_ok=True)
+            page = {"items": items, "next_page_token": next_page_token, "fetched_at": fetched_at}
+            with open(checkpoint_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(page, ensure_ascii=False) + "\n")
+        yield items
+
+        if not next_page_token:
+            break # Tidak ada halaman lagi
+
+def build_fetch_windows(session, api_key, blog_id):
+    """
+    Membagi rentang waktu blog menjadi jendela tanggal (startDate, endDate) yang bisa diambil
+    secara paralel. Batas jendela berpatokan pada tanggal blog dibuat agar tetap sama antar run
+    (penting untuk checkpoint). Jendela terlama tidak memiliki startDate dan jendela terbaru tidak
+    memiliki endDate (None), sehingga postingan bertanggal sebelum blog dibuat (impor, tanggal mundur)
+    atau di masa depan tetap terambil. Jika tanggal blog tidak diketahui, dipakai satu jendela saja.
+    """
+    try:
+        blog = fetch_json(session, f"{BLOGGER_API_BASE}/blogs/{blog_id}", {"key": api_key, "fields": "published"})
+        window_start = parse_rfc3339(blog['published'])
+    except (requests.exceptions.RequestException, KeyError, ValueError) as e:
+        print(f"Peringatan: Tanggal pembuatan blog tidak bisa diambil ({e}). Mengambil tanpa jendela tanggal.")
+        return [None]
+
+    now = datetime.now(timezone.utc)
+    window_size = timedelta(days=FETCH_WINDOW_DAYS)
+    windows = []
+    while window_start <= now:
+        windows.append((window_start.isoformat(), (window_start + window_size).isoformat()))
+        window_start += window_size
+    if not windows:
+        return [None]
+    windows.reverse() # Jendela terbaru dulu, sesuai urutan default API
+    windows[0] = (windows[0][0], None)
+    windows[-1] = (None, windows[-1][1])
+    return windows
+
+def iter_windowed_listing(session, api_key, blog_id, windows, extra_params=None, fields=BLOGGER_POST_FIELDS,
+                          concurrency=None):
+    """
+    Mengambil listing postingan per jendela tanggal secara paralel, dengan checkpoint per halaman.
+    Paling banyak `concurrency` (default FETCH_CONCURRENCY) jendela diambil bersamaan, dan halaman
+    yang diterima langsung ditulis ke checkpoint tanpa ditampung di memori. Generator yang
+    menghasilkan postingan unik sesuai urutan jendela: jendela yang sudah selesai dibaca ulang
+    dari checkpoint-nya halaman demi halaman.
+    """
+    concurrency = concurrency or FETCH_CONCURRENCY
+
+    def iter_window_pages(window):
+        window_params = dict(extra_params or {})
+        if window and window[0]:
+            window_params['startDate'] = window[0]
+        if window and window[1]:
+            window_params['endDate'] = window[1]
+        checkpoint_key = compute_hash(blog_id, fields, json.dumps(window_params, sort_keys=True))[:16]
+        return iter_blogger_pages(session, api_key, blog_id, window_params, fields, checkpoint_key)
+
+    def fetch_window(window):
+        for _ in iter_window_pages(window):
+            pass # Halaman sudah tersimpan di checkpoint
+
+    seen_ids = set()
+    queued = collections.deque() # (jendela, future) sesuai urutan, belum dihasilkan
+    next_window = 0
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while queued or next_window < len(windows):
+            in_flight = {future for _, future in queued if not future.done()}
+            while len(in_flight) < concurrency and next_window < len(windows):
+                future = pool.submit(fetch_window, windows[next_window])
+                queued.append((windows[next_window], future))
+                in_flight.add(future)
+                next_window += 1
+            if not queued[0][1].done():
+                wait(in_flight, return_when=FIRST_COMPLETED)
+            while queued and queued[0][1].done():
+                window, future = queued.popleft()
+                future.result() # Meneruskan exception dari thread pengambil
+                window_post_count = 0
+                for posts_batch in iter_window_pages(window):
+                    for post in posts_batch:
+                        if post['id'] not in seen_ids: # Postingan di batas jendela bisa muncul dua kali
+                            seen_ids.add(post['id'])
+                            window_post_count += 1
+                            yield post
+                if window_post_count:
+                    log(f"  > Mengambil {window_post_count} postingan. Total: {len(seen_ids)}")
+
+def clear_fetch_checkpoints():
+    """Menghapus checkpoint setelah listing berhasil diambil seluruhnya."""
+    shutil.rmtree(FETCH_CHECKPOINT_DIR, ignore_errors=True)
+
+def download_posts_to_store(api_key, blog_id, session=None):
+    """
+    Mengambil semua postingan dari Blogger API langsung ke post store, tanpa menampung
+    seluruh blog di memori. Mengembalikan state sinkronisasi, atau None jika gagal
+    (post store lama tidak berubah).
+    """
+    session = session or create_http_session()
+
+    log("Mengambil data dari Blogger API...")
+
+    try:
+        windows = build_fetch_windows(session, api_key, blog_id)
+        state = save_post_store(iter_windowed_listing(session, api_key, blog_id, windows))
+        # Halaman yang diputar ulang dari checkpoint run sebelumnya bisa sudah usang: sinkronisasi
+        # delta berikutnya harus mengambil ulang semua yang diperbarui sejak halaman tertua diambil
+        oldest_checkpoint = get_oldest_checkpoint_time()
+        if (oldest_checkpoint and state['last_updated']
+                and parse_rfc3339(oldest_checkpoint) < parse_rfc3339(state['last_updated'])):
+            state['last_updated'] = oldest_checkpoint
+    except requests.exceptions.HTTPError as e:
+        print(f"Error HTTP: {e.response.status_code} - {e.response.text}")
+        print(f"Halaman yang sudah diambil tersimpan di '{FETCH_CHECKPOINT_DIR}' dan akan dilanjutkan pada run berikutnya.")
+        return None
+    except requests.exceptions.RequestException as e:
+        print(f"Error jaringan atau request: {e}")
+        print(f"Halaman yang sudah diambil tersimpan di '{FETCH_CHECKPOINT_DIR}' dan akan dilanjutkan pada run berikutnya.")
+        return None
+
+    clear_fetch_checkpoints()
+    log(f"Total {state['post_count']} postingan berhasil diambil.")
+    return state
+
+def get_blogger_updated_posts(api_key, blog_id, since, session=None):
+    """
+    Mengambil hanya postingan yang diperbarui sejak `since` (RFC 3339).
+    Postingan diurutkan berdasarkan `updated` (terbaru dulu), sehingga pengambilan
+    berhenti begitu bertemu postingan yang lebih lama dari `since`. Parameter startDate
+    tidak dipakai: API memfilternya berdasarkan tanggal publikasi, sehingga postingan
+    lama yang baru diedit akan terlewat.
+    """
+    session = session or create_http_session()
+    since_dt = parse_rfc3339(since)
+    updated_posts = []
+    extra_params = {"orderBy": "updated"}
+
+    try:
+        for posts_batch in iter_blogger_pages(session, api_key, blog_id, extra_params):
+            fresh = [p for p in posts_batch if parse_rfc3339(p['updated']) >= since_dt]
+            updated_posts.extend(fresh)
+            if len(fresh) < len(posts_batch):
+                break # Sisa halaman berisi postingan yang lebih lama
+    except requests.exceptions.HTTPError as e:
+        print(f"Error HTTP: {e.response.status_code} - {e.response.text}")
+        return None
+    except requests.exceptions.RequestException as e:
+        print(f"Error jaringan atau request: {e}")
+        return None
+
+    return updated_posts
+
+def get_blogger_post_ids(api_key, blog_id, session=None):
+    """
+    Mengambil daftar ID semua postingan live (tanpa konten) untuk mendeteksi penghapusan.
+    Memakai satu listing tanpa jendela tanggal: postingan yang tidak tercakup jendela mana pun
+    akan dianggap terhapus, jadi daftar ini tidak boleh bergantung pada batas jendela.
+    """
+    session = session or create_http_session()
+    extra_params = {"fetchBodies": False, "fetchImages": False}
+    post_ids = set()
+
+    try:
+        for posts_batch in iter_blogger_pages(session, api_key, blog_id, extra_params, fields="id"):
+            post_ids.update(p['id'] for p in posts_batch)
+    except requests.exceptions.HTTPError as e:
+        print(f"Error HTTP: {e.response.status_code} - {e.response.text}")
+        return None
+    except requests.exceptions.RequestException as e:
+        print(f"Error jaringan atau request: {e}")
+        return None
+
+    return post_ids
+
+# --- Penyimpanan Postingan Lokal (Post Store) ---
+
+def parse_rfc3339(timestamp):
+    """Mengubah timestamp RFC 3339 dari Blogger menjadi datetime (dengan zona waktu)."""
+    return datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+
+def iter_post_store():
+    """Membaca postingan dari post store (JSON-lines) satu per satu."""
+    if not os.path.exists(POST_STORE_FILE):
+        return
+    with open(POST_STORE_FILE, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def save_post_store(posts):
+    """
+    Menulis ulang post store secara atomik dari iterable postingan (boleh generator; postingan
+    ditulis satu per satu). Mengembalikan state sinkronisasi untuk save_sync_state: high-water
+    mark `updated` dan jumlah postingan.
+    """
+    os.makedirs(BUILD_CACHE_DIR, exist_ok=True)
+    tmp_path = POST_STORE_FILE + ".tmp"
+    latest, latest_dt, post_count = None, None, 0
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for post in posts:
+            f.write(json.dumps(post, ensure_ascii=False))
+            f.write("\n")
+            post_count += 1
+            updated_dt = parse_rfc3339(post['updated'])
+            if latest_dt is None or updated_dt > latest_dt:
+                latest, latest_dt = post['updated'], updated_dt
+    os.replace(tmp_path, POST_STORE_FILE)
+    return {"last_updated": latest, "post_count": post_count}
+
+def post_store_exists():
+    return os.path.exists(POST_STORE_FILE) and os.path.getsize(POST_STORE_FILE) > 0
+
+def load_sync_state():
+    """Memuat state sinkronisasi terakhir (jika ada)."""
+    if not os.path.exists(SYNC_STATE_FILE):
+        return None
+    with open(SYNC_STATE_FILE, 'r', encoding='utf-8') as f:
         try:
-            response = requests.get(url, params=params)
-            response.raise_for_status() # Akan memicu HTTPError untuk status kode 4xx/5xx
-            data = response.json()
-            
-            posts_batch = data.get("items", [])
-            all_posts.extend(posts_batch)
-            print(f"  > Mengambil {len(posts_batch)} postingan. Total: {len(all_posts)}")
-
-            next_page_token = data.get("nextPageToken")
-            if not next_page_token:
-                break # Tidak ada halaman lagi
-
-        except requests.exceptions.HTTPError as e:
-            print(f"Error HTTP: {e.response.status_code} - {e.response.text}")
-            return None # Kembalikan None untuk mengindikasikan kegagalan
-        except requests.exceptions.RequestException as e:
-            print(f"Error jaringan atau request: {e}")
+            return json.load(f)
+        except json.JSONDecodeError:
+            print(f"Peringatan: File state '{SYNC_STATE_FILE}' rusak. Melakukan sinkronisasi penuh.")
             return None
-    
-    print(f"Total {len(all_posts)} postingan berhasil diambil.")
-    return all_posts
+
+def save_sync_state(state):
+    """Menyimpan state sinkronisasi (hasil save_post_store) secara atomik."""
+    os.makedirs(BUILD_CACHE_DIR, exist_ok=True)
+    write_file_atomic(SYNC_STATE_FILE, json.dumps(state, indent=4).encode('utf-8'))
+
+def sync_post_store(api_key, blog_id, full_sync=False):
+    """
+    Menyinkronkan post store lokal dengan Blogger API. Mengembalikan True jika post store
+    siap dipakai untuk build.
+
+    Sinkronisasi delta hanya mengunduh postingan yang diperbarui sejak sinkronisasi
+    terakhir, ditambah daftar ID (tanpa konten) untuk mendeteksi postingan yang dihapus.
+    Postingan ditulis dan digabung ke store secara streaming, sehingga konten seluruh blog
+    tidak pernah ditampung di memori. Jika API gagal, isi post store yang ada tetap dipakai
+    agar situs masih bisa dibangun.
+    """
+    state = load_sync_state()
+    session = create_http_session()
+
+    if full_sync or not state or not state.get('last_updated') or not post_store_exists():
+        new_state = download_posts_to_store(api_key, blog_id, session)
+        if new_state is None:
+            if post_store_exists():
+                print("Peringatan: Sinkronisasi penuh gagal. Menggunakan post store lokal.")
+                return True
+            return False
+        save_sync_state(new_state)
+        increment_counter('posts_fetched', new_state['post_count'])
+        return True
+
+    log(f"Sinkronisasi delta dari Blogger API (sejak {state['last_updated']})...")
+    updated_posts = get_blogger_updated_posts(api_key, blog_id, state['last_updated'], session)
+    live_ids = get_blogger_post_ids(api_key, blog_id, session) if updated_posts is not None else None
+    if updated_posts is None or live_ids is None:
+        print("Peringatan: Sinkronisasi delta gagal. Menggunakan post store lokal.")
+        return True
+
+    # Postingan yang diperbarui menggantikan versi lamanya di posisi yang sama; postingan baru di akhir
+    updated_by_id = {p['id']: p for p in updated_posts}
+    deleted_ids = []
+    def merge_posts():
+        for post in iter_post_store():
+            if post['id'] in updated_by_id:
+                yield updated_by_id.pop(post['id'])
+            elif post['id'] in live_ids:
+                yield post
+            else:
+                deleted_ids.append(post['id'])
+        yield from updated_by_id.values()
+
+    new_state = save_post_store(merge_posts())
+    save_sync_state(new_state)
+    increment_counter('posts_fetched', len(updated_posts))
+    increment_counter('posts_deleted', len(deleted_ids))
+    log(f"  > {len(updated_posts)} postingan baru/diperbarui, {len(deleted_ids)} dihapus. Total: {new_state['post_count']}")
+    return True
+
+def sync_posts(api_key, blog_id, full_sync=False):
+    """
+    Menyinkronkan post store (lihat sync_post_store) lalu mengembalikan semua postingan,
+    atau None jika tidak ada postingan yang bisa dipakai.
+    """
+    if not sync_post_store(api_key, blog_id, full_sync):
+        return None
+    return list(iter_post_store())
+
+# --- Model Postingan ---
+
+class Post:
+    """
+    Metadata satu postingan untuk renderer, dibangun sekali per build dari item Blogger API.
+    Slug, permalink, tanggal, dan label dihitung di sini sehingga loop halaman index, label,
+    dan postingan terkait tidak memanggil slugify atau mem-parse tanggal berulang kali.
+    Konten HTML tidak ikut disimpan; snippet, thumbnail, dan ukuran asli thumbnail (jika
+    diketahui) diisi setelah pra-pemrosesan. `image_sizes_hash` diisi build_site jika gambar
+    diperiksa (--probe-images).
+    """
+    __slots__ = ('id', 'title', 'slug', 'permalink', 'published', 'published_date', 'updated',
+                 'author_name', 'labels', 'label_ids', 'content_hash', 'image_sizes_hash', 'snippet', 'thumbnail',
+                 'thumbnail_size')
+
+    def __init__(self, post_data, label_ids, content_hash):
+        """`label_ids` adalah tabel label -> ID (int) bersama untuk satu build dan diisi di sini."""
+        self.id = post_data['id']
+        self.title = post_data['title']
+        self.slug = slugify(self.title)
+        self.permalink = f"/{self.slug}-{self.id}.html"
+        self.published = post_data['published']
+        self.published_date = datetime.strptime(self.published.split('T')[0], '%Y-%m-%d').strftime('%Y-%m-%d')
+        self.updated = post_data['updated']
+        self.author_name = post_data['author']['displayName']
+        self.labels = tuple(sys.intern(label) for label in post_data.get('labels', []))
+        self.label_ids = tuple(label_ids.setdefault(label, len(label_ids)) for label in self.labels)
+        self.content_hash = content_hash
+        self.image_sizes_hash = None
+        self.snippet = None
+        self.thumbnail = None
+        self.thumbnail_size = None
+
+    def __repr__(self):
+        return f"Post({self.id!r}, {self.title!r})"
+
+def get_post_render_hash(post):
+    """
+    Hash input sebuah postingan untuk signature halaman yang menampilkannya: hash konten, ditambah
+    ukuran gambar hasil probe (dimensi amp-img dan thumbnail) jika gambar diperiksa.
+    """
+    if post.image_sizes_hash is None:
+        return post.content_hash
+    return compute_hash(post.content_hash, post.image_sizes_hash)
+
+def apply_post_record(post, record):
+    """Menyalin snippet dan thumbnail hasil preprocess_post ke model postingan."""
+    post.snippet = record['snippet']
+    post.thumbnail = record['image']
+    post.thumbnail_size = record['image_size']
+
+# --- Optimasi CSS ---
+
+# At-rule yang berisi aturan bertingkat dan ikut di-tree-shake
+CSS_GROUPING_AT_RULES = ('@media', '@supports', '@document')
+# Class yang ditambahkan runtime AMP saat halaman berjalan; aturan untuknya selalu dipertahankan
+CSS_RUNTIME_CLASS_PREFIXES = ('i-amphtml', 'amp-')
+
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+_CSS_PSEUDO_RE = re.compile(r'::?[\w-]+(\([^)]*\))?')
+_CSS_ATTRIBUTE_RE = re.compile(r'\[[^\]]*\]')
+_CSS_COMBINATOR_RE = re.compile(r'\s*([>+~,])\s*')
+_HTML_TAG_RE = re.compile(r'<([a-zA-Z][\w-]*)')
+_HTML_CLASS_RE = re.compile(r'\sclass=["\']([^"\']*)["\']')
+_HTML_ID_RE = re.compile(r'\sid=["\']([^"\']*)["\']')
+
+def minify_css_selector(selector):
+    """Merapikan selector: spasi berlebih dan spasi di sekitar kombinator dihapus."""
+    return _CSS_COMBINATOR_RE.sub(r'\1', ' '.join(selector.split()))
+
+def minify_css_declarations(declarations):
+    """Merapikan blok deklarasi menjadi 'prop:nilai;prop:nilai'."""
+    minified = []
+    for declaration in declarations.split(';'):
+        prop, sep, value = declaration.partition(':')
+        if sep and prop.strip():
+            minified.append(f"{prop.strip()}:{' '.join(value.split())}")
+    return ';'.join(minified)
+
+def get_selector_tokens(selector):
+    """Mengembalikan (tag, class, id) yang dibutuhkan sebuah selector agar cocok dengan halaman."""
+    simplified = _CSS_ATTRIBUTE_RE.sub(' ', _CSS_PSEUDO_RE.sub(' ', selector))
+    tags, classes, ids = set(), set(), set()
+    for compound in re.split(r'[\s>+~]+', simplified):
+        tag_match = re.match(r'[a-zA-Z][\w-]*', compound)
+        if tag_match:
+            tags.add(tag_match.group(0).lower())
+        classes.update(re.findall(r'\.([\w-]+)', compound))
+        ids.update(re.findall(r'#([\w-]+)', compound))
+    classes = {c for c in classes if not c.startswith(CSS_RUNTIME_CLASS_PREFIXES)}
+    return frozenset(tags), frozenset(classes), frozenset(ids)
+
+def parse_css(css, pos=0):
+    """
+    Mem-parse CSS menjadi daftar node yang sudah diminifikasi:
+    ('rule', [(selector, tokens), ...], deklarasi), ('group', prelude, [node, ...]) untuk
+    @media/@supports, dan ('raw', teks) untuk at-rule lain (@font-face, @keyframes, @import).
+    Mengembalikan (nodes, posisi akhir).
+    """
+    if pos == 0:
+        css = _CSS_COMMENT_RE.sub('', css)
+    nodes = []
+    while True:
+        brace = css.find('{', pos)
+        close = css.find('}', pos)
+        if close != -1 and (brace == -1 or close < brace):
+            return nodes, close + 1 # Akhir dari blok induk
+        if brace == -1:
+            return nodes, len(css)
+
+        prelude = css[pos:brace]
+        # Pernyataan tanpa blok seperti @import/@charset yang mendahului aturan ini
+        statements, _, prelude = prelude.rpartition(';')
+        for statement in statements.split(';'):
+            if statement.strip():
+                nodes.append(('raw', ' '.join(statement.split()) + ';'))
+        prelude = ' '.join(prelude.split())
+
+        if prelude.lower().startswith(CSS_GROUPING_AT_RULES):
+            children, pos = parse_css(css, brace + 1)
+            nodes.append(('group', prelude, children))
+        elif prelude.startswith('@'):
+            # Blok at-rule lain (mis. @keyframes yang bertingkat) disalin utuh
+            depth, end = 0, brace
+            while end < len(css):
+                if css[end] == '{':
+                    depth += 1
+                elif css[end] == '}':
+                    depth -= 1
+                    if depth == 0:
+                        break
+                end += 1
+            body = css[brace:end + 1]
+            nodes.append(('raw', prelude + ' '.join(body.split())))
+            pos = end + 1
+        else:
+            end = css.find('}', brace)
+            if end == -1:
+                end = len(css)
+            selectors = [minify_css_selector(sel) for sel in prelude.split(',') if sel.strip()]
+            nodes.append(('rule', [(sel, get_selector_tokens(sel)) for sel in selectors],
+                          minify_css_declarations(css[brace + 1:end])))
+            pos = end + 1
+
+def serialize_css(nodes, used=None):
+    """
+    Menyusun kembali CSS minified dari node hasil parse_css. Jika `used` berisi
+    (tag, class, id) yang dipakai halaman, selector yang tidak cocok dibuang (tree-shaking).
+    """
+    parts = []
+    for node in nodes:
+        if node[0] == 'raw':
+            parts.append(node[1])
+        elif node[0] == 'group':
+            children_css = serialize_css(node[2], used)
+            if children_css:
+                parts.append(f"{node[1]}{{{children_css}}}")
+        else:
+            _, selectors, declarations = node
+            if used is not None:
+                used_tags, used_classes, used_ids = used
+                selectors = [
+                    (sel, (tags, classes, ids)) for sel, (tags, classes, ids) in selectors
+                    if tags <= used_tags and classes <= used_classes and ids <= used_ids
+                ]
+            if selectors and declarations:
+                parts.append(f"{','.join(sel for sel, _ in selectors)}{{{declarations}}}")
+    return ''.join(parts)
+
+def get_html_vocabulary(html):
+    """Mengumpulkan tag, class, dan id yang muncul di sebuah potongan HTML."""
+    tags = {tag.lower() for tag in _HTML_TAG_RE.findall(html)}
+    tags.update(('html', 'head', 'body', '*'))
+    classes = set()
+    for class_attr in _HTML_CLASS_RE.findall(html):
+        classes.update(class_attr.split())
+    ids = set()
+    for id_attr in _HTML_ID_RE.findall(html):
+        ids.update(id_attr.split())
+    return frozenset(tags), frozenset(classes), frozenset(ids)
+
+def prepare_css(custom_css_content):
+    """Mem-parse dan meminifikasi CSS kustom sekali per build."""
+    css_nodes, _ = parse_css(custom_css_content)
+    minified_css = serialize_css(css_nodes)
+    log(f"CSS diminifikasi: {len(custom_css_content.encode('utf-8'))} -> {len(minified_css.encode('utf-8'))} byte.")
+    return {'nodes': css_nodes, 'minified': minified_css, 'shaken': {}}
+
+def get_page_css(ctx, page_kind, variable_html):
+    """
+    CSS untuk satu halaman: CSS minified yang hanya berisi selector yang dipakai oleh
+    template jenis halaman tersebut (dan konten artikelnya). Hasil di-cache per kosakata
+    HTML sehingga halaman dengan struktur sama hanya diproses sekali. Halaman yang CSS-nya
+    melebihi AMP_CSS_BUDGET_BYTES dihitung di counter 'css_over_budget_pages'.
+    """
+    css = ctx['css']
+    if not CSS_TREE_SHAKING:
+        page_css = css['minified']
+    else:
+        skeleton_used = ctx['page_vocabulary'][page_kind]
+        variable_used = get_html_vocabulary(variable_html)
+        used = tuple(a | b for a, b in zip(skeleton_used, variable_used))
+        page_css = css['shaken'].get(used)
+        if page_css is None:
+            page_css = css['shaken'][used] = serialize_css(css['nodes'], used)
+            increment_counter('css_tree_shakes')
+    css_size = len(page_css.encode('utf-8'))
+    if css_size > AMP_CSS_BUDGET_BYTES:
+        increment_counter('css_over_budget_pages')
+    return page_css
+
+# --- Template ---
+#
+# Template HTML berada di TEMPLATE_DIR. Sintaksnya sengaja kecil:
+#   {{ nama }}                 -> slot yang diisi saat render (tanpa escaping, sama seperti f-string sebelumnya)
+#   {% include "file.html" %}  -> disisipkan saat template dimuat
+# Template dikompilasi menjadi list [literal, slot, literal, ..., literal]. Bagian yang sama untuk
+# semua halaman (header, sidebar, footer) diisi sekali per build dengan bind_template, sehingga
+# render per halaman hanya menggabungkan literal besar dengan beberapa nilai variabel.
+
+_TEMPLATE_SLOT_RE = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+_TEMPLATE_INCLUDE_RE = re.compile(r'\{%\s*include\s+"([^"]+)"\s*%\}')
+
+def read_template_source(name, template_dir=TEMPLATE_DIR):
+    """Membaca sumber template beserta include-nya. Satu baris baru di akhir file diabaikan."""
+    with open(os.path.join(template_dir, name), 'r', encoding='utf-8') as f:
+        source = f.read()
+    if source.endswith('\n'):
+        source = source[:-1]
+    return _TEMPLATE_INCLUDE_RE.sub(lambda m: read_template_source(m.group(1), template_dir), source)
+
+def compile_template(source):
+    """Mengompilasi sumber template menjadi list [literal, slot, literal, ..., literal]."""
+    return _TEMPLATE_SLOT_RE.split(source)
+
+def bind_template(parts, **values):
+    """Mengisi sebagian slot sekarang dan menggabungkan literal yang berdampingan."""
+    bound = [parts[0]]
+    for i in range(1, len(parts), 2):
+        if parts[i] in values:
+            bound[-1] += str(values[parts[i]]) + parts[i + 1]
+        else:
+            bound.extend((parts[i], parts[i + 1]))
+    return bound
+
+def render_template(parts, **values):
+    """Merender template terkompilasi. Slot yang tidak diberi nilai memicu KeyError."""
+    rendered = [parts[0]]
+    for i in range(1, len(parts), 2):
+        rendered.append(str(values[parts[i]]))
+        rendered.append(parts[i + 1])
+    return ''.join(rendered)
+
+def load_templates(template_dir=TEMPLATE_DIR):
+    """Memuat dan mengompilasi semua template (file berawalan '_' hanya dipakai lewat include)."""
+    templates = {}
+    for filename in sorted(os.listdir(template_dir)):
+        if filename.endswith('.html') and not filename.startswith('_'):
+            templates[filename[:-len('.html')]] = compile_template(read_template_source(filename, template_dir))
+    return templates
+
+def get_template_literal_text(parts):
+    """Gabungan semua bagian literal template (dipakai untuk kosakata CSS halaman)."""
+    return ''.join(parts[0::2])
 
 # --- Fungsi untuk Membangun Bagian HTML ---
 
-def build_head_content(page_title, canonical_url, custom_css_content):
-    """Membangun bagian <head> dari dokumen HTML."""
-    head_html = f"""
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1, minimum-scale=1">
-    <link rel="canonical" href="{canonical_url}">
-    <title>{page_title}</title>
+def select_sidebar_labels(label_counts, limit):
+    """`limit` label dengan postingan terbanyak (seri diurutkan per nama), diurutkan menurut nama."""
+    if len(label_counts) <= limit:
+        return sorted(label_counts)
+    return sorted(sorted(label_counts, key=lambda label: (-label_counts[label], label))[:limit])
+
+def build_header_and_sidebar(sidebar_labels, label_slugs, current_blog_name, templates, directory_url=None):
+    """
+    Membangun bagian header dan sidebar navigasi (dengan tautan ke direktori label jika ada).
+    `label_slugs` adalah tabel label -> slug yang sudah dihitung (ctx['label_slugs']).
+    """
+    label_links = "".join(
+        render_template(templates['sidebar_label'], url=f"/{label_slugs[label]}.html", label=label)
+        for label in sidebar_labels
+    )
+    if directory_url:
+        label_links += render_template(templates['sidebar_label_directory'], url=directory_url)
+    return render_template(templates['header_sidebar'], blog_name=current_blog_name, label_links=label_links)
+
+def build_footer(current_blog_name, base_site_url, templates):
+    """Membangun bagian footer."""
+    return render_template(templates['footer'], year=datetime.now().year, blog_name=current_blog_name)
+
+# --- Fungsi untuk Build Inkremental ---
+
+def compute_hash(*parts):
+    """Menghitung hash SHA-256 dari beberapa bagian string."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def compute_post_hash(post):
+    """Menghitung hash konten dari data mentah sebuah postingan."""
+    return compute_hash(json.dumps(post, sort_keys=True, ensure_ascii=False))
+
+def load_build_manifest():
+    """Memuat manifest build sebelumnya. Mengembalikan None jika tidak ada atau tidak valid."""
+    if not os.path.exists(BUILD_MANIFEST_FILE):
+        return None
+    with open(BUILD_MANIFEST_FILE, 'r', encoding='utf-8') as f:
+        try:
+            manifest = json.load(f)
+        except json.JSONDecodeError:
+            print(f"Peringatan: Manifest build '{BUILD_MANIFEST_FILE}' rusak. Melakukan build penuh.")
+            return None
+    if manifest.get('version') != BUILD_MANIFEST_VERSION:
+        return None
+    return manifest
+
+def save_build_manifest(manifest):
+    """Menyimpan manifest build secara atomik."""
+    os.makedirs(BUILD_CACHE_DIR, exist_ok=True)
+    tmp_path = BUILD_MANIFEST_FILE + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, BUILD_MANIFEST_FILE)
+
+# --- Ledger Publikasi ---
+
+def open_ledger(path=None):
+    """Membuka ledger publikasi (default LEDGER_FILE; dibuat dan dimigrasikan dari published_posts.json jika perlu)."""
+    path = path or LEDGER_FILE
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute("CREATE TABLE IF NOT EXISTS posts (id TEXT PRIMARY KEY, updated TEXT, content_hash TEXT, "
+                     "output_path TEXT, signature TEXT, output_hash TEXT) WITHOUT ROWID")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID")
+        # Ledger versi lama hanya punya ID, updated, dan hash konten: kolom halaman artikel ditambahkan kosong
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(posts)")}
+        for column in LEDGER_PAGE_COLUMNS:
+            if column not in columns:
+                conn.execute(f"ALTER TABLE posts ADD COLUMN {column} TEXT")
+    migrate_published_posts(conn)
+    return conn
+
+def migrate_published_posts(conn, legacy_file=None):
+    """
+    Migrasi satu kali: ID di `legacy_file` (list JSON, default LEGACY_PUBLISHED_POSTS_FILE) dicatat di
+    ledger tanpa updated/hash, sehingga build berikutnya melengkapinya. Mengembalikan jumlah ID yang dimigrasikan.
+    """
+    legacy_file = legacy_file or LEGACY_PUBLISHED_POSTS_FILE
+    if conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_migrated'").fetchone():
+        return 0
+    try:
+        with open(legacy_file, 'r', encoding='utf-8') as f:
+            post_ids = [str(post_id) for post_id in json.load(f)]
+    except FileNotFoundError:
+        post_ids = []
+    except (json.JSONDecodeError, TypeError):
+        print(f"Peringatan: '{legacy_file}' rusak dan tidak dimigrasikan ke ledger.")
+        post_ids = []
+    with conn:
+        conn.executemany("INSERT OR IGNORE INTO posts (id) VALUES (?)", ((post_id,) for post_id in post_ids))
+        conn.execute("INSERT INTO meta (key, value) VALUES ('legacy_migrated', ?)", (legacy_file,))
+    if post_ids:
+        log(f"Ledger: {len(post_ids)} ID dari '{legacy_file}' dimigrasikan.")
+    return len(post_ids)
+
+def get_ledger_entries(conn, posts):
+    """
+    Baris ledger postingan di `posts` yang sudah tercatat, dicari satu per satu lewat primary key:
+    ID -> (updated, hash konten, path output, signature, hash isi halaman artikel).
+    """
+    entries = {}
+    for p in posts:
+        entry = conn.execute("SELECT updated, content_hash, output_path, signature, output_hash FROM posts WHERE id = ?",
+                             (p.id,)).fetchone()
+        if entry is not None:
+            entries[p.id] = entry
+    return entries
+
+def get_removed_ledger_entries(conn, posts, entries):
+    """
+    Postingan di ledger yang sudah tidak ada di `posts`: list (ID, path output). `entries` adalah hasil
+    get_ledger_entries; jika jumlah baris ledger sama dengan jumlahnya, tidak ada yang dihapus dan
+    ledger tidak perlu dibaca lebih jauh.
+    """
+    if conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0] == len(entries):
+        return []
+    with conn:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS current_posts (id TEXT PRIMARY KEY) WITHOUT ROWID")
+        conn.execute("DELETE FROM current_posts")
+        conn.executemany("INSERT INTO current_posts (id) VALUES (?)", ((p.id,) for p in posts))
+    return conn.execute("SELECT id, output_path FROM posts WHERE id NOT IN (SELECT id FROM current_posts)").fetchall()
+
+def commit_ledger(conn, rows, removed_ids):
+    """
+    Mencatat `rows` ((ID, updated, hash konten, path output, signature, hash isi)) dan menghapus
+    `removed_ids` dalam satu transaksi: ledger tidak pernah setengah diperbarui. Pemanggil hanya
+    mengirim baris yang berubah; baris postingan lain tidak disentuh.
+    """
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO posts (id, updated, content_hash, output_path, signature, output_hash) "
+                         "VALUES (?, ?, ?, ?, ?, ?)", rows)
+        conn.executemany("DELETE FROM posts WHERE id = ?", ((post_id,) for post_id in removed_ids))
+
+def get_template_source_hash():
+    """Hash dari semua input template: file di TEMPLATE_DIR dan skrip ini sendiri."""
+    sources = []
+    for filename in sorted(os.listdir(TEMPLATE_DIR)):
+        with open(os.path.join(TEMPLATE_DIR, filename), 'r', encoding='utf-8') as f:
+            sources.append(filename + "\n" + f.read())
+    with open(os.path.abspath(__file__), 'r', encoding='utf-8') as f:
+        sources.append(f.read())
+    return compute_hash(*sources)
+
+def build_label_index(sorted_posts, label_count):
+    """
+    Membangun inverted index ID label -> daftar postingan (urut dari yang terbaru),
+    beserta posisi setiap postingan di dalam daftar label tersebut. Keduanya berupa
+    list yang diindeks dengan ID label (lihat Post.label_ids).
+    """
+    posts_by_label = [[] for _ in range(label_count)]
+    label_positions = [{} for _ in range(label_count)]
+    for p in sorted_posts:
+        for label_id in p.label_ids:
+            label_posts = posts_by_label[label_id]
+            positions = label_positions[label_id]
+            if p.id not in positions:
+                positions[p.id] = len(label_posts)
+                label_posts.append(p)
+    return posts_by_label, label_positions
+
+def select_related_by_label_order(post, label_index, limit):
+    """
+    Strategi default: untuk setiap label postingan (sesuai urutan), ambil postingan
+    terbaru dengan label tersebut hingga `limit` postingan terkumpul.
+    """
+    related_posts = []
+    seen_ids = {post.id}
+    for label_id in post.label_ids:
+        for p_related in label_index['posts_by_label'][label_id]:
+            if p_related.id not in seen_ids:
+                seen_ids.add(p_related.id)
+                related_posts.append(p_related)
+                if len(related_posts) >= limit:
+                    return related_posts
+    return related_posts
+
+def select_related_by_shared_labels(post, label_index, limit):
+    """
+    Skor = jumlah label yang sama, dibobot kedekatan waktu publikasi dengan postingan ini.
+    Kandidat dibatasi pada RELATED_CANDIDATES_PER_LABEL tetangga terdekat di setiap
+    daftar label, sehingga biayanya tetap hampir linear untuk blog yang sangat besar.
+    """
+    post_ranks = label_index['post_ranks']
+    post_rank = post_ranks[post.id]
+    shared_counts = {}
+    candidates = {}
+    for label_id in set(post.label_ids):
+        label_posts = label_index['posts_by_label'][label_id]
+        position = label_index['label_positions'][label_id][post.id]
+        window_start = max(0, position - RELATED_CANDIDATES_PER_LABEL)
+        for p_related in label_posts[window_start:position + RELATED_CANDIDATES_PER_LABEL + 1]:
+            if p_related.id != post.id:
+                shared_counts[p_related.id] = shared_counts.get(p_related.id, 0) + 1
+                candidates[p_related.id] = p_related
+
+    def sort_key(post_id):
+        distance = abs(post_ranks[post_id] - post_rank)
+        recency_weight = 1 / (1 + distance / RELATED_RECENCY_HALF_LIFE)
+        return (-shared_counts[post_id] * recency_weight, distance, post_ranks[post_id])
+
+    return [candidates[post_id] for post_id in heapq.nsmallest(limit, candidates, key=sort_key)]
+
+# Strategi pemilihan postingan terkait yang tersedia (lihat --related-scoring)
+RELATED_POSTS_SCORERS = {
+    'label-order': select_related_by_label_order,
+    'shared-labels': select_related_by_shared_labels,
+}
+
+# --- Fungsi untuk Merender Halaman ---
+
+def build_post_item_html(ctx, p):
+    """Membangun satu item daftar postingan (dipakai halaman index dan label)."""
+    templates = ctx['templates']
+    thumbnail_tag = ""
+    if p.thumbnail:
+        width, height = get_thumbnail_size(p.thumbnail_size, POST_THUMBNAIL_SIZE)
+        thumbnail_tag = render_template(templates['post_thumbnail'], image=p.thumbnail, title=p.title,
+                                        width=width, height=height)
+
+    return render_template(
+        templates['post_item'],
+        thumbnail=thumbnail_tag,
+        permalink=p.permalink,
+        title=p.title,
+        snippet=p.snippet,
+        published_date=p.published_date,
+    )
+
+def count_pages(item_count, per_page):
+    """Jumlah halaman yang dibutuhkan untuk `item_count` item."""
+    return (item_count + per_page - 1) // per_page
+
+# Nomor halaman bergantung pada PAGINATION_SCHEME. 'newest': 1..N dari postingan terbaru (halaman 1
+# adalah halaman depan). 'stable': 0 adalah halaman depan, 1..N adalah arsip dari postingan terlama.
+# Daftar postingan selalu diurutkan dari yang terbaru.
+
+def get_page_filename(base_name, page_num, scheme=None):
+    """Nama file halaman ke-`page_num` dari daftar berpaginasi (index.html, index_p2.html / index_a1.html, ...)."""
+    scheme = scheme or PAGINATION_SCHEME
+    if scheme == 'stable':
+        return f"{base_name}.html" if page_num == 0 else f"{base_name}_a{page_num}.html"
+    return f"{base_name}.html" if page_num == 1 else f"{base_name}_p{page_num}.html"
+
+def get_page_nums(item_count, per_page):
+    """Nomor semua halaman untuk daftar berisi `item_count` item; halaman depan selalu yang pertama."""
+    if PAGINATION_SCHEME == 'stable':
+        return [0] + list(range(1, item_count // per_page + 1)) if item_count else []
+    return list(range(1, count_pages(item_count, per_page) + 1))
+
+def get_page_range(item_count, per_page, page_num):
+    """Rentang indeks [awal, akhir) item halaman `page_num` dalam daftar yang diurutkan dari yang terbaru."""
+    if PAGINATION_SCHEME == 'stable' and page_num > 0:
+        end = item_count - (page_num - 1) * per_page
+        return end - per_page, end
+    page_num = max(page_num, 1)
+    return (page_num - 1) * per_page, page_num * per_page
+
+def get_page_links(item_count, per_page, page_num, scheme=None):
+    """
+    (nomor tampilan, halaman lebih baru, halaman lebih lama) untuk halaman `page_num`. Halaman
+    tetangga bernilai None jika tidak ada. Pada skema 'stable' halaman depan menautkan ke arsip
+    terbaru yang tidak seluruhnya sudah tampil di halaman depan.
+    """
+    if (scheme or PAGINATION_SCHEME) != 'stable':
+        total_pages = count_pages(item_count, per_page)
+        return page_num, page_num - 1 if page_num > 1 else None, page_num + 1 if page_num < total_pages else None
+    full_pages = item_count // per_page
+    if page_num == 0:
+        older = full_pages if item_count % per_page else full_pages - 1
+        return count_pages(item_count, per_page), None, older if older > 0 else None
+    return page_num, page_num + 1 if page_num < full_pages else 0, page_num - 1 if page_num > 1 else None
+
+def build_pagination_html(ctx, base_name, page_num, item_count, per_page=None, scheme=None):
+    """Membangun navigasi paginasi (Sebelumnya / nomor halaman / Selanjutnya)."""
+    templates = ctx['templates']
+    display_num, newer_page, older_page = get_page_links(item_count, per_page or ctx['posts_per_page'], page_num, scheme)
+    prev_link = ""
+    if newer_page is not None:
+        prev_link = render_template(templates['pagination_prev'], url=f"/{get_page_filename(base_name, newer_page, scheme)}")
+    next_link = ""
+    if older_page is not None:
+        next_link = render_template(templates['pagination_next'], url=f"/{get_page_filename(base_name, older_page, scheme)}")
+    return render_template(templates['pagination'], prev_link=prev_link, page_num=display_num, next_link=next_link)
 
-    <style amp-boilerplate>body{{-webkit-animation:-amp-start 8s steps(1,end) 0s 1 normal both;-moz-animation:-amp-start 8s steps(1,end) 0s 1 normal both;-ms-animation:-amp-start 8s steps(1,end) 0s 1 normal both;animation:-amp-start 8s steps(1,end) 0s 1 normal both}}@-webkit-keyframes -amp-start{{from{{visibility:hidden}}to{{visibility:visible}}}}@-moz-keyframes -amp-start{{from{{visibility:hidden}}to{{visibility:visible}}}}@-ms-keyframes -amp-start{{from{{visibility:hidden}}to{{visibility:visible}}}}@-o-keyframes -amp-start{{from{{visibility:hidden}}to{{visibility:visible}}}}@keyframes -amp-start{{from{{visibility:hidden}}to{{visibility:visible}}}}</style><noscript><style amp-boilerplate>body{{-webkit-animation:none;-moz-animation:none;-ms-animation:none;animation:none}}</style></noscript>
-    <script async src="https://cdn.ampproject.org/v0.js"></script>
+def get_legacy_page_redirects(base_name, item_count, per_page):
+    """
+    Pada skema 'stable': (nama file lama, nama file tujuan) untuk setiap halaman skema 'newest'
+    (base_p2.html, ...). Tujuannya adalah halaman yang sekarang memuat postingan teratas halaman lama.
+    """
+    if PAGINATION_SCHEME != 'stable' or not PAGINATION_REDIRECTS:
+        return []
+    full_pages = item_count // per_page
+    redirects = []
+    for page_num in range(2, count_pages(item_count, per_page) + 1):
+        # Posisi (dari yang terlama) postingan teratas halaman lama, lalu arsip yang memuatnya
+        archive_num = (item_count - (page_num - 1) * per_page - 1) // per_page + 1
+        target = get_page_filename(base_name, archive_num if archive_num <= full_pages else 0)
+        redirects.append((get_page_filename(base_name, page_num, scheme='newest'), target))
+    return redirects
+
+def render_redirect_page(ctx, target):
+    """HTML halaman redirect (meta refresh + canonical) ke file `target` di OUTPUT_DIR."""
+    return render_template(ctx['templates']['redirect'], title=BLOG_NAME,
+                           canonical_url=f"{BASE_SITE_URL}/{target}", url=f"/{target}")
+
+def render_index_page(ctx, page_num):
+    """Merender satu halaman index. Mengembalikan (nama file, HTML)."""
+    sorted_posts = ctx['sorted_posts']
+    start_idx, end_idx = get_page_range(len(sorted_posts), ctx['posts_per_page'], page_num)
+    paginated_posts = sorted_posts[start_idx:end_idx]
 
-    <script async custom-element="amp-sidebar" src="https://cdn.ampproject.org/v0/amp-sidebar-0.1.js"></script>
+    post_items = ''.join(build_post_item_html(ctx, p) for p in paginated_posts)
+    pagination_html = build_pagination_html(ctx, "index", page_num, len(sorted_posts))
+    display_num = get_page_links(len(sorted_posts), ctx['posts_per_page'], page_num)[0]
+
+    # Tentukan permalink halaman index saat ini untuk canonical
+    output_filename = get_page_filename("index", page_num)
+
+    html = render_template(
+        ctx['page_templates']['index'],
+        page_title=f"Beranda {BLOG_NAME} - Halaman {display_num}",
+        canonical_url=f"{BASE_SITE_URL}/{output_filename}",
+        custom_css=get_page_css(ctx, 'index', post_items + pagination_html),
+        post_items=post_items,
+        pagination=pagination_html,
+    )
+    return output_filename, html
+
+def render_article_page(ctx, post, amp_content):
+    """Merender halaman artikel individual dengan body AMP-nya. Mengembalikan (nama file, HTML)."""
+    templates = ctx['templates']
+    permalink_rel = post.permalink
+    permalink_abs = f"{BASE_SITE_URL}{permalink_rel}"
+    post_labels = post.labels
     
-    <script async custom-element="amp-carousel" src="https://cdn.ampproject.org/v0/amp-carousel-0.1.js"></script>
+    # Related Posts (Ambil 3 postingan lain dari label yang sama, jika ada)
+    related_posts_html = ""
+    related_posts = ctx['related_posts'][post.id]
+    if related_posts:
+        related_items_html = []
+        for rp in related_posts:
+            rp_thumbnail_tag = ""
+            if rp.thumbnail:
+                width, height = get_thumbnail_size(rp.thumbnail_size, RELATED_THUMBNAIL_SIZE)
+                rp_thumbnail_tag = render_template(templates['related_thumbnail'], image=rp.thumbnail, title=rp.title,
+                                                   width=width, height=height)
+            related_items_html.append(render_template(
+                templates['related_item'], thumbnail=rp_thumbnail_tag, permalink=rp.permalink, title=rp.title
+            ))
+        related_posts_html = render_template(templates['related_posts'], related_items=''.join(related_items_html))
+
+    # HTML untuk Breadcrumbs di halaman
+    breadcrumbs_data = generate_breadcrumbs_data(post.title, post_labels, BASE_SITE_URL, ctx['label_slugs'])
+    breadcrumbs_list_items = []
+    for item in breadcrumbs_data:
+        if item["item"]:
+            breadcrumbs_list_items.append(render_template(
+                templates['breadcrumb_link'], url=item["item"], name=item["name"], position=item["position"]
+            ))
+        else: # Item terakhir (artikel saat ini) tidak memiliki link
+            breadcrumbs_list_items.append(render_template(
+                templates['breadcrumb_current'], name=item["name"], position=item["position"]
+            ))
+    breadcrumbs_nav_html = render_template(templates['breadcrumbs'], items=''.join(breadcrumbs_list_items))
 
-    <style amp-custom>
-        {custom_css_content}
-    </style>
+    # HTML untuk labels di bawah artikel
+    labels_html = ""
+    if post_labels:
+        labels_links = [render_template(templates['label_link'], url=f"/{ctx['label_slugs'][label]}.html", label=label) for label in post_labels]
+        labels_html = render_template(templates['article_labels'], label_links=', '.join(labels_links))
+
+    # JSON-LD untuk artikel (string di-escape untuk JSON)
+    json_ld_script = render_template(
+        templates['article_json_ld'],
+        title=json.dumps(post.title)[1:-1],
+        image=post.thumbnail,
+        url=permalink_abs,
+        published=post.published,
+        updated=post.updated,
+        author_name=json.dumps(post.author_name)[1:-1],
+        blog_name=json.dumps(BLOG_NAME)[1:-1],
+        base_url=BASE_SITE_URL,
+        description=json.dumps(post.snippet)[1:-1],
+        article_body=json.dumps(amp_content).replace('\\n', ' ').replace('\\r', '')[1:-1],
+    )
+
+    page_values = dict(
+        breadcrumbs=breadcrumbs_nav_html,
+        json_ld=json_ld_script,
+        title=post.title,
+        published_date=post.published_date,
+        author_name=post.author_name,
+        labels=labels_html,
+        amp_content=amp_content,
+        related_posts=related_posts_html,
+    )
+    variable_html = breadcrumbs_nav_html + labels_html + amp_content + related_posts_html
+    html = render_template(
+        ctx['page_templates']['article'],
+        page_title=f"{post.title} - {BLOG_NAME}",
+        canonical_url=permalink_abs,
+        custom_css=get_page_css(ctx, 'article', variable_html),
+        **page_values,
+    )
+    return permalink_rel.lstrip('/'), html
+
+def iter_label_pages(ctx, label_name, page_nums=None):
     """
-    return head_html
+    Generator halaman label berpaginasi: menghasilkan (nama file, HTML) satu halaman
+    per langkah, sehingga seluruh HTML sebuah label tidak pernah ditampung sekaligus.
+    Jika `page_nums` diberikan, hanya halaman dengan nomor tersebut yang dirender.
+    """
+    label_slug = ctx['label_slugs'][label_name]
+    label_posts = ctx['posts_by_label'][label_name]
+    posts_per_page = ctx['posts_per_page']
+    all_page_nums = get_page_nums(len(label_posts), posts_per_page)
+
+    for page_num in all_page_nums:
+        if page_nums is not None and page_num not in page_nums:
+            continue
+        output_filename = get_page_filename(label_slug, page_num)
+        start_idx, end_idx = get_page_range(len(label_posts), posts_per_page, page_num)
+        post_items = ''.join(build_post_item_html(ctx, p) for p in label_posts[start_idx:end_idx])
+
+        # Navigasi paginasi hanya untuk label yang lebih dari satu halaman
+        pagination_html = ""
+        if len(label_posts) > posts_per_page:
+            pagination_html = build_pagination_html(ctx, label_slug, page_num, len(label_posts))
+
+        page_title = f"Label: {label_name} - {BLOG_NAME}"
+        if page_num != all_page_nums[0]:
+            page_title += f" - Halaman {page_num}"
 
-def build_header_and_sidebar(all_labels, current_blog_name):
-    """Membangun bagian header dan sidebar navigasi."""
-    header_html = f"""
-    <header class="header">
-        <button on="tap:sidebar-menu.toggle" class="hamburger" aria-label="Open navigation">☰</button>
-        <h1><a href="/">{current_blog_name}</a></h1>
-    </header>
+        yield output_filename, render_template(
+            ctx['page_templates']['label'],
+            page_title=page_title,
+            canonical_url=f"{BASE_SITE_URL}/{output_filename}",
+            custom_css=get_page_css(ctx, 'label', post_items + pagination_html),
+            label_name=label_name,
+            post_items=post_items,
+            pagination=pagination_html,
+        )
+
+def get_label_directory_letter(label):
+    """Huruf kelompok label di direktori label: huruf awal tanpa aksen, atau '#' untuk selain A-Z."""
+    letter = unicodedata.normalize('NFKD', label[:1]).encode('ascii', 'ignore').decode('ascii').upper()
+    return letter if 'A' <= letter <= 'Z' else '#'
+
+def get_label_directory_page(ctx, page_num):
+    """Label di halaman direktori ke-`page_num` (urut per huruf kelompok lalu nama)."""
+    return ctx['label_directory'][(page_num - 1) * LABELS_PER_DIRECTORY_PAGE:page_num * LABELS_PER_DIRECTORY_PAGE]
+
+def render_label_directory_page(ctx, page_num):
+    """Merender satu halaman direktori label. Mengembalikan (nama file, HTML)."""
+    templates = ctx['templates']
+    groups = {}
+    for label in get_label_directory_page(ctx, page_num):
+        groups.setdefault(get_label_directory_letter(label), []).append(render_template(
+            templates['label_directory_item'], url=f"/{ctx['label_slugs'][label]}.html", label=label,
+            count=len(ctx['posts_by_label'][label])
+        ))
+    groups_html = ''.join(
+        render_template(templates['label_directory_group'], letter=letter, items=''.join(items))
+        for letter, items in groups.items()
+    )
+    pagination_html = ""
+    if len(ctx['label_directory']) > LABELS_PER_DIRECTORY_PAGE:
+        pagination_html = build_pagination_html(ctx, LABEL_DIRECTORY_NAME, page_num, len(ctx['label_directory']),
+                                                LABELS_PER_DIRECTORY_PAGE, scheme='newest')
 
-    <amp-sidebar id="sidebar-menu" layout="nodisplay" side="left">
-        <button on="tap:sidebar-menu.toggle" class="close-button" aria-label="Close navigation">✕</button>
-        <ul>
-            <li><a href="/">Beranda</a></li>
-            {"".join([f'<li><a href="/{slugify(label)}.html">{label}</a></li>' for label in all_labels])}
-        </ul>
-    </amp-sidebar>
+    output_filename = get_page_filename(LABEL_DIRECTORY_NAME, page_num, scheme='newest')
+    page_title = f"Semua Label - {BLOG_NAME}"
+    if page_num > 1:
+        page_title += f" - Halaman {page_num}"
+    html = render_template(
+        ctx['page_templates']['label_directory'],
+        page_title=page_title,
+        canonical_url=f"{BASE_SITE_URL}/{output_filename}",
+        custom_css=get_page_css(ctx, 'label_directory', groups_html + pagination_html),
+        groups=groups_html,
+        pagination=pagination_html,
+    )
+    return output_filename, html
+
+def write_file_atomic(path, data):
+    """Menulis ke file sementara di direktori yang sama lalu me-rename-nya: file tidak pernah setengah tertulis."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+def write_output_file(output_filename, html, previous_hash=None):
     """
-    return header_html
+    Menulis satu halaman ke direktori output (diminifikasi terlebih dahulu jika HTML_MINIFY) dan
+    mengembalikan hash isinya. Jika hash sama dengan `previous_hash` (dari manifest output build
+    sebelumnya) dan ukuran file yang ada cocok, file tidak ditulis ulang sehingga mtime-nya tetap.
+    """
+    output_path = os.path.join(OUTPUT_DIR, output_filename)
+    if HTML_MINIFY:
+        with phase_timer('minify'):
+            html = minify_html(html)
+    data = html.encode('utf-8')
+    content_hash = hashlib.sha256(data).hexdigest()
+    with phase_timer('write'):
+        if content_hash == previous_hash and get_file_size(output_path) == len(data):
+            increment_counter('pages_unchanged')
+            return content_hash
+        write_file_atomic(output_path, data)
+    increment_counter('pages_written')
+    increment_counter('bytes_written', len(data))
+    return content_hash
 
-def build_footer(current_blog_name, base_site_url):
-    """Membangun bagian footer."""
-    footer_html = f"""
-    <footer>
-        <div class="container">
-            <p>&copy; {datetime.now().year} {current_blog_name}. All rights reserved.</p>
-            
-        </div>
-    </footer>
-    """
-    return footer_html
-
-def build_html_document(head_content, body_content):
-    """Membangun struktur dasar dokumen HTML AMP."""
-    return f"""
-<!doctype html>
-<html ⚡ lang="en">
-<head>
-    {head_content}
-</head>
-<body>
-    {body_content}
-</body>
-</html>
-"""
-
-def build_site(posts):
-    print("Memulai proses pembangunan situs...")
+def write_output_stream(output_filename, chunks, previous_hash=None):
+    """
+    Seperti write_output_file untuk file besar (mis. sitemap): potongan string dari `chunks`
+    ditulis langsung ke file sementara sambil di-hash, lalu file sementara dibuang jika isinya
+    identik dengan build sebelumnya atau di-rename ke tempatnya jika berubah.
+    """
+    output_path = os.path.join(OUTPUT_DIR, output_filename)
+    tmp_path = f"{output_path}.{os.getpid()}.tmp"
+    digest = hashlib.sha256()
+    size = 0
+    with open(tmp_path, 'wb') as f:
+        for chunk in chunks:
+            data = chunk.encode('utf-8')
+            digest.update(data)
+            size += len(data)
+            f.write(data)
+    content_hash = digest.hexdigest()
+    if content_hash == previous_hash and get_file_size(output_path) == size:
+        os.remove(tmp_path)
+        increment_counter('pages_unchanged')
+        return content_hash
+    os.replace(tmp_path, output_path)
+    increment_counter('pages_written')
+    increment_counter('bytes_written', size)
+    return content_hash
+
+def get_file_size(path):
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return None
+
+def load_output_manifest():
+    """Hash isi halaman yang ditulis build sebelumnya (nama file -> hash, None jika tidak diketahui)."""
+    try:
+        with open(OUTPUT_MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)['files']
+    except FileNotFoundError:
+        return {}
+    except (json.JSONDecodeError, KeyError):
+        print(f"Peringatan: Manifest output '{OUTPUT_MANIFEST_FILE}' rusak. Semua halaman ditulis ulang.")
+        return {}
+
+def save_output_manifest(file_hashes):
+    """Menyimpan manifest output secara atomik."""
+    os.makedirs(BUILD_CACHE_DIR, exist_ok=True)
+    tmp_path = OUTPUT_MANIFEST_FILE + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'files': file_hashes}, f, ensure_ascii=False)
+    os.replace(tmp_path, OUTPUT_MANIFEST_FILE)
+
+def delete_orphan_pages(old_filenames, current_filenames):
+    """
+    Menghapus halaman yang ditulis build sebelumnya tetapi tidak lagi dihasilkan (postingan
+    dihapus, judul/slug berubah, jumlah halaman berkurang) beserta varian .gz/.br-nya. Hanya file
+    yang tercatat di manifest output yang disentuh. Mengembalikan jumlah halaman yang dihapus.
+    """
+    deleted_count = 0
+    for output_filename in old_filenames:
+        if output_filename in current_filenames:
+            continue
+        output_path = os.path.join(OUTPUT_DIR, output_filename)
+        for path in (output_path, output_path + ".gz", output_path + ".br"):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        deleted_count += 1
+    increment_counter('pages_deleted', deleted_count)
+    return deleted_count
+
+# --- Pasca-pemrosesan Output ---
+
+# Blok yang isinya tidak boleh diubah oleh minify_html
+_MINIFY_PROTECTED_RE = re.compile(r'<(pre|textarea|script)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_HTML_COMMENT_RE = re.compile(r'<!--.*?-->', re.DOTALL)
+_LINE_BREAK_WHITESPACE_RE = re.compile(r'[ \t\r\f\v]*\n\s*')
+
+def minify_html_text(html):
+    return _LINE_BREAK_WHITESPACE_RE.sub('\n', _HTML_COMMENT_RE.sub('', html))
+
+def minify_html(html):
+    """
+    Minifikasi HTML yang aman: komentar dihapus dan indentasi/baris kosong diringkas menjadi satu
+    baris baru. Spasi di dalam baris tidak disentuh sehingga tampilan teks inline tidak berubah;
+    isi <pre>, <textarea>, dan <script> (JSON-LD) dibiarkan apa adanya.
+    """
+    minified = []
+    pos = 0
+    for match in _MINIFY_PROTECTED_RE.finditer(html):
+        minified.append(minify_html_text(html[pos:match.start()]))
+        minified.append(match.group(0))
+        pos = match.end()
+    minified.append(minify_html_text(html[pos:]))
+    return ''.join(minified)
+
+def get_precompress_formats():
+    """Ekstensi varian terkompresi yang dibuat: .gz selalu, .br jika paket brotli terpasang."""
+    return ('gz', 'br') if brotli is not None else ('gz',)
+
+def compress_data(data, compress_format):
+    if compress_format == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0) # mtime=0: output deterministik
+
+def get_precompress_settings():
+    return {'formats': list(get_precompress_formats()), 'gzip_level': GZIP_LEVEL, 'brotli_quality': BROTLI_QUALITY}
+
+def load_precompress_manifest():
+    """Hash isi setiap halaman saat varian terkompresinya terakhir dibuat (nama file -> hash)."""
+    try:
+        with open(PRECOMPRESS_MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    # Pengaturan kompresi berubah: semua varian dibuat ulang
+    if manifest.get('settings') != get_precompress_settings():
+        return {}
+    return manifest['files']
+
+def save_precompress_manifest(file_hashes):
+    """Menyimpan manifest kompresi secara atomik."""
+    os.makedirs(BUILD_CACHE_DIR, exist_ok=True)
+    tmp_path = PRECOMPRESS_MANIFEST_FILE + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'settings': get_precompress_settings(), 'files': file_hashes}, f, ensure_ascii=False)
+    os.replace(tmp_path, PRECOMPRESS_MANIFEST_FILE)
+
+def has_precompressed_variants(output_filename):
+    return all(os.path.exists(os.path.join(OUTPUT_DIR, f"{output_filename}.{compress_format}"))
+               for compress_format in get_precompress_formats())
+
+_PRECOMPRESS_HASHES = {} # Manifest kompresi build sebelumnya (read-only) milik proses worker
+
+def init_precompress_worker(file_hashes):
+    """Initializer worker: menyimpan hash dari manifest kompresi sebelumnya untuk precompress_file_task."""
+    global _PRECOMPRESS_HASHES
+    _PRECOMPRESS_HASHES = file_hashes
+
+def precompress_file_task(output_filename):
+    """
+    Menulis varian .gz/.br dari satu halaman di OUTPUT_DIR, kecuali isinya sama dengan saat
+    varian terakhir dibuat dan semua variannya masih ada. Mengembalikan (nama file, hash isi).
+    """
+    output_path = os.path.join(OUTPUT_DIR, output_filename)
+    with open(output_path, 'rb') as f:
+        data = f.read()
+    content_hash = hashlib.sha256(data).hexdigest()
+    if _PRECOMPRESS_HASHES.get(output_filename) == content_hash and has_precompressed_variants(output_filename):
+        increment_counter('precompress_skipped')
+        return output_filename, content_hash
+    with phase_timer('compress'):
+        for compress_format in get_precompress_formats():
+            compressed = compress_data(data, compress_format)
+            write_file_atomic(f"{output_path}.{compress_format}", compressed)
+            increment_counter(f'precompressed_bytes_{compress_format}', len(compressed))
+    increment_counter('precompressed_files')
+    return output_filename, content_hash
+
+def precompress_output(output_hashes, jobs):
+    """
+    Tahap pasca-pemrosesan: memastikan setiap halaman di `output_hashes` (nama file -> hash isi
+    dari manifest output) memiliki varian terkompresi yang sesuai dengan isinya, memakai worker
+    pool. Halaman yang hash-nya sama dengan saat variannya terakhir dibuat dan variannya masih
+    ada dilewati tanpa dibaca; sisanya dibaca, di-hash, dan hanya dikompresi jika isinya berubah.
+    """
+    if brotli is None:
+        print("Peringatan: Paket brotli tidak terpasang; hanya varian .gz yang dibuat. Pasang dengan 'pip install brotli'.")
+    file_hashes = load_precompress_manifest()
+    new_hashes = {}
+    todo = []
+    for output_filename, content_hash in output_hashes.items():
+        if (content_hash is not None and file_hashes.get(output_filename) == content_hash
+                and has_precompressed_variants(output_filename)):
+            new_hashes[output_filename] = content_hash
+        else:
+            todo.append(output_filename)
+    increment_counter('precompress_skipped', len(output_hashes) - len(todo))
+    log(f"Memeriksa varian terkompresi ({', '.join(get_precompress_formats())}) untuk {len(todo)} halaman...")
+    with create_worker_pool(jobs, init_precompress_worker, (file_hashes,)) as pool:
+        for output_filename, content_hash in iter_progress(pool_map(pool, precompress_file_task, todo, jobs), len(todo), "Kompresi"):
+            new_hashes[output_filename] = content_hash
+    init_precompress_worker({})
+    save_precompress_manifest(new_hashes)
+
+def plan_pages(ctx):
+    """
+    Menyusun daftar halaman yang akan dibangun beserta signature input-nya: halaman index,
+    artikel, label, redirect paginasi lama, dan direktori label.
+    Signature adalah hash dari semua input yang memengaruhi isi halaman tersebut,
+    sehingga halaman hanya perlu dirender ulang jika signature-nya berubah.
+    """
+    posts_per_page = ctx['posts_per_page']
+    sorted_posts = ctx['sorted_posts']
+
+    # Signature halaman berpaginasi memuat skema, tautan navigasinya, dan isi postingannya
+    def get_list_page_signature(item_posts, page_num, *extra):
+        start_idx, end_idx = get_page_range(len(item_posts), posts_per_page, page_num)
+        links = get_page_links(len(item_posts), posts_per_page, page_num)
+        return compute_hash(*extra, PAGINATION_SCHEME, str(page_num), *map(str, links),
+                            *(get_post_render_hash(p) for p in item_posts[start_idx:end_idx]))
+
+    index_pages = []
+    for page_num in get_page_nums(len(sorted_posts), posts_per_page):
+        output_filename = get_page_filename("index", page_num)
+        index_pages.append((output_filename, get_list_page_signature(sorted_posts, page_num), page_num))
+
+    article_pages = []
+    for post in ctx['posts']:
+        output_filename = post.permalink.lstrip('/')
+        related_hashes = (get_post_render_hash(rp) for rp in ctx['related_posts'][post.id])
+        signature = compute_hash(get_post_render_hash(post), *related_hashes)
+        article_pages.append((output_filename, signature, post))
+
+    label_pages = []
+    for label_name in ctx['unique_labels_list']:
+        label_slug = ctx['label_slugs'][label_name]
+        label_posts = ctx['posts_by_label'][label_name]
+        for page_num in get_page_nums(len(label_posts), posts_per_page):
+            signature = get_list_page_signature(label_posts, page_num, label_name, str(len(label_posts) > posts_per_page))
+            label_pages.append((get_page_filename(label_slug, page_num), signature, (label_name, page_num)))
+
+    # Halaman redirect untuk URL paginasi skema 'newest' saat memakai skema 'stable'
+    redirect_pages = [
+        (output_filename, compute_hash('redirect', target), target)
+        for base_name, item_count in [("index", len(sorted_posts))] + [
+            (ctx['label_slugs'][label_name], len(ctx['posts_by_label'][label_name]))
+            for label_name in ctx['unique_labels_list']
+        ]
+        for output_filename, target in get_legacy_page_redirects(base_name, item_count, posts_per_page)
+    ]
+
+    # Direktori label: isinya hanya bergantung pada nama label dan jumlah postingannya
+    directory_pages = []
+    directory_total_pages = count_pages(len(ctx['label_directory']), LABELS_PER_DIRECTORY_PAGE)
+    for page_num in range(1, directory_total_pages + 1):
+        signature = compute_hash('label_directory', str(page_num), str(directory_total_pages), *(
+            f"{label}\0{len(ctx['posts_by_label'][label])}" for label in get_label_directory_page(ctx, page_num)
+        ))
+        directory_pages.append((get_page_filename(LABEL_DIRECTORY_NAME, page_num, scheme='newest'), signature, page_num))
+
+    return index_pages, article_pages, label_pages, redirect_pages, directory_pages
+
+def collect_posts_for_pages(ctx, index_todo, article_todo, label_todo, feed_todo=()):
+    """Mengumpulkan postingan (berdasarkan ID) yang dibutuhkan oleh halaman-halaman yang akan dirender."""
+    posts_per_page = ctx['posts_per_page']
+    needed_posts = {}
+    if any(kind in FEED_FORMATS for _, _, (kind, _) in feed_todo):
+        # Feed memakai snippet dan thumbnail postingan terbaru; sitemap hanya butuh metadata
+        for p in ctx['sorted_posts'][:FEED_POST_LIMIT]:
+            needed_posts[p.id] = p
+    for _, _, page_num in index_todo:
+        start_idx, end_idx = get_page_range(len(ctx['sorted_posts']), posts_per_page, page_num)
+        for p in ctx['sorted_posts'][start_idx:end_idx]:
+            needed_posts[p.id] = p
+    for _, _, post in article_todo:
+        needed_posts[post.id] = post
+        for rp in ctx['related_posts'][post.id]:
+            needed_posts[rp.id] = rp
+    for _, _, (label_name, page_num) in label_todo:
+        label_posts = ctx['posts_by_label'][label_name]
+        start_idx, end_idx = get_page_range(len(label_posts), posts_per_page, page_num)
+        for p in label_posts[start_idx:end_idx]:
+            needed_posts[p.id] = p
+    return needed_posts
+
+# --- Sitemap dan Feed ---
+
+FEED_FORMATS = {'rss': "rss.xml", 'atom': "atom.xml", 'json': "feed.json"}
+SITEMAP_INDEX_FILENAME = "sitemap.xml"
+SITEMAP_PAGES_FILENAME = "sitemap-pages.xml"
+SITEMAP_XMLNS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+
+def get_sitemap_shard_filename(shard_num):
+    return f"sitemap-posts-{shard_num}.xml"
+
+def get_sitemap_shards(ctx):
+    """
+    Postingan per shard sitemap (maksimal SITEMAP_MAX_URLS), diurutkan dari yang terlama
+    sehingga postingan baru hanya mengubah shard terakhir.
+    """
+    oldest_first = ctx['sorted_posts'][::-1]
+    return [oldest_first[i:i + SITEMAP_MAX_URLS] for i in range(0, len(oldest_first), SITEMAP_MAX_URLS)]
+
+def get_latest_updated(posts):
+    """Nilai `updated` terbaru dari sekumpulan postingan (dibandingkan sebagai waktu, bukan string)."""
+    return max((p.updated for p in posts), key=parse_rfc3339)
+
+def plan_feed_files(ctx):
+    """
+    Seperti plan_pages untuk sitemap dan feed: daftar (nama file, signature, (jenis, kunci)).
+    Signature shard hanya bergantung pada postingan di dalamnya, jadi shard lama tidak
+    ditulis ulang saat postingan baru ditambahkan.
+    """
+    feed_files = []
+    shard_signatures = []
+    for shard_num, shard_posts in enumerate(get_sitemap_shards(ctx), 1):
+        signature = compute_hash('sitemap', BASE_SITE_URL, *(p.content_hash for p in shard_posts))
+        feed_files.append((get_sitemap_shard_filename(shard_num), signature, ('sitemap_posts', shard_num)))
+        shard_signatures.append(signature)
+    # Halaman label: lastmod ikut berubah jika salah satu postingannya berubah
+    label_hashes = (
+        compute_hash(label_name, *(p.content_hash for p in ctx['posts_by_label'][label_name]))
+        for label_name in ctx['unique_labels_list']
+    )
+    signature = compute_hash('sitemap_pages', BASE_SITE_URL, *shard_signatures, *label_hashes)
+    feed_files.append((SITEMAP_PAGES_FILENAME, signature, ('sitemap_pages', None)))
+    signature = compute_hash('sitemap_index', BASE_SITE_URL, *shard_signatures, signature)
+    feed_files.append((SITEMAP_INDEX_FILENAME, signature, ('sitemap_index', None)))
+
+    latest_hashes = [p.content_hash for p in ctx['sorted_posts'][:FEED_POST_LIMIT]]
+    for feed_format, output_filename in FEED_FORMATS.items():
+        signature = compute_hash(feed_format, BASE_SITE_URL, BLOG_NAME, *latest_hashes)
+        feed_files.append((output_filename, signature, (feed_format, None)))
+    return feed_files
+
+def iter_sitemap_urlset(entries):
+    """Dokumen <urlset> sitemap dari (URL, lastmod), dihasilkan per baris."""
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="{SITEMAP_XMLNS}">\n'
+    for loc, lastmod in entries:
+        yield f"<url><loc>{xml_escape(loc)}</loc><lastmod>{xml_escape(lastmod)}</lastmod></url>\n"
+    yield "</urlset>\n"
+
+def iter_sitemap_index(ctx):
+    """Indeks sitemap: semua shard postingan dan sitemap halaman, dengan lastmod masing-masing."""
+    yield f'<?xml version="1.0" encoding="UTF-8"?>\n<sitemapindex xmlns="{SITEMAP_XMLNS}">\n'
+    sitemaps = [(get_sitemap_shard_filename(shard_num), get_latest_updated(shard_posts))
+                for shard_num, shard_posts in enumerate(get_sitemap_shards(ctx), 1)]
+    sitemaps.append((SITEMAP_PAGES_FILENAME, get_latest_updated(ctx['posts'])))
+    for output_filename, lastmod in sitemaps:
+        yield (f"<sitemap><loc>{xml_escape(BASE_SITE_URL)}/{output_filename}</loc>"
+               f"<lastmod>{xml_escape(lastmod)}</lastmod></sitemap>\n")
+    yield "</sitemapindex>\n"
+
+def iter_rss_feed(posts):
+    """Feed RSS 2.0 untuk `posts` (terbaru dulu). Tanggal diambil dari postingan agar output deterministik."""
+    base_url = xml_escape(BASE_SITE_URL)
+    yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+           '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">\n<channel>\n'
+           f"<title>{xml_escape(BLOG_NAME)}</title>\n<link>{base_url}/</link>\n"
+           f"<description>{xml_escape(BLOG_NAME)}</description>\n"
+           f'<atom:link href="{base_url}/{FEED_FORMATS["rss"]}" rel="self" type="application/rss+xml"/>\n')
+    if posts:
+        yield f"<lastBuildDate>{format_datetime(parse_rfc3339(get_latest_updated(posts)))}</lastBuildDate>\n"
+    for p in posts:
+        permalink_abs = xml_escape(f"{BASE_SITE_URL}{p.permalink}")
+        categories = ''.join(f"<category>{xml_escape(label)}</category>" for label in p.labels)
+        yield (f"<item><title>{xml_escape(p.title)}</title><link>{permalink_abs}</link>"
+               f'<guid isPermaLink="true">{permalink_abs}</guid>'
+               f"<pubDate>{format_datetime(parse_rfc3339(p.published))}</pubDate>"
+               f"<description>{xml_escape(p.snippet or '')}</description>{categories}</item>\n")
+    yield "</channel>\n</rss>\n"
+
+def iter_atom_feed(posts):
+    """Feed Atom untuk `posts` (terbaru dulu)."""
+    base_url = xml_escape(BASE_SITE_URL)
+    yield ('<?xml version="1.0" encoding="UTF-8"?>\n<feed xmlns="http://www.w3.org/2005/Atom">\n'
+           f"<title>{xml_escape(BLOG_NAME)}</title>\n<id>{base_url}/</id>\n"
+           f'<link href="{base_url}/"/>\n<link href="{base_url}/{FEED_FORMATS["atom"]}" rel="self"/>\n')
+    if posts:
+        yield f"<updated>{xml_escape(get_latest_updated(posts))}</updated>\n"
+    for p in posts:
+        permalink_abs = xml_escape(f"{BASE_SITE_URL}{p.permalink}")
+        categories = ''.join(f"<category term={quoteattr(label)}/>" for label in p.labels)
+        yield (f"<entry><title>{xml_escape(p.title)}</title><id>{permalink_abs}</id>"
+               f'<link href="{permalink_abs}"/><published>{xml_escape(p.published)}</published>'
+               f"<updated>{xml_escape(p.updated)}</updated>"
+               f"<author><name>{xml_escape(p.author_name)}</name></author>"
+               f"<summary>{xml_escape(p.snippet or '')}</summary>{categories}</entry>\n")
+    yield "</feed>\n"
+
+def build_json_feed(posts):
+    """JSON Feed 1.1 untuk `posts` (terbaru dulu)."""
+    items = []
+    for p in posts:
+        item = {
+            'id': f"{BASE_SITE_URL}{p.permalink}",
+            'url': f"{BASE_SITE_URL}{p.permalink}",
+            'title': p.title,
+            'summary': p.snippet or "",
+            'content_text': p.snippet or "",
+            'date_published': p.published,
+            'date_modified': p.updated,
+            'authors': [{'name': p.author_name}],
+        }
+        if p.thumbnail:
+            item['image'] = p.thumbnail
+        if p.labels:
+            item['tags'] = list(p.labels)
+        items.append(item)
+    return json.dumps({
+        'version': "https://jsonfeed.org/version/1.1",
+        'title': BLOG_NAME,
+        'home_page_url': f"{BASE_SITE_URL}/",
+        'feed_url': f"{BASE_SITE_URL}/{FEED_FORMATS['json']}",
+        'items': items,
+    }, ensure_ascii=False, indent=1) + "\n"
+
+def iter_feed_file(ctx, kind, key):
+    """Isi satu file sitemap/feed (lihat plan_feed_files) sebagai potongan string."""
+    if kind == 'sitemap_index':
+        return iter_sitemap_index(ctx)
+    if kind == 'sitemap_posts':
+        shard_posts = get_sitemap_shards(ctx)[key - 1]
+        return iter_sitemap_urlset((f"{BASE_SITE_URL}{p.permalink}", p.updated) for p in shard_posts)
+    if kind == 'sitemap_pages':
+        entries = [(f"{BASE_SITE_URL}/index.html", get_latest_updated(ctx['posts']))]
+        entries.extend(
+            (f"{BASE_SITE_URL}/{ctx['label_slugs'][label_name]}.html",
+             get_latest_updated(ctx['posts_by_label'][label_name]))
+            for label_name in ctx['unique_labels_list']
+        )
+        return iter_sitemap_urlset(entries)
+    latest_posts = ctx['sorted_posts'][:FEED_POST_LIMIT]
+    if kind == 'rss':
+        return iter_rss_feed(latest_posts)
+    if kind == 'atom':
+        return iter_atom_feed(latest_posts)
+    return iter([build_json_feed(latest_posts)])
+
+# --- Indeks Pencarian ---
+#
+# Struktur di OUTPUT_DIR/search/ (JSON ringkas, tanpa spasi):
+#   meta.json          : {"version", "prefix_length", "min_term_length", "docs_per_shard", "doc_count", "shards"}
+#   terms-<awalan>.json: {term: [posting judul/label, posting teks]} untuk semua term berawalan <awalan>
+#                        (SEARCH_TERM_PREFIX_LENGTH karakter pertama). Posting berupa nomor dokumen yang
+#                        terurut naik dan di-delta-encode: [3, 1, 4] berarti dokumen 3, 4, dan 8. Dokumen
+#                        yang cocok di judul/label tidak diulang di posting teks.
+#   docs-<k>.json      : [[judul, permalink, tanggal], ...] untuk dokumen k*docs_per_shard dan seterusnya.
+# Nomor dokumen mengikuti urutan publikasi dari yang terlama, sehingga postingan baru hanya menambah
+# nomor di akhir dan shard yang tidak memuat term-nya tetap identik (tidak ditulis ulang).
+# Query dinormalisasi dengan tokenize_search_text yang sama, lalu klien mengambil shard setiap term.
+
+_SEARCH_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+def tokenize_search_text(text):
+    """Token pencarian: huruf kecil, aksen dihapus (é -> e), dipisah pada karakter non-alfanumerik."""
+    text = unicodedata.normalize('NFKD', text.lower()).encode('ascii', 'ignore').decode('ascii')
+    return _SEARCH_TOKEN_RE.findall(text)
+
+def get_search_terms(text):
+    """Term unik (terurut) dari teks dengan panjang SEARCH_MIN_TERM_LENGTH..SEARCH_MAX_TERM_LENGTH."""
+    return sorted({
+        token for token in tokenize_search_text(text)
+        if SEARCH_MIN_TERM_LENGTH <= len(token) <= SEARCH_MAX_TERM_LENGTH
+    })
+
+def get_search_meta_filename():
+    return f"{SEARCH_INDEX_DIR}/meta.json"
+
+def load_search_term_store():
+    """
+    Term teks per postingan dari build sebelumnya: ID -> (hash konten, term), agar postingan
+    yang tidak berubah tidak perlu di-parse ulang hanya untuk indeks pencarian.
+    """
+    store = {}
+    try:
+        with open(SEARCH_TERM_STORE_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                post_id, content_hash, terms = json.loads(line)
+                store[post_id] = (content_hash, terms)
+    except FileNotFoundError:
+        pass
+    except (json.JSONDecodeError, ValueError):
+        print(f"Peringatan: Store term pencarian '{SEARCH_TERM_STORE_FILE}' rusak. Semua postingan diindeks ulang.")
+        return {}
+    return store
+
+def save_search_term_store(store, posts):
+    """Menyimpan store term (hanya untuk `posts` yang masih ada) secara atomik."""
+    os.makedirs(BUILD_CACHE_DIR, exist_ok=True)
+    tmp_path = SEARCH_TERM_STORE_FILE + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        for p in posts:
+            content_hash, terms = store[p.id]
+            f.write(json.dumps([p.id, content_hash, terms], ensure_ascii=False))
+            f.write("\n")
+    os.replace(tmp_path, SEARCH_TERM_STORE_FILE)
+
+def delta_encode(numbers):
+    """[3, 4, 8] -> [3, 1, 4] untuk list bilangan yang terurut naik."""
+    return [number - previous for previous, number in zip([0] + numbers, numbers)]
+
+def write_search_index(ctx, search_store, output_hashes):
+    """
+    Membangun indeks terbalik dari judul, label, dan term teks (`search_store`) semua postingan,
+    lalu menulis shard-shard-nya (lihat struktur di atas) lewat write_output_stream sehingga shard
+    yang isinya sama tidak ditulis ulang. Mengembalikan dict nama file -> hash isi.
+    """
+    docs = ctx['sorted_posts'][::-1]
+    postings = {} # term -> ([dokumen judul/label], [dokumen teks])
+    for doc_num, p in enumerate(docs):
+        title_terms = get_search_terms(' '.join((p.title,) + p.labels))
+        for term in title_terms:
+            postings.setdefault(term, ([], []))[0].append(doc_num)
+        title_terms = set(title_terms)
+        for term in search_store[p.id][1]:
+            if term not in title_terms:
+                postings.setdefault(term, ([], []))[1].append(doc_num)
+
+    shards = {}
+    for term in sorted(postings):
+        title_docs, text_docs = postings[term]
+        shards.setdefault(term[:SEARCH_TERM_PREFIX_LENGTH], {})[term] = [delta_encode(title_docs), delta_encode(text_docs)]
+    del postings
+
+    os.makedirs(os.path.join(OUTPUT_DIR, SEARCH_INDEX_DIR), exist_ok=True)
+    written = {}
+    def write_json(output_filename, value):
+        data = json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+        written[output_filename] = write_output_stream(output_filename, [data], output_hashes.get(output_filename))
+
+    for prefix, terms in shards.items():
+        write_json(f"{SEARCH_INDEX_DIR}/terms-{prefix}.json", terms)
+    for start in range(0, len(docs), SEARCH_DOCS_PER_SHARD):
+        write_json(f"{SEARCH_INDEX_DIR}/docs-{start // SEARCH_DOCS_PER_SHARD}.json",
+                   [[p.title, p.permalink, p.published_date] for p in docs[start:start + SEARCH_DOCS_PER_SHARD]])
+    write_json(get_search_meta_filename(), {
+        'version': SEARCH_INDEX_VERSION,
+        'prefix_length': SEARCH_TERM_PREFIX_LENGTH,
+        'min_term_length': SEARCH_MIN_TERM_LENGTH,
+        'docs_per_shard': SEARCH_DOCS_PER_SHARD,
+        'doc_count': len(docs),
+        'shards': sorted(shards),
+    })
+    log(f"Indeks pencarian: {len(docs)} postingan, {sum(len(terms) for terms in shards.values())} term, {len(shards)} shard.")
+    return written
+
+def iter_batches(items, batch_size):
+    """Membagi iterable menjadi list berisi paling banyak `batch_size` item."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def preprocess_stored_posts(post_source, needed_posts, article_ids, body_file, jobs, image_sizes, search_terms=None):
+    """
+    Pass kedua mode hemat memori: membaca ulang konten dari `post_source` dan memproses hanya
+    postingan di `needed_posts` (ID -> Post), per batch. Snippet dan thumbnail disalin ke model
+    postingan; body AMP postingan yang halaman artikelnya akan dirender ditulis ke `body_file`
+    (JSON-lines) untuk dibaca kembali satu per satu saat render. Jika `search_terms` (dict)
+    diberikan, term pencarian setiap postingan disimpan di sana.
+    """
+    post_data_stream = iter_progress((p for p in post_source() if p['id'] in needed_posts), len(needed_posts), "Postingan")
+    with create_worker_pool(jobs, init_preprocess_worker, (image_sizes,)) as pool:
+        for batch in iter_batches(post_data_stream, STREAM_BATCH_SIZE):
+            for post_data, record in zip(batch, pool_map(pool, preprocess_post, batch, jobs)):
+                apply_post_record(needed_posts[post_data['id']], record)
+                if search_terms is not None:
+                    search_terms[post_data['id']] = record['search_terms']
+                if post_data['id'] in article_ids:
+                    body_file.write(json.dumps([post_data['id'], record['amp']], ensure_ascii=False))
+                    body_file.write("\n")
+
+def iter_article_body_tasks(body_file):
+    """Task render ('article_body', (ID, body AMP)) dari file yang ditulis preprocess_stored_posts."""
+    body_file.seek(0)
+    for line in body_file:
+        post_id, amp_content = json.loads(line)
+        yield ('article_body', (post_id, amp_content))
+
+# --- Eksekusi Paralel ---
+
+_RENDER_CTX = None # Konteks build (read-only) milik proses worker
+
+def init_render_worker(ctx):
+    """Initializer worker: menyimpan konteks build untuk dipakai render_page_task."""
+    global _RENDER_CTX
+    _RENDER_CTX = ctx
+
+def render_page_task(task):
+    """
+    Merender dan menulis satu halaman. `task` berupa (jenis halaman, kunci): ('index', nomor
+    halaman), ('article', ID), ('article_body', (ID, body AMP)), ('label', (label, nomor-nomor halaman)),
+    ('feed', (nama file, (jenis, kunci))) untuk sitemap dan feed, ('redirect', (nama file, tujuan)), atau
+    ('label_directory', nomor halaman).
+    Mengembalikan list (nama file, hash isi) dari halaman yang dihasilkan.
+    """
+    kind, key = task
+    output_hashes = _RENDER_CTX['output_hashes']
+    if kind == 'feed':
+        output_filename, (feed_kind, feed_key) = key
+        with phase_timer('feeds'):
+            content_hash = write_output_stream(output_filename, iter_feed_file(_RENDER_CTX, feed_kind, feed_key),
+                                               output_hashes.get(output_filename))
+        return [(output_filename, content_hash)]
+    if kind == 'label':
+        # Halaman label ditulis satu per satu begitu selesai dirender
+        label_name, page_nums = key
+        label_pages = iter_label_pages(_RENDER_CTX, label_name, set(page_nums))
+        written_pages = []
+        while True:
+            with phase_timer('render'):
+                page = next(label_pages, None)
+            if page is None:
+                return written_pages
+            output_filename, html = page
+            written_pages.append((output_filename, write_output_file(output_filename, html, output_hashes.get(output_filename))))
+    with phase_timer('render'):
+        if kind == 'index':
+            output_filename, html = render_index_page(_RENDER_CTX, key)
+        elif kind == 'redirect':
+            output_filename, target = key
+            html = render_redirect_page(_RENDER_CTX, target)
+        elif kind == 'label_directory':
+            output_filename, html = render_label_directory_page(_RENDER_CTX, key)
+        elif kind == 'article':
+            output_filename, html = render_article_page(_RENDER_CTX, _RENDER_CTX['posts_by_id'][key],
+                                                        _RENDER_CTX['amp_bodies'][key])
+        else:
+            # Mode hemat memori: body AMP dikirim bersama task, bukan disimpan di ctx
+            post_id, amp_content = key
+            output_filename, html = render_article_page(_RENDER_CTX, _RENDER_CTX['posts_by_id'][post_id], amp_content)
+    return [(output_filename, write_output_file(output_filename, html, output_hashes.get(output_filename)))]
+
+# Pengaturan yang diubah oleh argumen CLI (lihat __main__). Worker 'spawn' mengimpor ulang modul ini
+# dengan nilai default, jadi pengaturan ini dikirim eksplisit lewat initializer (lihat init_worker).
+WORKER_SETTINGS = ('QUIET', 'AMP_CONVERTER_BACKEND', 'AMP_CACHE_ENABLED', 'IMAGE_PROBE_ENABLED', 'HTML_MINIFY',
+                   'PRECOMPRESS_ENABLED', 'SEARCH_INDEX_ENABLED', 'PAGINATION_SCHEME')
+
+def get_worker_settings():
+    """Nilai WORKER_SETTINGS di proses ini, untuk dikirim ke worker."""
+    return {name: globals()[name] for name in WORKER_SETTINGS}
+
+def init_worker(settings, initializer=None, initargs=()):
+    """Initializer setiap worker pool: menerapkan pengaturan dari proses induk, lalu initializer task."""
+    globals().update(settings)
+    if initializer:
+        initializer(*initargs)
+
+def create_worker_pool(jobs, initializer=None, initargs=()):
+    """
+    Membuat process pool untuk `jobs` worker. Untuk jobs <= 1 tidak ada pool yang dibuat
+    (initializer dijalankan di proses ini) sehingga build tetap berjalan serial.
+    """
+    if jobs <= 1:
+        if initializer:
+            initializer(*initargs)
+        return contextlib.nullcontext()
+    # Dengan 'fork', worker mewarisi data read-only tanpa perlu di-pickle
+    if 'fork' in multiprocessing.get_all_start_methods():
+        mp_context = multiprocessing.get_context('fork')
+    else:
+        mp_context = multiprocessing.get_context()
+    return ProcessPoolExecutor(max_workers=jobs, mp_context=mp_context, initializer=init_worker,
+                               initargs=(get_worker_settings(), initializer, initargs))
+
+def run_instrumented_task(func, item):
+    """Dijalankan di worker: memanggil func(item) dan ikut mengembalikan metrik yang terkumpul."""
+    reset_metrics() # Worker 'fork' mewarisi metrik proses induk
+    return func(item), reset_metrics()
+
+def collect_instrumented_results(results):
+    """Menggabungkan metrik dari worker ke proses ini sambil meneruskan hasil task."""
+    for result, metrics in results:
+        merge_metrics(metrics)
+        yield result
+
+def pool_map(pool, func, items, jobs):
+    """Seperti map(), tetapi memakai pool jika ada. Urutan hasil selalu sama dengan urutan input."""
+    if pool is None:
+        return map(func, items)
+    chunksize = max(1, len(items) // (jobs * 4))
+    return collect_instrumented_results(pool.map(functools.partial(run_instrumented_task, func), items, chunksize=chunksize))
+
+def create_site_context(posts, label_ids, related_scoring=RELATED_POSTS_SCORING):
+    """
+    Menyiapkan konteks render (ctx) dari model Post: urutan postingan, index label, postingan
+    terkait, template, CSS, serta hash input global (ctx['inputs_hash']). `label_ids` adalah
+    tabel label -> ID yang diisi saat model Post dibangun. Snippet dan thumbnail belum diisi.
+    """
+    # Urutkan postingan berdasarkan tanggal publikasi terbaru
+    sorted_posts = sorted(posts, key=lambda p: p.published, reverse=True)
+
+    # Inverted index label -> postingan (dibangun sekali, dipakai halaman label dan postingan terkait)
+    with phase_timer('related'):
+        posts_by_label_id, label_positions = build_label_index(sorted_posts, len(label_ids))
+        label_index = {
+            'posts_by_label': posts_by_label_id,
+            'label_positions': label_positions,
+            'post_ranks': {p.id: rank for rank, p in enumerate(sorted_posts)},
+        }
+    unique_labels_list = sorted(label_ids)
+    log(f"Ditemukan {len(unique_labels_list)} label unik.")
+
+    select_related = RELATED_POSTS_SCORERS[related_scoring]
     
-    if not posts:
-        print("Tidak ada postingan untuk dibangun. Menghentikan.")
-        return
+    # Label di sidebar; label di luar sidebar ada di direktori label
+    label_slugs = {label: slugify(label) for label in label_ids}
+    label_counts = {label: len(posts_by_label_id[label_id]) for label, label_id in label_ids.items()}
+    sidebar_labels = select_sidebar_labels(label_counts, SIDEBAR_LABEL_LIMIT)
+    label_directory = []
+    directory_url = None
+    if len(sidebar_labels) < len(unique_labels_list):
+        label_directory = sorted(unique_labels_list, key=lambda label: (get_label_directory_letter(label), label.casefold(), label))
+        directory_url = f"/{get_page_filename(LABEL_DIRECTORY_NAME, 1, scheme='newest')}"
+
+    ctx = {
+        'posts': posts,
+        'posts_by_id': {p.id: p for p in posts},
+        'sorted_posts': sorted_posts,
+        'unique_labels_list': unique_labels_list,
+        'label_directory': label_directory,
+        'sidebar_labels': sidebar_labels,
+        'label_directory_url': directory_url,
+        'posts_per_page': POSTS_PER_PAGE,
+        'posts_by_label': {label: posts_by_label_id[label_id] for label, label_id in label_ids.items()},
+        'label_slugs': label_slugs,
+    }
+    with phase_timer('related'):
+        ctx['related_posts'] = {p.id: select_related(p, label_index, RELATED_POSTS_LIMIT) for p in posts}
+    load_site_assets(ctx)
+    return ctx
 
-    # Baca Custom CSS satu kali
+def load_site_assets(ctx):
+    """
+    Mengisi bagian ctx yang berasal dari CSS dan template: CSS, template, kerangka halaman per
+    jenis (dengan header, sidebar, dan footer), serta hash input global. Dipanggil ulang oleh mode
+    serve saat hanya CSS atau template yang berubah, tanpa menyusun ulang postingan dan label.
+    """
     try:
         with open(CUSTOM_CSS_PATH, 'r', encoding='utf-8') as f:
             custom_css_content = f.read()
@@ -259,346 +2745,591 @@ def build_site(posts):
         print(f"Peringatan: File CSS '{CUSTOM_CSS_PATH}' tidak ditemukan. Menggunakan CSS kosong.")
         custom_css_content = ""
 
-    # Kumpulkan semua label unik
-    all_unique_labels = set()
-    for post in posts:
-        if 'labels' in post:
-            for label in post['labels']:
-                all_unique_labels.add(label)
-    
-    unique_labels_list = sorted(list(all_unique_labels))
-    print(f"Ditemukan {len(unique_labels_list)} label unik.")
-
-    # Urutkan postingan berdasarkan tanggal publikasi terbaru
-    sorted_posts = sorted(posts, key=lambda p: p['published'], reverse=True)
-    
     # Bagian header dan sidebar (sama untuk semua halaman)
-    global_header_sidebar_html = build_header_and_sidebar(unique_labels_list, BLOG_NAME)
-    global_footer_html = build_footer(BLOG_NAME, BASE_SITE_URL)
+    templates = load_templates()
+    global_header_sidebar_html = build_header_and_sidebar(ctx['sidebar_labels'], ctx['label_slugs'], BLOG_NAME,
+                                                          templates, ctx['label_directory_url'])
+    global_footer_html = build_footer(BLOG_NAME, BASE_SITE_URL, templates)
 
-    # --- Render Halaman Index (dengan Paginasi) ---
-    print("Membangun halaman index...")
-    
-    posts_per_page = 10
-    total_posts = len(sorted_posts)
-    total_pages = (total_posts + posts_per_page - 1) // posts_per_page
+    # Kerangka halaman per jenis: bagian konstan dirender sekali di sini
+    page_templates = {
+        page_kind: bind_template(templates[page_kind], header_sidebar=global_header_sidebar_html,
+                                 footer=global_footer_html)
+        for page_kind in ('index', 'article', 'label', 'label_directory')
+    }
+    ctx['css'] = prepare_css(custom_css_content)
+    ctx['templates'] = templates
+    ctx['page_templates'] = page_templates
+    ctx['page_vocabulary'] = {
+        page_kind: get_html_vocabulary(get_template_literal_text(parts))
+        for page_kind, parts in page_templates.items()
+    }
+
+    # Hash input global: jika salah satunya berubah, semua halaman harus dirender ulang
+    ctx['inputs_hash'] = compute_hash(custom_css_content, global_header_sidebar_html, global_footer_html,
+                                      get_template_source_hash(), get_amp_converter_id(), str(IMAGE_PROBE_ENABLED),
+                                      str(HTML_MINIFY))
+
+def build_site(posts, incremental=False, jobs=1, related_scoring=RELATED_POSTS_SCORING, low_memory=False):
+    """
+    Membangun seluruh situs dari daftar postingan. Mengembalikan ringkasan build (jumlah
+    halaman serta metrik yang terkumpul sejak reset_metrics() terakhir), atau None jika
+    tidak ada postingan.
+
+    Dengan `low_memory`, `posts` adalah fungsi tanpa argumen yang setiap kali dipanggil
+    menghasilkan iterator postingan baru (mis. iter_post_store). Konten dibaca dua kali secara
+    streaming: pass pertama hanya menyimpan model Post (tanpa konten), pass kedua memproses
+    konten yang dibutuhkan per batch. Memori puncak lalu sebanding dengan ukuran metadata,
+    bukan total ukuran konten.
+    """
+    log("Memulai proses pembangunan situs...")
     
-    for page_num in range(1, total_pages + 1):
-        start_idx = (page_num - 1) * posts_per_page
-        end_idx = start_idx + posts_per_page
-        paginated_posts = sorted_posts[start_idx:end_idx]
-
-        list_items_html = []
-        for p in paginated_posts:
-            snippet = get_snippet(p.get('content', ''))
-            thumbnail_url = get_post_image_url(p)
-            post_slug = slugify(p['title'])
-            permalink = f"/{post_slug}-{p['id']}.html"
-            published_date = datetime.strptime(p['published'].split('T')[0], '%Y-%m-%d').strftime('%Y-%m-%d')
-            
-            thumbnail_tag = ""
-            if thumbnail_url:
-                thumbnail_tag = f"""
-                <div class="post-thumbnail">
-                    <amp-img src="{thumbnail_url}" width="100" height="75" layout="responsive" alt="{p['title']}"></amp-img>
-                </div>
-                """
-
-            list_items_html.append(f"""
-            <div class="post-item">
-                {thumbnail_tag}
-                <div class="post-content">
-                    <h2><a href="{permalink}">{p['title']}</a></h2>
-                    <p>{snippet}</p>
-                    <p><small>Published: {published_date}</small></p>
-                </div>
-            </div>
-            """)
-        
-        # Navigasi paginasi
-        pagination_html = "<div class='pagination'>"
-        if page_num > 1:
-            prev_page_link = "/index.html" if page_num == 2 else f"/index_p{page_num-1}.html"
-            pagination_html += f"<a href='{prev_page_link}'>Sebelumnya</a>"
-        pagination_html += f"<span class='current-page'>{page_num}</span>"
-        if page_num < total_pages:
-            next_page_link = f"/index_p{page_num+1}.html"
-            pagination_html += f"<a href='{next_page_link}'>Selanjutnya</a>"
-        pagination_html += "</div>"
-
-        # Tentukan permalink halaman index saat ini untuk canonical
-        current_index_permalink_rel = "/index.html" if page_num == 1 else f"/index_p{page_num}.html"
-        current_index_permalink_abs = f"{BASE_SITE_URL}{current_index_permalink_rel}"
-
-        # Bangun konten body untuk halaman index
-        index_body_content = f"""
-        {global_header_sidebar_html}
-        <main class="container">
-            <h1 class="page-title">Terbaru</h1>
-            <div class="post-list">
-                {''.join(list_items_html)}
-            </div>
-            {pagination_html}
-        </main>
-        {global_footer_html}
-        """
-
-        # Bangun head untuk halaman index
-        index_head_html = build_head_content(
-            page_title=f"Beranda {BLOG_NAME} - Halaman {page_num}",
-            canonical_url=current_index_permalink_abs,
-            custom_css_content=custom_css_content
-        )
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
 
-        # Bangun dokumen HTML lengkap
-        full_index_html = build_html_document(index_head_html, index_body_content)
-        
-        output_filename = "index.html" if page_num == 1 else f"index_p{page_num}.html"
-        output_path = os.path.join(OUTPUT_DIR, output_filename)
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(full_index_html)
-        print(f"  > Index Page {page_num}/{total_pages} selesai: {output_filename}")
-
-    # --- Render Halaman Artikel Individual ---
-    print("Membangun halaman artikel...")
-    for post in posts:
-        post_slug = slugify(post['title'])
-        permalink_rel = f"/{post_slug}-{post['id']}.html"
-        permalink_abs = f"{BASE_SITE_URL}{permalink_rel}"
-        
-        amp_content = convert_to_amp(post.get('content', ''))
-        main_image_url = get_post_image_url(post)
-        
-        # Escape string untuk JSON-LD
-        escaped_title = json.dumps(post['title'])[1:-1]
-        escaped_snippet = json.dumps(get_snippet(post.get('content', '')))[1:-1]
-        escaped_author_name = json.dumps(post['author']['displayName'])[1:-1]
-        escaped_blog_name = json.dumps(BLOG_NAME)[1:-1]
-        
-        # Related Posts (Ambil 3 postingan lain dari label yang sama, jika ada)
-        related_posts_html = ""
-        related_posts = []
-        post_labels = post.get('labels', [])
-        if post_labels:
-            for label in post_labels:
-                for p_related in sorted_posts:
-                    if p_related['id'] != post['id'] and \
-                       'labels' in p_related and label in p_related['labels']:
-                        if len(related_posts) < 3 and p_related not in related_posts:
-                            p_related_slug = slugify(p_related['title'])
-                            p_related['permalink'] = f"/{p_related_slug}-{p_related['id']}.html"
-                            p_related['thumbnail_url'] = get_post_image_url(p_related)
-                            related_posts.append(p_related)
-                        if len(related_posts) >= 3:
-                            break
-                if len(related_posts) >= 3:
-                    break
-        
-        if related_posts:
-            related_items_html = []
-            for rp in related_posts:
-                rp_thumbnail_tag = ""
-                if rp['thumbnail_url']:
-                    rp_thumbnail_tag = f"""
-                    <div class="related-thumbnail">
-                        <amp-img src="{rp['thumbnail_url']}" width="80" height="60" layout="responsive" alt="{rp['title']}"></amp-img>
-                    </div>
-                    """
-                related_items_html.append(f"""
-                <div class="related-item">
-                    {rp_thumbnail_tag}
-                    <h4><a href="{rp['permalink']}">{rp['title']}</a></h4>
-                </div>
-                """)
-            related_posts_html = f"""
-            <section class="related-posts">
-                <h3>Postingan Terkait</h3>
-                <div class="related-posts-list">
-                    {''.join(related_items_html)}
-                </div>
-            </section>
-            """
-
-        # Breadcrumbs data untuk JSON-LD
-        breadcrumbs_data = generate_breadcrumbs_data(post['title'], post_labels, BASE_SITE_URL)
-        breadcrumbs_json = json.dumps(breadcrumbs_data)
-
-        # HTML untuk Breadcrumbs di halaman
-        breadcrumbs_list_items = []
-        for idx, item in enumerate(breadcrumbs_data):
-            if item["item"]:
-                breadcrumbs_list_items.append(f"""
-                <li itemprop="itemListElement" itemscope itemtype="https://schema.org/ListItem">
-                    <a itemprop="item" href="{item["item"]}">
-                        <span itemprop="name">{item["name"]}</span>
-                    </a>
-                    <meta itemprop="position" content="{item["position"]}" />
-                </li>
-                """)
-            else: # Item terakhir (artikel saat ini) tidak memiliki link
-                 breadcrumbs_list_items.append(f"""
-                <li itemprop="itemListElement" itemscope itemtype="https://schema.org/ListItem">
-                    <span itemprop="name">{item["name"]}</span>
-                    <meta itemprop="position" content="{item["position"]}" />
-                </li>
-                """)
-        breadcrumbs_nav_html = f"""
-        <nav class="breadcrumbs" aria-label="breadcrumb">
-            <ol itemscope itemtype="https://schema.org/BreadcrumbList">
-                {''.join(breadcrumbs_list_items)}
-            </ol>
-        </nav>
-        """
-
-        # HTML untuk labels di bawah artikel
-        labels_html = ""
-        if post_labels:
-            labels_links = [f'<a href="/{slugify(label)}.html">{label}</a>' for label in post_labels]
-            labels_html = f"<br>Labels: {', '.join(labels_links)}"
-
-        # JSON-LD untuk artikel
-        json_ld_script = f"""
-        <script type="application/ld+json">
-        {{
-          "@context": "https://schema.org",
-          "@type": "BlogPosting",
-          "headline": "{escaped_title}",
-          "image": "{main_image_url}",
-          "url": "{permalink_abs}",
-          "datePublished": "{post['published']}",
-          "dateModified": "{post['updated']}",
-          "author": {{
-            "@type": "Person",
-            "name": "{escaped_author_name}"
-          }},
-          "publisher": {{
-            "@type": "Organization",
-            "name": "{escaped_blog_name}",
-            "logo": {{
-              "@type": "ImageObject",
-              "url": "{BASE_SITE_URL}/logo.png"
-            }}
-          }},
-          "description": "{escaped_snippet}",
-          "articleBody": "{json.dumps(amp_content).replace('\\n', ' ').replace('\\r', '')[1:-1]}"
-        }}
-        </script>
-        """
-
-        # Bangun konten body untuk halaman artikel
-        post_body_content = f"""
-        {global_header_sidebar_html}
-        <main class="container">
-            {breadcrumbs_nav_html}
-            {json_ld_script}
-            <article class="article-detail">
-                <header class="article-header">
-                    <h1>{post['title']}</h1>
-                    <p class="article-meta">
-                        Dipublikasikan pada: {datetime.strptime(post['published'].split('T')[0], '%Y-%m-%d').strftime('%Y-%m-%d')} oleh {post['author']['displayName']}
-                        {labels_html}
-                    </p>
-                </header>
-                <div class="article-content">
-                    {amp_content}
-                </div>
-            </article>
-            {related_posts_html}
-        </main>
-        {global_footer_html}
-        """
-        
-        # Bangun head untuk halaman artikel
-        post_head_html = build_head_content(
-            page_title=f"{post['title']} - {BLOG_NAME}",
-            canonical_url=permalink_abs,
-            custom_css_content=custom_css_content
-        )
+    # Model Post dibangun sekali per postingan; data mentah (dengan konten) hanya dipakai untuk pra-pemrosesan
+    label_ids = {}
+    if low_memory:
+        post_source = posts
+        posts = [Post(post_data, label_ids, compute_post_hash(post_data)) for post_data in post_source()]
+    else:
+        post_data_by_id = {post_data['id']: post_data for post_data in posts}
+        posts = [Post(post_data, label_ids, compute_post_hash(post_data)) for post_data in posts]
 
-        # Bangun dokumen HTML lengkap
-        full_post_html = build_html_document(post_head_html, post_body_content)
-        
-        output_path = os.path.join(OUTPUT_DIR, permalink_rel.lstrip('/'))
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(full_post_html)
-        print(f"  > Artikel selesai: {permalink_rel}")
-
-    # --- Render Halaman Label ---
-    print("Membangun halaman label...")
-    for label_name in unique_labels_list:
-        label_slug = slugify(label_name)
-        permalink_rel = f"/{label_slug}.html"
-        permalink_abs = f"{BASE_SITE_URL}{permalink_rel}"
-        
-        # Filter postingan untuk label ini
-        posts_for_label = [
-            p for p in sorted_posts if 'labels' in p and label_name in p['labels']
-        ]
-        
-        list_items_html = []
-        for p in posts_for_label:
-            snippet = get_snippet(p.get('content', ''))
-            thumbnail_url = get_post_image_url(p)
-            post_slug = slugify(p['title'])
-            post_item_permalink = f"/{post_slug}-{p['id']}.html"
-            published_date = datetime.strptime(p['published'].split('T')[0], '%Y-%m-%d').strftime('%Y-%m-%d')
-            
-            thumbnail_tag = ""
-            if thumbnail_url:
-                thumbnail_tag = f"""
-                <div class="post-thumbnail">
-                    <amp-img src="{thumbnail_url}" width="100" height="75" layout="responsive" alt="{p['title']}"></amp-img>
-                </div>
-                """
-
-            list_items_html.append(f"""
-            <div class="post-item">
-                {thumbnail_tag}
-                <div class="post-content">
-                    <h2><a href="{post_item_permalink}">{p['title']}</a></h2>
-                    <p>{snippet}</p>
-                    <p><small>Published: {published_date}</small></p>
-                </div>
-            </div>
-            """)
-
-        # Bangun konten body untuk halaman label
-        label_body_content = f"""
-        {global_header_sidebar_html}
-        <main class="container">
-            <h1 class="page-title">Postingan dengan Label: {label_name}</h1>
-            <div class="post-list">
-                {''.join(list_items_html)}
-            </div>
-        </main>
-        {global_footer_html}
-        """
-
-        # Bangun head untuk halaman label
-        label_head_html = build_head_content(
-            page_title=f"Label: {label_name} - {BLOG_NAME}",
-            canonical_url=permalink_abs,
-            custom_css_content=custom_css_content
-        )
+    if not posts:
+        print("Tidak ada postingan untuk dibangun. Menghentikan.")
+        return
+
+    # Ledger: baris setiap postingan (dicari per ID) menentukan artikel yang dirender ulang dan halaman
+    # artikel yang usang; diperbarui setelah build selesai
+    ledger = open_ledger()
+    ledger_entries = get_ledger_entries(ledger, posts)
+    removed_ledger_entries = get_removed_ledger_entries(ledger, posts, ledger_entries)
+    new_post_count = len(posts) - len(ledger_entries)
+    changed_post_count = sum(1 for p in posts if p.id in ledger_entries and ledger_entries[p.id][1] != p.content_hash)
+    log(f"Ledger: {new_post_count} postingan baru, {changed_post_count} berubah.")
+
+    # Ukuran gambar menentukan dimensi amp-img dan thumbnail, sehingga diperiksa untuk semua postingan
+    # sebelum perencanaan dan ikut masuk signature halaman (lihat get_post_render_hash). Gambar yang
+    # sudah ada di cache tidak diperiksa ulang.
+    image_sizes = {}
+    if IMAGE_PROBE_ENABLED:
+        with phase_timer('images'):
+            post_image_urls = {post_data['id']: get_post_image_urls(post_data)
+                               for post_data in (post_source() if low_memory else post_data_by_id.values())}
+            image_sizes = probe_image_sizes(url for urls in post_image_urls.values() for url in urls)
+            for p in posts:
+                p.image_sizes_hash = get_image_sizes_hash(post_image_urls[p.id], image_sizes)
+            del post_image_urls
+
+    ctx = create_site_context(posts, label_ids, related_scoring)
+    sorted_posts = ctx['sorted_posts']
+    inputs_hash = ctx['inputs_hash']
+    index_pages, article_pages, label_pages, redirect_pages, directory_pages = plan_pages(ctx)
+    feed_files = plan_feed_files(ctx)
+
+    old_manifest = load_build_manifest() if incremental else None
+    if incremental:
+        if old_manifest is None:
+            log("Manifest build tidak ditemukan. Melakukan build penuh.")
+        elif old_manifest.get('inputs') != inputs_hash:
+            log("CSS, template, atau navigasi berubah. Melakukan build penuh.")
+            old_manifest = None
+    old_pages = old_manifest['pages'] if old_manifest else {}
+
+    def needs_render(output_filename, signature):
+        if old_pages.get(output_filename) != signature:
+            return True
+        return not os.path.exists(os.path.join(OUTPUT_DIR, output_filename))
+
+    def article_needs_render(output_filename, signature, post):
+        entry = ledger_entries.get(post.id)
+        if old_manifest is None or entry is None or entry[2:4] != (output_filename, signature):
+            return True
+        return not os.path.exists(os.path.join(OUTPUT_DIR, output_filename))
+
+    index_todo = [page for page in index_pages if needs_render(page[0], page[1])]
+    article_todo = [page for page in article_pages if article_needs_render(*page)]
+    label_todo = [page for page in label_pages if needs_render(page[0], page[1])]
+    feed_todo = [page for page in feed_files if needs_render(page[0], page[1])]
+    redirect_todo = [page for page in redirect_pages if needs_render(page[0], page[1])]
+    directory_todo = [page for page in directory_pages if needs_render(page[0], page[1])]
+    rendered_count = (len(index_todo) + len(article_todo) + len(label_todo) + len(feed_todo) + len(redirect_todo)
+                      + len(directory_todo))
+    skipped_count = (len(index_pages) + len(article_pages) + len(label_pages) + len(feed_files) + len(redirect_pages)
+                     + len(directory_pages) - rendered_count)
+    increment_counter('pages_skipped', skipped_count)
+
+    # Indeks pencarian dibangun ulang jika ada postingan yang berubah; term teks postingan yang
+    # tidak berubah diambil dari store sehingga hanya postingan yang berubah yang perlu di-parse
+    search_files = []
+    search_todo = False
+    search_store = None
+    if SEARCH_INDEX_ENABLED:
+        search_store = load_search_term_store()
+        search_signature = compute_hash('search', str(SEARCH_INDEX_VERSION), *(p.content_hash for p in sorted_posts))
+        search_files = [(get_search_meta_filename(), search_signature, None)]
+        search_todo = needs_render(*search_files[0][:2])
+
+    # --- Pra-pemrosesan Postingan (HTML setiap postingan hanya di-parse sekali) ---
+    needed_posts = collect_posts_for_pages(ctx, index_todo, article_todo, label_todo, feed_todo)
+    new_search_terms = None
+    if search_todo:
+        new_search_terms = {}
+        for p in posts:
+            if search_store.get(p.id, (None,))[0] != p.content_hash:
+                needed_posts[p.id] = p
+    article_ids = {post.id for _, _, post in article_todo}
+    log(f"Memproses konten {len(needed_posts)} postingan...")
+    if low_memory:
+        # Body AMP menunggu di file sementara sampai snippet/thumbnail semua postingan terkait siap
+        article_body_file = tempfile.TemporaryFile('w+', encoding='utf-8')
+        preprocess_stored_posts(post_source, needed_posts, article_ids, article_body_file, jobs, image_sizes,
+                                new_search_terms)
+    else:
+        needed_post_data = [post_data_by_id[post_id] for post_id in needed_posts]
+        ctx['amp_bodies'] = {}
+        with create_worker_pool(jobs, init_preprocess_worker, (image_sizes,)) as pool:
+            records = iter_progress(pool_map(pool, preprocess_post, needed_post_data, jobs), len(needed_post_data), "Postingan")
+            for post_id, record in zip(needed_posts, records):
+                apply_post_record(needed_posts[post_id], record)
+                if new_search_terms is not None:
+                    new_search_terms[post_id] = record['search_terms']
+                if post_id in article_ids:
+                    ctx['amp_bodies'][post_id] = record['amp']
+
+    init_preprocess_worker({})
+
+    # Hash isi halaman: yang tidak dirender ulang mewarisi hash build sebelumnya (None jika tidak diketahui);
+    # hash halaman artikel tercatat di ledger
+    old_output_hashes = load_output_manifest()
+    old_article_paths = [entry[2] for entry in ledger_entries.values() if entry[2]]
+    old_article_paths.extend(output_path for _, output_path in removed_ledger_entries if output_path)
+    ctx['output_hashes'] = dict(old_output_hashes)
+    ctx['output_hashes'].update((entry[2], entry[4]) for entry in ledger_entries.values() if entry[2])
+    output_hashes = {
+        output_filename: ctx['output_hashes'].get(output_filename)
+        for output_filename, _, _ in (index_pages + article_pages + label_pages + feed_files + redirect_pages
+                                      + directory_pages)
+    }
+    if SEARCH_INDEX_ENABLED and not search_todo:
+        output_hashes.update((output_filename, content_hash) for output_filename, content_hash in old_output_hashes.items()
+                             if output_filename.startswith(SEARCH_INDEX_DIR + "/"))
+
+    # Worker hanya membaca ctx (postingan, body AMP, CSS, header/footer); hasil identik dengan build serial
+    with create_worker_pool(jobs, init_render_worker, (ctx,)) as pool:
+        # --- Render Halaman Index (dengan Paginasi) ---
+        log(f"Membangun {len(index_todo)} halaman index...")
+        tasks = [('index', page_num) for _, _, page_num in index_todo]
+        for written_pages in iter_progress(pool_map(pool, render_page_task, tasks, jobs), len(tasks), "Index"):
+            output_hashes.update(written_pages)
+
+        # --- Render Halaman Artikel Individual ---
+        log(f"Membangun {len(article_todo)} halaman artikel...")
+        if low_memory:
+            with article_body_file:
+                results = (
+                    result
+                    for batch in iter_batches(iter_article_body_tasks(article_body_file), STREAM_BATCH_SIZE)
+                    for result in pool_map(pool, render_page_task, batch, jobs)
+                )
+                for written_pages in iter_progress(results, len(article_todo), "Artikel"):
+                    output_hashes.update(written_pages)
+        else:
+            tasks = [('article', post.id) for _, _, post in article_todo]
+            for written_pages in iter_progress(pool_map(pool, render_page_task, tasks, jobs), len(tasks), "Artikel"):
+                output_hashes.update(written_pages)
+
+        # --- Render Halaman Label ---
+        log(f"Membangun {len(label_todo)} halaman label...")
+        label_page_nums = {}
+        for _, _, (label_name, page_num) in label_todo:
+            label_page_nums.setdefault(label_name, []).append(page_num)
+        tasks = [('label', (label_name, tuple(page_nums))) for label_name, page_nums in label_page_nums.items()]
+        for written_pages in iter_progress(pool_map(pool, render_page_task, tasks, jobs), len(tasks), "Label"):
+            output_hashes.update(written_pages)
+        if directory_todo:
+            log(f"Membangun {len(directory_todo)} halaman direktori label...")
+        tasks = [('label_directory', page_num) for _, _, page_num in directory_todo]
+        for written_pages in pool_map(pool, render_page_task, tasks, jobs):
+            output_hashes.update(written_pages)
+
+        # --- Sitemap dan Feed ---
+        log(f"Membangun {len(feed_todo)} file sitemap dan feed...")
+        tasks = [('feed', (output_filename, key)) for output_filename, _, key in feed_todo]
+        for written_pages in pool_map(pool, render_page_task, tasks, jobs):
+            output_hashes.update(written_pages)
+
+        # --- Redirect URL Paginasi Lama ---
+        if redirect_todo:
+            log(f"Membangun {len(redirect_todo)} halaman redirect paginasi...")
+        tasks = [('redirect', (output_filename, target)) for output_filename, _, target in redirect_todo]
+        for written_pages in pool_map(pool, render_page_task, tasks, jobs):
+            output_hashes.update(written_pages)
+    init_render_worker(None)
+
+    if search_todo:
+        with phase_timer('search'):
+            for p in posts:
+                if p.id in new_search_terms:
+                    search_store[p.id] = (p.content_hash, new_search_terms[p.id])
+            output_hashes.update(write_search_index(ctx, search_store, old_output_hashes))
+            save_search_term_store(search_store, posts)
+
+    # Halaman usang: non-artikel dari manifest output, artikel dari path lama di ledger (postingan yang
+    # dihapus atau slug-nya berubah)
+    deleted_count = delete_orphan_pages(list(old_output_hashes) + old_article_paths, output_hashes)
+    article_filenames = {output_filename for output_filename, _, _ in article_pages}
+    save_output_manifest({output_filename: content_hash for output_filename, content_hash in output_hashes.items()
+                          if output_filename not in article_filenames})
+    metrics = get_metrics()
+    log(f"Output: {metrics['counters'].get('pages_written', 0)} halaman ditulis, "
+        f"{metrics['counters'].get('pages_unchanged', 0)} identik dengan sebelumnya, {deleted_count} halaman usang dihapus.")
+    if metrics['counters'].get('css_over_budget_pages'):
+        print(f"Peringatan: CSS {metrics['counters']['css_over_budget_pages']} halaman melebihi anggaran AMP "
+              f"{AMP_CSS_BUDGET_BYTES} byte.")
+
+    if PRECOMPRESS_ENABLED:
+        precompress_output(output_hashes, jobs)
+
+    if AMP_CACHE_ENABLED:
+        evicted_count = prune_amp_cache()
+        if evicted_count:
+            increment_counter('amp_cache_evictions', evicted_count)
+            log(f"Cache AMP: {evicted_count} entri lama dihapus (batas {AMP_CACHE_MAX_BYTES // (1024 * 1024)} MiB).")
+
+    ledger_rows = []
+    for output_filename, signature, p in article_pages:
+        entry = (p.updated, p.content_hash, output_filename, signature, output_hashes[output_filename])
+        if ledger_entries.get(p.id) != entry:
+            ledger_rows.append((p.id,) + entry)
+    commit_ledger(ledger, ledger_rows, [post_id for post_id, _ in removed_ledger_entries])
+    ledger.close()
+    if removed_ledger_entries:
+        log(f"Ledger: {len(removed_ledger_entries)} postingan yang sudah dihapus dikeluarkan.")
+    increment_counter('posts_new', new_post_count)
+    increment_counter('posts_changed', changed_post_count)
+    increment_counter('posts_removed', len(removed_ledger_entries))
+
+    if incremental:
+        log(f"Build inkremental: {rendered_count} halaman dirender ulang, {skipped_count} halaman tidak berubah.")
+    # Manifest selalu disimpan: build penuh juga menentukan isi output yang dibaca build inkremental berikutnya.
+    # Signature halaman artikel tercatat di ledger.
+    save_build_manifest({
+        'version': BUILD_MANIFEST_VERSION,
+        'inputs': inputs_hash,
+        'pages': {
+            output_filename: signature
+            for output_filename, signature, _ in (index_pages + label_pages + feed_files + redirect_pages
+                                                  + directory_pages + search_files)
+        },
+    })
+
+    log("Proses pembangunan situs selesai.")
+    metrics = get_metrics()
+    return {
+        'posts': len(posts),
+        'posts_processed': len(needed_posts),
+        'pages_total': rendered_count + skipped_count,
+        'pages_rendered': rendered_count,
+        'pages_skipped': skipped_count,
+        'pages_written': metrics['counters'].get('pages_written', 0),
+        'pages_unchanged': metrics['counters'].get('pages_unchanged', 0),
+        'pages_deleted': metrics['counters'].get('pages_deleted', 0),
+        'phase_times': metrics['phases'],
+        'counters': metrics['counters'],
+    }
+
+
+# --- Mode Pratinjau (serve) ---
+#
+# Pratinjau tidak menulis ke OUTPUT_DIR setelah build awal: halaman yang signature-nya (atau hash input
+# globalnya) berbeda dari manifest build dirender di memori saat diminta, sisanya disajikan langsung
+# dari disk. Dengan begitu OUTPUT_DIR dan manifest tetap konsisten untuk build berikutnya, dan
+# perubahan CSS/template pada blog besar hanya merender halaman yang benar-benar dibuka.
+
+def load_post_snapshot(posts_file=None):
+    """Postingan dari file JSON `posts_file` (list item Blogger API), atau dari post store."""
+    if posts_file:
+        with open(posts_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return list(iter_post_store())
 
-        # Bangun dokumen HTML lengkap
-        full_label_html = build_html_document(label_head_html, label_body_content)
-        
-        output_path = os.path.join(OUTPUT_DIR, permalink_rel.lstrip('/'))
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(full_label_html)
-        print(f"  > Halaman Label '{label_name}' selesai: {permalink_rel}")
+def get_watched_mtimes(posts_file=None):
+    """mtime semua file yang dipantau mode serve (None untuk file yang tidak ada)."""
+    paths = [CUSTOM_CSS_PATH, posts_file or POST_STORE_FILE]
+    paths.extend(os.path.join(TEMPLATE_DIR, filename) for filename in sorted(os.listdir(TEMPLATE_DIR)))
+    mtimes = {}
+    for path in paths:
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            mtimes[path] = None
+    return mtimes
+
+def create_preview_state(posts_data, related_scoring=RELATED_POSTS_SCORING):
+    """
+    Konteks pratinjau untuk snapshot postingan saat ini: ctx, data mentah postingan, rencana semua
+    halaman (nama file -> (signature, jenis, kunci)), signature halaman yang ada di disk menurut
+    manifest build (kosong jika hash input globalnya berbeda), dan halaman di disk yang sudah tidak ada.
+    """
+    label_ids = {}
+    posts = [Post(post_data, label_ids, compute_post_hash(post_data)) for post_data in posts_data]
+    ctx = create_site_context(posts, label_ids, related_scoring)
+    index_pages, article_pages, label_pages, redirect_pages, directory_pages = plan_pages(ctx)
+    pages = {}
+    for kind, planned in (('index', index_pages), ('article', article_pages), ('label', label_pages),
+                          ('redirect', redirect_pages), ('label_directory', directory_pages),
+                          ('feed', plan_feed_files(ctx))):
+        for output_filename, signature, key in planned:
+            pages[output_filename] = (signature, kind, key)
+    return get_preview_disk_state({
+        'ctx': ctx,
+        'post_data': {post_data['id']: post_data for post_data in posts_data},
+        'pages': pages,
+    })
+
+def refresh_preview_assets(state):
+    """
+    State pratinjau baru setelah CSS atau template berubah: model Post, hash, postingan terkait,
+    dan rencana halaman dari `state` dipakai ulang; hanya CSS, template, dan hash input global yang
+    dimuat ulang. ctx disalin agar request yang sedang berjalan tetap memakai ctx lama secara utuh.
+    """
+    ctx = dict(state['ctx'])
+    load_site_assets(ctx)
+    return get_preview_disk_state(dict(state, ctx=ctx))
+
+def get_preview_disk_state(state):
+    """
+    Melengkapi state pratinjau dengan signature halaman di disk (manifest build, ditambah halaman
+    artikel dari ledger) dan halaman yang sudah tidak ada.
+    """
+    manifest = load_build_manifest() or {'pages': {}}
+    disk_pages = dict(manifest['pages'])
+    ledger = open_ledger()
+    try:
+        ledger_entries = get_ledger_entries(ledger, state['ctx']['posts'])
+        removed_ledger_entries = get_removed_ledger_entries(ledger, state['ctx']['posts'], ledger_entries)
+    finally:
+        ledger.close()
+    disk_pages.update((entry[2], entry[3]) for entry in ledger_entries.values() if entry[2])
+    disk_pages.update((output_path, None) for _, output_path in removed_ledger_entries if output_path)
+    state['disk_pages'] = disk_pages if manifest.get('inputs') == state['ctx']['inputs_hash'] else {}
+    state['removed_pages'] = set(disk_pages) - set(state['pages'])
+    return state
+
+def render_preview_page(preview, output_filename):
+    """
+    Isi (bytes) halaman `output_filename` untuk pratinjau, atau None jika salinan di disk masih
+    berlaku. Postingan yang dibutuhkan dipra-proses saat itu juga (lewat cache AMP) dan hasilnya
+    disimpan di `preview['records']`; halaman yang sudah dirender disimpan di `preview['rendered']`.
+    """
+    state = preview['state']
+    if output_filename not in state['pages']:
+        return None
+    signature, kind, key = state['pages'][output_filename]
+    ctx = state['ctx']
+    if state['disk_pages'].get(output_filename) == signature:
+        return None
+    cached = preview['rendered'].get(output_filename)
+    if cached and cached[:2] == (ctx['inputs_hash'], signature):
+        return cached[2]
+
+    page = (output_filename, signature, key)
+    needed_posts = collect_posts_for_pages(ctx, [page] if kind == 'index' else [], [page] if kind == 'article' else [],
+                                           [page] if kind == 'label' else [], [page] if kind == 'feed' else [])
+    records = preview['records']
+    for post_id, p in needed_posts.items():
+        if records.get(post_id, (None,))[0] != p.content_hash:
+            records[post_id] = (p.content_hash, preprocess_post(state['post_data'][post_id]))
+        apply_post_record(p, records[post_id][1])
+
+    if kind == 'index':
+        html = render_index_page(ctx, key)[1]
+    elif kind == 'article':
+        html = render_article_page(ctx, key, records[key.id][1]['amp'])[1]
+    elif kind == 'label':
+        label_name, page_num = key
+        html = next(iter_label_pages(ctx, label_name, {page_num}))[1]
+    elif kind == 'redirect':
+        html = render_redirect_page(ctx, key)
+    elif kind == 'label_directory':
+        html = render_label_directory_page(ctx, key)[1]
+    else:
+        html = None
+        data = ''.join(iter_feed_file(ctx, *key)).encode('utf-8')
+    if html is not None:
+        data = (minify_html(html) if HTML_MINIFY else html).encode('utf-8')
+    preview['rendered'][output_filename] = (ctx['inputs_hash'], signature, data)
+    return data
+
+class PreviewRequestHandler(http.server.SimpleHTTPRequestHandler):
+    """Menyajikan OUTPUT_DIR; halaman yang usang dirender ulang saat diminta (lihat render_preview_page)."""
+
+    def __init__(self, *args, preview, **kwargs):
+        self.preview = preview
+        super().__init__(*args, directory=OUTPUT_DIR, **kwargs)
+
+    def send_head(self):
+        path = urllib.parse.unquote(urllib.parse.urlsplit(self.path).path)
+        if path.endswith('/'):
+            path += "index.html"
+        output_filename = path.lstrip('/')
+        if output_filename in self.preview['state']['removed_pages']:
+            self.send_error(404, f"{output_filename} tidak lagi dihasilkan oleh snapshot postingan saat ini")
+            return None
+        try:
+            with self.preview['lock']:
+                data = render_preview_page(self.preview, output_filename)
+        except Exception as e:
+            self.send_error(500, f"Gagal merender {output_filename}: {e}")
+            return None
+        if data is None:
+            return super().send_head()
+        self.send_response(200)
+        self.send_header("Content-Type", self.guess_type(output_filename))
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        return io.BytesIO(data)
+
+    def log_message(self, format, *args):
+        log(f"{self.address_string()} - {format % args}")
 
-    print("Proses pembangunan situs selesai.")
+def serve_site(posts_file=None, host=SERVE_HOST, port=SERVE_PORT, jobs=1, related_scoring=RELATED_POSTS_SCORING):
+    """
+    Mode pratinjau lokal: build inkremental sekali dari snapshot postingan lokal, lalu menyajikan
+    OUTPUT_DIR di http://host:port/ sambil memantau CSS, template, dan snapshot postingan. Perubahan
+    snapshot menyusun ulang model Post dan rencana halaman; perubahan CSS/template hanya memuat ulang
+    CSS dan template. Halaman yang terdampak dirender saat dibuka.
+    Berjalan sampai dihentikan dengan Ctrl+C.
+    """
+    posts_data = load_post_snapshot(posts_file)
+    if not posts_data:
+        print(f"Error: Tidak ada postingan di '{posts_file or POST_STORE_FILE}'. Jalankan build biasa terlebih dahulu "
+              "atau berikan --posts-file.")
+        return
+    build_site(posts_data, incremental=True, jobs=jobs, related_scoring=related_scoring)
+    preview = {'lock': threading.Lock(), 'records': {}, 'rendered': {}, 'state': create_preview_state(posts_data, related_scoring)}
+    del posts_data
+
+    server = http.server.ThreadingHTTPServer((host, port), functools.partial(PreviewRequestHandler, preview=preview))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Pratinjau berjalan di http://{host}:{port}/ (Ctrl+C untuk berhenti).")
+
+    snapshot_path = posts_file or POST_STORE_FILE
+    mtimes = get_watched_mtimes(posts_file)
+    try:
+        while True:
+            time.sleep(SERVE_POLL_INTERVAL)
+            current_mtimes = get_watched_mtimes(posts_file)
+            if current_mtimes == mtimes:
+                continue
+            snapshot_changed = current_mtimes[snapshot_path] != mtimes[snapshot_path]
+            mtimes = current_mtimes
+            start = time.perf_counter()
+            try:
+                if snapshot_changed:
+                    state = create_preview_state(load_post_snapshot(posts_file), related_scoring)
+                else:
+                    # Hanya CSS/template: postingan, hash, dan postingan terkait tidak perlu disusun ulang
+                    state = refresh_preview_assets(preview['state'])
+            except Exception as e:
+                # Mis. file yang sedang disimpan setengah jadi; pratinjau lama tetap dipakai
+                print(f"Peringatan: Gagal memuat ulang pratinjau: {e}")
+                continue
+            with preview['lock']:
+                preview['state'] = state
+            stale_count = sum(1 for output_filename, (signature, _, _) in state['pages'].items()
+                              if state['disk_pages'].get(output_filename) != signature)
+            print(f"Perubahan terdeteksi. Pratinjau diperbarui dalam {time.perf_counter() - start:.2f} detik; "
+                  f"{stale_count} halaman akan dirender saat dibuka.")
+    except KeyboardInterrupt:
+        print("Menghentikan pratinjau.")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+def parse_args():
+    """Membaca argumen baris perintah."""
+    parser = argparse.ArgumentParser(description="Membangun situs statis AMP dari postingan Blogger.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Hanya render ulang halaman yang input-nya berubah sejak build terakhir "
+                             f"(berdasarkan manifest di '{BUILD_MANIFEST_FILE}').")
+    parser.add_argument("--full-sync", action="store_true",
+                        help="Unduh ulang semua postingan dari Blogger API alih-alih sinkronisasi delta.")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Jumlah proses worker untuk pra-pemrosesan dan render halaman (0 = semua core CPU).")
+    parser.add_argument("--related-scoring", choices=sorted(RELATED_POSTS_SCORERS), default=RELATED_POSTS_SCORING,
+                        help="Strategi pemilihan postingan terkait.")
+    parser.add_argument("--pagination", choices=("newest", "stable"), default=PAGINATION_SCHEME,
+                        help="Skema paginasi index/label (stable: arsip dipotong dari postingan terlama dan tidak "
+                             "berubah lagi setelah penuh; URL lama dialihkan).")
+    parser.add_argument("--amp-backend", choices=("auto", "lxml", "bs4"), default=AMP_CONVERTER_BACKEND,
+                        help="Parser untuk konversi AMP (auto = lxml jika terpasang, selain itu BeautifulSoup).")
+    parser.add_argument("--no-amp-cache", action="store_true",
+                        help=f"Jangan baca/tulis cache hasil konversi AMP di '{AMP_CACHE_DIR}'.")
+    parser.add_argument("--probe-images", action="store_true",
+                        help="Baca header setiap gambar untuk width/height amp-img yang sebenarnya "
+                             f"(hasil disimpan di '{IMAGE_SIZE_CACHE_FILE}').")
+    parser.add_argument("--minify-html", action="store_true",
+                        help="Minifikasi HTML setiap halaman sebelum ditulis (komentar dan indentasi dihapus).")
+    parser.add_argument("--precompress", action="store_true",
+                        help="Tulis varian .gz (dan .br jika paket brotli terpasang) di samping setiap halaman.")
+    parser.add_argument("--search-index", action="store_true",
+                        help=f"Bangun indeks pencarian sisi klien yang di-shard per awalan term di '{OUTPUT_DIR}/{SEARCH_INDEX_DIR}/'.")
+    parser.add_argument("--low-memory", action="store_true",
+                        help="Bangun langsung dari post store secara streaming; hanya metadata ringkas postingan yang disimpan di memori.")
+    parser.add_argument("--serve", action="store_true",
+                        help="Mode pratinjau lokal tanpa kredensial API: build dari post store (atau --posts-file), "
+                             f"sajikan '{OUTPUT_DIR}' lewat HTTP, dan render ulang halaman yang berubah saat dibuka.")
+    parser.add_argument("--posts-file",
+                        help="Snapshot postingan (JSON list item Blogger API) untuk --serve, menggantikan post store.")
+    parser.add_argument("--port", type=int, default=SERVE_PORT,
+                        help="Port HTTP untuk --serve.")
+    parser.add_argument("--quiet", action="store_true",
+                        help="Hanya cetak peringatan dan error (tanpa pesan progres).")
+    parser.add_argument("--metrics-file",
+                        help="Simpan ringkasan waktu per fase dan counter run ini ke file ini.")
+    parser.add_argument("--metrics-format", choices=("json", "prometheus"), default="json",
+                        help="Format file --metrics-file (prometheus: untuk textfile collector node_exporter).")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="Jalankan di bawah cProfile dan simpan statistiknya (format pstats) ke FILE.")
+    args = parser.parse_args()
+    if args.amp_backend == 'lxml' and lxml is None:
+        parser.error("--amp-backend lxml membutuhkan paket lxml (pip install lxml).")
+    return args
 
 
 if __name__ == "__main__":
-    if not API_KEY or not BLOG_ID:
+    args = parse_args()
+    QUIET = args.quiet
+    AMP_CONVERTER_BACKEND = args.amp_backend
+    AMP_CACHE_ENABLED = not args.no_amp_cache
+    IMAGE_PROBE_ENABLED = args.probe_images
+    HTML_MINIFY = args.minify_html
+    PRECOMPRESS_ENABLED = args.precompress
+    SEARCH_INDEX_ENABLED = args.search_index
+    PAGINATION_SCHEME = args.pagination
+    if args.serve:
+        serve_site(args.posts_file, port=args.port, jobs=args.jobs, related_scoring=args.related_scoring)
+    elif not API_KEY or not BLOG_ID:
         print("Error: Variabel lingkungan BLOGGER_API_KEY atau BLOGGER_BLOG_ID tidak ditemukan.")
         print("Pastikan Anda mengatur mereka di GitHub Actions secrets.")
     else:
-        posts_data = get_blogger_data(API_KEY, BLOG_ID)
-        if posts_data is not None:
-            build_site(posts_data)
-        else:
-            print("Gagal mengambil data postingan dari Blogger API. Situs tidak dapat dibangun.")
+        run_start = time.perf_counter()
+        with profiling(args.profile):
+            with phase_timer('fetch'):
+                if args.low_memory:
+                    posts_data = iter_post_store if sync_post_store(API_KEY, BLOG_ID, full_sync=args.full_sync) else None
+                else:
+                    posts_data = sync_posts(API_KEY, BLOG_ID, full_sync=args.full_sync)
+            if posts_data is not None:
+                build_site(posts_data, incremental=args.incremental, jobs=args.jobs,
+                           related_scoring=args.related_scoring, low_memory=args.low_memory)
+            else:
+                print("Gagal mengambil data postingan dari Blogger API. Situs tidak dapat dibangun.")
+        run_seconds = time.perf_counter() - run_start
+        log(f"Selesai dalam {run_seconds:.2f} detik. Waktu per fase: {format_phase_times(get_metrics()['phases'])}")
+        if args.metrics_file:
+            write_metrics_file(args.metrics_file, args.metrics_format, run_seconds)
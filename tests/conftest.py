@@ -0,0 +1,117 @@
+import json
+import os
+import sys
+import threading
+import time
+import urllib.parse
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import gondes  # noqa: E402
+
+
+def parse_date(value):
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
+class FakeBlogger:
+    """
+    Blogger API v3 tiruan: /blogs/{id} dan /blogs/{id}/posts dengan maxResults, pageToken,
+    orderBy, serta startDate/endDate yang (seperti API aslinya) memfilter tanggal publikasi.
+    """
+
+    def __init__(self, published="2015-01-01T00:00:00Z"):
+        self.published = published
+        self.posts = []
+        self.failures = [] # Antrian (status, headers) yang dikembalikan sebelum respons normal
+        self.requests = []
+        self.delay = 0 # Detik per request, agar request paralel benar-benar tumpang tindih
+        self.active_requests = 0
+        self.max_active_requests = 0
+        self.lock = threading.Lock()
+
+    def add_post(self, post_id, published, updated=None, **extra):
+        post = {
+            "id": post_id, "title": f"Post {post_id}", "content": f"<p>Isi {post_id}</p>",
+            "published": published, "updated": updated or published, "url": f"https://x/{post_id}.html",
+            "labels": [],
+        }
+        post.update(extra)
+        self.posts.append(post)
+        return post
+
+    def fail(self, status, count=1, headers=None):
+        self.failures.extend([(status, headers or {})] * count)
+
+    def list_posts(self, params):
+        posts = list(self.posts)
+        if 'startDate' in params:
+            posts = [p for p in posts if parse_date(p['published']) >= parse_date(params['startDate'])]
+        if 'endDate' in params:
+            posts = [p for p in posts if parse_date(p['published']) < parse_date(params['endDate'])]
+        order_key = 'updated' if params.get('orderBy') == 'updated' else 'published'
+        posts.sort(key=lambda p: parse_date(p[order_key]), reverse=True)
+        offset = int(params.get('pageToken', 0))
+        limit = int(params.get('maxResults', 500))
+        page = posts[offset:offset + limit]
+        data = {"items": page}
+        if offset + limit < len(posts):
+            data["nextPageToken"] = str(offset + limit)
+        return data
+
+    def handle(self, path, params):
+        with self.lock:
+            self.requests.append((path, params))
+            if self.failures:
+                return self.failures.pop(0) + (None,)
+        parts = path.strip('/').split('/')
+        if parts[-1] == 'posts':
+            return 200, {}, self.list_posts(params)
+        return 200, {}, {"published": self.published}
+
+
+@pytest.fixture
+def blogger(monkeypatch, tmp_path):
+    """Menjalankan FakeBlogger di localhost dan mengarahkan gondes ke sana, di direktori kerja sementara."""
+    fake = FakeBlogger()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urllib.parse.urlsplit(self.path)
+            params = dict(urllib.parse.parse_qsl(url.query))
+            with fake.lock:
+                fake.active_requests += 1
+                fake.max_active_requests = max(fake.max_active_requests, fake.active_requests)
+            if fake.delay:
+                time.sleep(fake.delay)
+            status, headers, data = fake.handle(url.path, params)
+            with fake.lock:
+                fake.active_requests -= 1
+            body = json.dumps(data if data is not None else {"error": status}).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(gondes, 'BLOGGER_API_BASE', f"http://127.0.0.1:{server.server_address[1]}")
+    monkeypatch.setattr(gondes, 'FETCH_BACKOFF_BASE', 0)
+    monkeypatch.setattr(gondes, 'QUIET', True)
+    try:
+        yield fake
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,108 @@
+import glob
+import html
+import json
+import os
+from html.parser import HTMLParser
+
+import pytest
+
+import gondes
+
+# Setiap kasus: <nama>.html (konten postingan), <nama>.amp.html (body AMP yang diharapkan), dan
+# <nama>.json (teks, src gambar pertama, serta ukuran gambar hasil probe jika ada). Kasus blogger_*
+# mengikuti markup editor Blogger (separator/imageanchor, tabel caption, <br />, &nbsp;, embed video,
+# tempelan Word). Satu file .amp.html berlaku untuk semua backend; keduanya dibandingkan setelah
+# normalize_html sehingga hanya perbedaan DOM yang membuat tes gagal.
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "amp")
+CASES = sorted(os.path.basename(path)[:-len(".html")] for path in glob.glob(os.path.join(FIXTURE_DIR, "*.html"))
+               if not path.endswith(".amp.html"))
+BACKENDS = {
+    'bs4': gondes.preprocess_content_bs4,
+    'lxml': gondes.preprocess_content_lxml,
+}
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source',
+             'track', 'wbr'}
+
+
+class HTMLNormalizer(HTMLParser):
+    """
+    Serialisasi ulang HTML dengan aturan tetap: atribut diurutkan dan selalu memakai kutip ganda,
+    teks dan nilai atribut di-escape ulang, tag void tanpa garis miring dan tanpa tag penutup.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs_html = ''.join(f' {name}' if value is None else f' {name}="{html.escape(value)}"'
+                             for name, value in sorted(attrs))
+        self.parts.append(f"<{tag}{attrs_html}>")
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        self.handle_endtag(tag)
+
+    def handle_endtag(self, tag):
+        if tag not in VOID_TAGS:
+            self.parts.append(f"</{tag}>")
+
+    def handle_data(self, data):
+        self.parts.append(html.escape(data, quote=False))
+
+    def handle_comment(self, data):
+        self.parts.append(f"<!--{data}-->")
+
+    def handle_decl(self, decl):
+        self.parts.append(f"<!{decl}>")
+
+    def unknown_decl(self, data):
+        self.parts.append(f"<![{data}]>")
+
+
+def normalize_html(source):
+    normalizer = HTMLNormalizer()
+    normalizer.feed(source)
+    normalizer.close()
+    return ''.join(normalizer.parts)
+
+
+def read_fixture(filename):
+    with open(os.path.join(FIXTURE_DIR, filename), encoding='utf-8') as f:
+        return f.read()
+
+
+@pytest.fixture(params=sorted(BACKENDS))
+def backend(request):
+    if request.param == 'lxml' and gondes.lxml is None:
+        pytest.skip("lxml tidak terpasang")
+    return request.param
+
+
+def test_normalize_html_ignores_serialization_differences():
+    assert normalize_html('<p title=\'a "b"\' id=x>1 &lt; 2<br/>&nbsp;</p>') == \
+        normalize_html('<p id="x" title="a &quot;b&quot;">1 &lt; 2<br>\xa0</p>')
+    assert normalize_html('<p>a</p>') != normalize_html('<p>a</p><p></p>')
+
+
+@pytest.mark.parametrize("case", CASES)
+def test_amp_golden(case, backend):
+    expected = json.loads(read_fixture(f"{case}.json"))
+    image_sizes = {url: tuple(size) for url, size in expected.get('image_sizes', {}).items()}
+    gondes.init_preprocess_worker(image_sizes)
+    try:
+        text, first_image_src, amp_content = BACKENDS[backend](read_fixture(f"{case}.html"))
+    finally:
+        gondes.init_preprocess_worker({})
+
+    assert normalize_html(amp_content) == normalize_html(read_fixture(f"{case}.amp.html"))
+    assert text == expected['text']
+    assert first_image_src == expected['first_image']
+
+
+def test_preprocess_content_uses_selected_backend(monkeypatch, backend):
+    monkeypatch.setattr(gondes, 'AMP_CONVERTER_BACKEND', backend)
+    record = gondes.preprocess_content(read_fixture("no_image.html"))
+
+    assert normalize_html(record['amp']) == normalize_html(read_fixture("no_image.amp.html"))
+    assert record['snippet'] == gondes.build_snippet_from_text(json.loads(read_fixture("no_image.json"))['text'])
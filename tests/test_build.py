@@ -0,0 +1,133 @@
+import pytest
+
+import gondes
+
+
+def make_post(post_id, content, day):
+    return {
+        "id": post_id, "title": f"Judul {post_id}", "url": "", "content": content, "labels": ["Label"],
+        "published": f"2024-01-{day:02d}T00:00:00Z", "updated": f"2024-01-{day:02d}T00:00:00Z",
+        "author": {"displayName": "Penulis"},
+    }
+
+
+def test_probed_image_size_change_rerenders_article(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "dist").mkdir()
+    monkeypatch.setattr(gondes, 'OUTPUT_DIR', str(tmp_path / "dist"))
+    monkeypatch.setattr(gondes, 'QUIET', True)
+    monkeypatch.setattr(gondes, 'IMAGE_PROBE_ENABLED', True)
+    monkeypatch.setattr(gondes, 'IMAGE_PROBE_RETRY_DAYS', 0)
+    probed = {}
+    monkeypatch.setattr(gondes, 'probe_image_size', lambda url, fetcher: probed.get(url))
+    posts = [make_post("1", '<p>a</p><img src="https://img/a.jpg">', 1), make_post("2", "<p>b</p>", 2)]
+    article = tmp_path / "dist" / "judul-1-1.html"
+
+    gondes.build_site(posts, incremental=True)
+    assert 'width="600"' in article.read_text(encoding='utf-8')
+
+    # Gambar yang sebelumnya gagal diperiksa kini diketahui ukurannya; konten postingan tidak berubah
+    probed["https://img/a.jpg"] = (1000, 500)
+    gondes.reset_metrics()
+    gondes.build_site(posts, incremental=True)
+
+    assert 'height="500" layout="responsive" src="https://img/a.jpg" width="1000"' in article.read_text(encoding='utf-8')
+    gondes.reset_metrics()
+    gondes.build_site(posts, incremental=True)
+    assert gondes.get_metrics()['counters'].get('pages_written', 0) == 0
+
+
+def test_css_over_budget_is_reported_once_per_build(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "dist").mkdir()
+    monkeypatch.setattr(gondes, 'OUTPUT_DIR', str(tmp_path / "dist"))
+    monkeypatch.setattr(gondes, 'QUIET', True)
+    monkeypatch.setattr(gondes, 'AMP_CSS_BUDGET_BYTES', 10)
+    gondes.reset_metrics()
+
+    gondes.build_site([make_post(str(i), f"<p>{i}</p>", i + 1) for i in range(3)])
+
+    warnings = [line for line in capsys.readouterr().out.splitlines() if "anggaran AMP" in line]
+    pages = gondes.get_metrics()['counters']['css_over_budget_pages']
+    assert warnings == [f"Peringatan: CSS {pages} halaman melebihi anggaran AMP 10 byte."]
+    assert pages >= 4 # Index, 3 artikel, dst.
+
+
+def test_full_build_refreshes_manifest_for_next_incremental_build(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "dist").mkdir()
+    monkeypatch.setattr(gondes, 'OUTPUT_DIR', str(tmp_path / "dist"))
+    monkeypatch.setattr(gondes, 'QUIET', True)
+    article = tmp_path / "dist" / "judul-1-1.html"
+
+    gondes.build_site([make_post("1", "<p>versi satu</p>", 1)], incremental=True)
+    gondes.build_site([make_post("1", "<p>versi dua</p>", 1)])
+    assert "versi dua" in article.read_text(encoding='utf-8')
+
+    # Kembali ke konten awal: manifest harus mencerminkan build penuh terakhir, bukan build inkremental pertama
+    gondes.build_site([make_post("1", "<p>versi satu</p>", 1)], incremental=True)
+    assert "versi satu" in article.read_text(encoding='utf-8')
+
+
+def test_preview_css_change_reuses_posts_and_context(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "dist").mkdir()
+    monkeypatch.setattr(gondes, 'OUTPUT_DIR', str(tmp_path / "dist"))
+    monkeypatch.setattr(gondes, 'QUIET', True)
+    css_file = tmp_path / "custom.css"
+    css_file.write_text("body{color:red}", encoding='utf-8')
+    monkeypatch.setattr(gondes, 'CUSTOM_CSS_PATH', str(css_file))
+    posts = [make_post(str(i), f"<p>{i}</p>", i + 1) for i in range(3)]
+    gondes.build_site(posts, incremental=True)
+    preview = {'records': {}, 'rendered': {}, 'state': gondes.create_preview_state(posts)}
+    assert gondes.render_preview_page(preview, "judul-1-1.html") is None # Salinan di disk masih berlaku
+
+    css_file.write_text("body{color:blue}", encoding='utf-8')
+    monkeypatch.setattr(gondes, 'compute_post_hash', lambda post_data: pytest.fail("hash postingan dihitung ulang"))
+    monkeypatch.setattr(gondes, 'create_site_context', lambda *args: pytest.fail("ctx disusun ulang"))
+    old_state = preview['state']
+    preview['state'] = gondes.refresh_preview_assets(old_state)
+
+    new_ctx = preview['state']['ctx']
+    assert new_ctx['related_posts'] is old_state['ctx']['related_posts']
+    assert preview['state']['pages'] is old_state['pages']
+    assert new_ctx['inputs_hash'] != old_state['ctx']['inputs_hash']
+    assert preview['state']['disk_pages'] == {}
+    assert b"color:blue" in gondes.render_preview_page(preview, "judul-1-1.html")
+    assert "color:red" in old_state['ctx']['css']['minified'] # ctx lama tidak ikut berubah
+
+
+def test_ledger_drives_article_rendering_and_orphan_deletion(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    dist = tmp_path / "dist"
+    dist.mkdir()
+    monkeypatch.setattr(gondes, 'OUTPUT_DIR', str(dist))
+    monkeypatch.setattr(gondes, 'QUIET', True)
+    posts = [make_post(str(i), f"<p>{i}</p>", i + 1) for i in range(3)]
+    gondes.build_site(posts, incremental=True)
+
+    # Halaman artikel dicatat di ledger, bukan di manifest build/output
+    manifest_pages = gondes.load_build_manifest()['pages']
+    assert not any(name.startswith("judul-") for name in manifest_pages)
+    assert not any(name.startswith("judul-") for name in gondes.load_output_manifest())
+    conn = gondes.open_ledger()
+    entry = gondes.get_ledger_entries(conn, [gondes.Post(posts[1], {}, "")])["1"]
+    conn.close()
+    assert entry[2] == "judul-1-1.html" and entry[4] is not None
+
+    # Postingan 0 dihapus, judul postingan 1 berubah, postingan 2 tetap
+    posts = [dict(posts[1], title="Judul Baru"), posts[2]]
+    gondes.reset_metrics()
+    gondes.build_site(posts, incremental=True)
+
+    assert not (dist / "judul-0-0.html").exists()
+    assert not (dist / "judul-1-1.html").exists()
+    assert (dist / "judul-baru-1.html").exists() and (dist / "judul-2-2.html").exists()
+    counters = gondes.get_metrics()['counters']
+    assert (counters['posts_removed'], counters['posts_changed'], counters.get('posts_new', 0)) == (1, 1, 0)
+    assert counters['pages_deleted'] == 2
+
+    # Build berikutnya tanpa perubahan tidak merender artikel apa pun
+    gondes.reset_metrics()
+    summary = gondes.build_site(posts, incremental=True)
+    assert summary['pages_rendered'] == 0
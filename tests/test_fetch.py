@@ -0,0 +1,156 @@
+import os
+import time
+
+import pytest
+import requests
+
+import gondes
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Mencatat jeda retry alih-alih benar-benar menunggu."""
+    delays = []
+    monkeypatch.setattr(gondes.time, 'sleep', delays.append)
+    return delays
+
+
+def posts_url(blogger):
+    return f"{gondes.BLOGGER_API_BASE}/blogs/blog/posts"
+
+
+def test_fetch_json_retries_429_and_503(blogger, sleeps):
+    blogger.add_post("a", "2024-01-01T00:00:00Z")
+    blogger.fail(429)
+    blogger.fail(503)
+
+    data = gondes.fetch_json(requests.Session(), posts_url(blogger), {})
+
+    assert [p['id'] for p in data['items']] == ["a"]
+    assert len(blogger.requests) == 3
+    assert len(sleeps) == 2
+
+
+def test_fetch_json_does_not_retry_client_errors(blogger, sleeps):
+    blogger.fail(404)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        gondes.fetch_json(requests.Session(), posts_url(blogger), {})
+    assert len(blogger.requests) == 1
+    assert sleeps == []
+
+
+def test_fetch_json_raises_after_max_retries(blogger, sleeps, monkeypatch):
+    monkeypatch.setattr(gondes, 'FETCH_MAX_RETRIES', 2)
+    blogger.fail(503, count=3)
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        gondes.fetch_json(requests.Session(), posts_url(blogger), {})
+    assert len(blogger.requests) == 3
+    assert len(sleeps) == 2
+
+
+def test_retry_after_is_honoured_and_capped(blogger, sleeps, monkeypatch):
+    monkeypatch.setattr(gondes, 'FETCH_MAX_RETRY_AFTER', 30)
+    blogger.fail(429, headers={'Retry-After': '7'})
+    blogger.fail(503, headers={'Retry-After': '3600'})
+
+    gondes.fetch_json(requests.Session(), posts_url(blogger), {})
+
+    assert sleeps == [7.0, 30]
+
+
+def test_checkpoint_resumes_after_exhausted_retries(blogger, sleeps, monkeypatch):
+    monkeypatch.setattr(gondes, 'FETCH_MAX_RETRIES', 1)
+    for i in range(5):
+        blogger.add_post(f"p{i}", f"2024-01-0{i + 1}T00:00:00Z")
+    original_list_posts = blogger.list_posts
+    monkeypatch.setattr(blogger, 'list_posts', lambda params: original_list_posts(dict(params, maxResults=2)))
+    session = requests.Session()
+
+    pages = gondes.iter_blogger_pages(session, "key", "blog", checkpoint_key="listing")
+    first_page = next(pages)
+    blogger.fail(503, count=2) # Halaman kedua gagal melebihi FETCH_MAX_RETRIES
+    with pytest.raises(requests.exceptions.HTTPError):
+        next(pages)
+    assert os.path.exists(gondes.get_checkpoint_path("listing"))
+
+    blogger.requests.clear()
+    resumed = [post['id'] for page in gondes.iter_blogger_pages(session, "key", "blog", checkpoint_key="listing")
+               for post in page]
+
+    assert resumed == [p['id'] for p in first_page] + ["p2", "p1", "p0"]
+    assert [params.get('pageToken') for path, params in blogger.requests] == ["2", "4"]
+
+
+def test_failed_download_keeps_store_and_checkpoints(blogger, sleeps, monkeypatch):
+    monkeypatch.setattr(gondes, 'FETCH_MAX_RETRIES', 0)
+    blogger.add_post("a", "2024-01-01T00:00:00Z")
+    assert gondes.sync_post_store("key", "blog", full_sync=True)
+    assert not os.path.exists(gondes.FETCH_CHECKPOINT_DIR)
+
+    blogger.add_post("b", "2024-02-01T00:00:00Z")
+    blogger.fail(500, count=1000)
+    assert gondes.download_posts_to_store("key", "blog") is None
+    assert [p['id'] for p in gondes.iter_post_store()] == ["a"]
+
+    blogger.failures.clear()
+    assert gondes.download_posts_to_store("key", "blog")['post_count'] == 2
+    assert not os.path.exists(gondes.FETCH_CHECKPOINT_DIR)
+
+
+def test_windowed_listing_deduplicates_posts_in_overlapping_windows(blogger):
+    blogger.add_post("jan", "2020-01-01T00:00:00Z")
+    blogger.add_post("dec", "2019-12-15T00:00:00Z")
+    blogger.add_post("mar", "2020-03-01T00:00:00Z")
+    # Kedua jendela memuat postingan "jan", seperti batas jendela yang inklusif di kedua sisi
+    windows = [("2020-01-01T00:00:00+00:00", "2020-07-01T00:00:00+00:00"),
+               ("2019-12-01T00:00:00+00:00", "2020-01-02T00:00:00+00:00")]
+
+    posts = list(gondes.iter_windowed_listing(requests.Session(), "key", "blog", windows, concurrency=2))
+
+    assert [p['id'] for p in posts] == ["mar", "jan", "dec"]
+
+
+def test_windowed_listing_bounds_windows_in_flight(blogger, monkeypatch):
+    for month in range(1, 13):
+        for day in (1, 15):
+            blogger.add_post(f"{month:02d}-{day:02d}", f"2020-{month:02d}-{day:02d}T00:00:00Z")
+    original_list_posts = blogger.list_posts
+    monkeypatch.setattr(blogger, 'list_posts', lambda params: original_list_posts(dict(params, maxResults=1)))
+    blogger.delay = 0.01
+    windows = [(f"2020-{month:02d}-01T00:00:00+00:00", f"2020-{month + 1:02d}-01T00:00:00+00:00")
+               for month in range(11, 0, -1)]
+    windows.insert(0, ("2020-12-01T00:00:00+00:00", "2021-01-01T00:00:00+00:00"))
+
+    posts = list(gondes.iter_windowed_listing(requests.Session(), "key", "blog", windows, concurrency=3))
+
+    assert [p['id'] for p in posts] == sorted((p['id'] for p in blogger.posts), reverse=True)
+    assert blogger.max_active_requests == 3
+
+    # Selama pemanggil belum meminta postingan berikutnya, tidak ada jendela baru yang mulai diambil
+    gondes.clear_fetch_checkpoints()
+    blogger.requests.clear()
+    listing = gondes.iter_windowed_listing(requests.Session(), "key", "blog", windows, concurrency=3)
+    assert next(listing)['id'] == "12-15"
+    time.sleep(0.1) # Jendela yang sudah di-submit sempat mengirim request pertamanya
+    started_windows = {params['startDate'] for path, params in blogger.requests}
+    time.sleep(0.2)
+    assert {params['startDate'] for path, params in blogger.requests} == started_windows
+    assert len(started_windows) < len(windows)
+    listing.close()
+
+
+def test_windows_include_posts_outside_blog_lifetime(blogger):
+    blogger.add_post("impor", "2010-06-01T00:00:00Z") # Sebelum blog dibuat (2015)
+    blogger.add_post("lama", "2015-02-01T00:00:00Z")
+    blogger.add_post("baru", "2024-05-01T00:00:00Z")
+    blogger.add_post("terjadwal", "2999-01-01T00:00:00Z")
+
+    windows = gondes.build_fetch_windows(requests.Session(), "key", "blog")
+    assert windows[0][1] is None and windows[-1][0] is None
+    state = gondes.download_posts_to_store("key", "blog")
+
+    assert state['post_count'] == 4
+    assert [p['id'] for p in gondes.iter_post_store()] == ["terjadwal", "baru", "lama", "impor"]
+    assert gondes.get_blogger_post_ids("key", "blog") == {"impor", "lama", "baru", "terjadwal"}
@@ -0,0 +1,78 @@
+import json
+import sqlite3
+import types
+
+import gondes
+
+
+def make_post(post_id, content_hash, updated="2024-01-01T00:00:00Z"):
+    return types.SimpleNamespace(id=post_id, updated=updated, content_hash=content_hash)
+
+
+def ledger_row(post):
+    return (post.id, post.updated, post.content_hash, f"{post.id}.html", f"sig-{post.id}", f"out-{post.id}")
+
+
+def ledger_rows(conn):
+    return dict(conn.execute("SELECT id, content_hash FROM posts"))
+
+
+def test_ledger_paths_are_read_at_call_time(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    legacy_file = tmp_path / "lama.json"
+    legacy_file.write_text(json.dumps(["1", 2]), encoding='utf-8')
+    monkeypatch.setattr(gondes, 'LEDGER_FILE', str(tmp_path / "cache" / "ledger.sqlite3"))
+    monkeypatch.setattr(gondes, 'LEGACY_PUBLISHED_POSTS_FILE', str(legacy_file))
+
+    conn = gondes.open_ledger()
+
+    assert (tmp_path / "cache" / "ledger.sqlite3").exists()
+    assert ledger_rows(conn) == {"1": None, "2": None}
+    assert gondes.migrate_published_posts(conn) == 0 # Hanya sekali
+    conn.close()
+
+
+def test_ledger_entries_and_removed_posts(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    conn = gondes.open_ledger()
+    a, b = make_post("a", "h1"), make_post("b", "h2")
+    assert gondes.get_ledger_entries(conn, [a, b]) == {}
+    gondes.commit_ledger(conn, [ledger_row(a), ledger_row(b)], [])
+
+    posts = [make_post("b", "h2-baru"), make_post("c", "h3")]
+    entries = gondes.get_ledger_entries(conn, posts)
+    assert entries == {"b": ("2024-01-01T00:00:00Z", "h2", "b.html", "sig-b", "out-b")}
+    assert gondes.get_removed_ledger_entries(conn, posts, entries) == [("a", "a.html")]
+
+    gondes.commit_ledger(conn, [ledger_row(p) for p in posts], ["a"])
+    assert ledger_rows(conn) == {"b": "h2-baru", "c": "h3"}
+    entries = gondes.get_ledger_entries(conn, posts)
+    assert gondes.get_removed_ledger_entries(conn, posts, entries) == []
+    conn.close()
+
+
+def test_migrated_ids_have_entries_without_page(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / gondes.LEGACY_PUBLISHED_POSTS_FILE).write_text(json.dumps(["a"]), encoding='utf-8')
+    conn = gondes.open_ledger()
+
+    entries = gondes.get_ledger_entries(conn, [make_post("a", "h1"), make_post("b", "h2")])
+
+    assert entries == {"a": (None, None, None, None, None)}
+    conn.close()
+
+
+def test_open_ledger_adds_page_columns_to_old_ledger(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / gondes.BUILD_CACHE_DIR).mkdir()
+    old = sqlite3.connect(gondes.LEDGER_FILE)
+    with old:
+        old.execute("CREATE TABLE posts (id TEXT PRIMARY KEY, updated TEXT, content_hash TEXT) WITHOUT ROWID")
+        old.execute("INSERT INTO posts VALUES ('a', '2024-01-01T00:00:00Z', 'h1')")
+    old.close()
+
+    conn = gondes.open_ledger()
+
+    assert gondes.get_ledger_entries(conn, [make_post("a", "h1")]) == {
+        "a": ("2024-01-01T00:00:00Z", "h1", None, None, None)}
+    conn.close()
@@ -0,0 +1,112 @@
+import json
+from datetime import datetime, timedelta, timezone
+
+import gondes
+
+
+def store_by_id():
+    return {p['id']: p for p in gondes.iter_post_store()}
+
+
+def test_delta_sync_picks_up_old_post_edited_after_last_sync(blogger):
+    blogger.add_post("old", "2015-03-01T00:00:00Z")
+    blogger.add_post("new", "2024-05-01T00:00:00Z")
+    assert gondes.sync_post_store("key", "blog", full_sync=True)
+    assert gondes.load_sync_state()['last_updated'] == "2024-05-01T00:00:00Z"
+
+    # Postingan 2015 diedit setelah sinkronisasi terakhir: published tetap, updated maju
+    blogger.posts[0].update(title="EDITED OLD", updated="2024-06-01T00:00:00Z")
+    assert gondes.sync_post_store("key", "blog")
+
+    posts = store_by_id()
+    assert posts["old"]['title'] == "EDITED OLD"
+    assert posts["new"]['title'] == "Post new"
+    assert gondes.load_sync_state() == {"last_updated": "2024-06-01T00:00:00Z", "post_count": 2}
+    delta_requests = [params for path, params in blogger.requests if params.get('orderBy') == 'updated']
+    assert delta_requests and all('startDate' not in params for params in delta_requests)
+
+
+def test_delta_sync_stops_at_posts_older_than_last_sync(blogger, monkeypatch):
+    monkeypatch.setattr(gondes, 'FETCH_CONCURRENCY', 1)
+    for i in range(5):
+        blogger.add_post(f"p{i}", f"2020-0{i + 1}-01T00:00:00Z")
+    assert gondes.sync_post_store("key", "blog", full_sync=True)
+
+    blogger.posts[1].update(updated="2021-01-01T00:00:00Z")
+    original_list_posts = blogger.list_posts
+    monkeypatch.setattr(blogger, 'list_posts', lambda params: original_list_posts(dict(params, maxResults=1)))
+    blogger.requests.clear()
+    assert gondes.sync_post_store("key", "blog")
+
+    # 1 postingan per halaman: p1 (diedit), p4 (= last_updated), lalu p3 yang lebih lama -> berhenti
+    delta_requests = [params for path, params in blogger.requests if params.get('orderBy') == 'updated']
+    assert len(delta_requests) == 3
+    assert store_by_id()["p1"]['updated'] == "2021-01-01T00:00:00Z"
+
+
+def test_delta_sync_removes_deleted_posts(blogger):
+    blogger.add_post("keep", "2023-01-01T00:00:00Z")
+    blogger.add_post("gone", "2023-02-01T00:00:00Z")
+    assert gondes.sync_post_store("key", "blog", full_sync=True)
+
+    del blogger.posts[1]
+    assert gondes.sync_post_store("key", "blog")
+
+    assert list(store_by_id()) == ["keep"]
+    with open(gondes.SYNC_STATE_FILE, encoding='utf-8') as f:
+        assert json.load(f)['post_count'] == 1
+
+
+def test_save_sync_state_replaces_file_atomically(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    gondes.save_sync_state({"last_updated": "2024-01-01T00:00:00Z", "post_count": 1})
+    gondes.save_sync_state({"last_updated": "2024-02-01T00:00:00Z", "post_count": 2})
+
+    assert gondes.load_sync_state() == {"last_updated": "2024-02-01T00:00:00Z", "post_count": 2}
+    assert sorted(p.name for p in (tmp_path / gondes.BUILD_CACHE_DIR).iterdir()) == ["sync_state.json"]
+
+
+def test_delta_sync_keeps_posts_dated_before_blog_creation(blogger):
+    blogger.add_post("impor", "2010-06-01T00:00:00Z") # Blog dibuat 2015
+    blogger.add_post("new", "2024-05-01T00:00:00Z")
+    assert gondes.sync_post_store("key", "blog", full_sync=True)
+    assert sorted(store_by_id()) == ["impor", "new"]
+
+    blogger.posts[1].update(title="EDITED", updated="2024-06-01T00:00:00Z")
+    assert gondes.sync_post_store("key", "blog")
+
+    posts = store_by_id()
+    assert sorted(posts) == ["impor", "new"]
+    assert posts["new"]['title'] == "EDITED"
+    id_requests = [params for path, params in blogger.requests if params.get('fields', '').startswith('items(id)')]
+    assert id_requests and all('startDate' not in params and 'endDate' not in params for params in id_requests)
+
+
+def test_resumed_download_does_not_skip_edits_in_replayed_windows(blogger, monkeypatch):
+    monkeypatch.setattr(gondes, 'FETCH_CONCURRENCY', 1)
+    monkeypatch.setattr(gondes, 'FETCH_MAX_RETRIES', 0)
+    blogger.add_post("old", "2016-01-01T00:00:00Z", updated="2030-01-01T00:00:00Z")
+    blogger.add_post("new", (datetime.now(timezone.utc) - timedelta(days=1)).isoformat())
+
+    # Run pertama: jendela terbaru (berisi "new") selesai dan tercatat di checkpoint, sisanya gagal
+    original_handle = blogger.handle
+    served = []
+    def handle_then_fail(path, params):
+        if path.endswith('/posts'):
+            if served:
+                return 500, {}, None
+            served.append(path)
+        return original_handle(path, params)
+    monkeypatch.setattr(blogger, 'handle', handle_then_fail)
+    assert gondes.download_posts_to_store("key", "blog") is None
+
+    # "new" diedit setelah halamannya masuk checkpoint; run kedua memutar ulang halaman lama itu
+    edited_at = (datetime.now(timezone.utc) + timedelta(seconds=1)).isoformat()
+    blogger.posts[1].update(title="EDITED", updated=edited_at)
+    monkeypatch.setattr(blogger, 'handle', original_handle)
+    assert gondes.sync_post_store("key", "blog", full_sync=True)
+    assert store_by_id()["new"]['title'] == "Post new"
+    assert gondes.parse_rfc3339(gondes.load_sync_state()['last_updated']) < gondes.parse_rfc3339(edited_at)
+
+    assert gondes.sync_post_store("key", "blog")
+    assert store_by_id()["new"]['title'] == "EDITED"
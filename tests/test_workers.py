@@ -0,0 +1,20 @@
+import multiprocessing
+import types
+
+import gondes
+
+
+def test_spawned_workers_receive_cli_settings(monkeypatch):
+    spawn_only = types.SimpleNamespace(get_all_start_methods=lambda: ['spawn'],
+                                       get_context=lambda method=None: multiprocessing.get_context('spawn'))
+    monkeypatch.setattr(gondes, 'multiprocessing', spawn_only)
+    settings = {'QUIET': True, 'AMP_CONVERTER_BACKEND': 'bs4', 'AMP_CACHE_ENABLED': False, 'IMAGE_PROBE_ENABLED': True,
+                'HTML_MINIFY': True, 'PRECOMPRESS_ENABLED': True, 'SEARCH_INDEX_ENABLED': True, 'PAGINATION_SCHEME': 'stable'}
+    for name, value in settings.items():
+        monkeypatch.setattr(gondes, name, value)
+
+    with gondes.create_worker_pool(2, gondes.init_preprocess_worker, ({'https://x/a.jpg': (10, 20)},)) as pool:
+        worker_settings = pool.submit(gondes.get_worker_settings).result()
+        assert pool.submit(gondes.get_amp_backend).result() == 'bs4'
+
+    assert worker_settings == settings